@@ -71,6 +71,12 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'code_tutors.wsgi.application'
+ASGI_APPLICATION = 'code_tutors.asgi.application'
+
+# Publish/subscribe broker behind the dashboard's Server-Sent Events. LocalBroker only
+# reaches connections served by the same process; swap in a shared broker for several nodes.
+EVENTS_BROKER = 'tutorials.events.LocalBroker'
+EVENTS_HEARTBEAT_SECONDS = 15
 
 
 # Database
@@ -84,6 +90,31 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Reference data (term and venue choices) is cached here and invalidated by
+# version stamps on save/delete. Use a shared backend such as Redis or
+# Memcached when running several processes so invalidations reach them all.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+# Email
+# https://docs.djangoproject.com/en/5.1/topics/email/
+# Invoice reminders are printed to the console in development; configure an
+# SMTP backend (EMAIL_HOST, EMAIL_PORT, ...) in production.
+
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'Code Tutors <accounts@codetutors.example>'
+
+# Days after an invoice is issued that it falls due.
+INVOICE_PAYMENT_DAYS = 30
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -124,6 +155,22 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# collectstatic writes content-hashed copies of each file plus .gz/.br variants,
+# which tutorials.assets.serve_static serves with far-future caching headers.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'tutorials.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# The app serves its own static files, with DEBUG off too, so a single-host
+# deployment needs no separate web server for them. Set this to False when a
+# web server or CDN serves STATIC_ROOT instead.
+SERVE_STATIC_FILES = True
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
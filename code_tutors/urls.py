@@ -15,15 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from tutorials import views
+from tutorials.assets import serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/events/', views.dashboard_events, name='dashboard_events'),
+    path('dashboard/tabs/<slug:tab>/', views.dashboard_tab, name='dashboard_tab'),
     path('log_in/', views.LogInView.as_view(), name='log_in'),
     path('log_out/', views.log_out, name='log_out'),
     path('password/', views.PasswordView.as_view(), name='password'),
@@ -34,4 +36,7 @@ urlpatterns = [
     path('login/student/', views.student_log_in, name='student_log_in'),
     path('request-lesson/<int:tutor_id>/', views.request_lesson, name='request_lesson'),
 ]
-urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
+if settings.SERVE_STATIC_FILES:
+    urlpatterns += [
+        re_path(rf'^{settings.STATIC_URL.strip("/")}/(?P<path>.*)$', serve_static, name='static'),
+    ]
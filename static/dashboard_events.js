@@ -0,0 +1,59 @@
+// Keeps an open dashboard up to date from the server's event stream instead of polling.
+(function () {
+  var script = document.currentScript;
+  if (!window.EventSource || !script) {
+    return;
+  }
+  var messages = {
+    lesson_request: function (data) {
+      return data.deleted ? 'A lesson request was withdrawn.' : 'A lesson request is now ' + data.status + '.';
+    },
+    lesson: function () {
+      return 'Your timetable has changed.';
+    },
+    invoice: function (data) {
+      return data.paid_date ? 'An invoice was marked paid.' : 'Your invoices have changed.';
+    }
+  };
+  var pending = null;
+
+  function notify(text) {
+    var container = document.getElementById('live-updates');
+    if (!container) {
+      return;
+    }
+    var alert = document.createElement('div');
+    alert.className = 'alert alert-info alert-dismissible fade show';
+    alert.setAttribute('role', 'alert');
+    alert.textContent = text;
+    var close = document.createElement('button');
+    close.type = 'button';
+    close.className = 'btn-close';
+    close.setAttribute('data-bs-dismiss', 'alert');
+    close.setAttribute('aria-label', 'Close');
+    alert.appendChild(close);
+    container.appendChild(alert);
+  }
+
+  // Re-fetch the live panes from their fragment URLs, batching bursts of events.
+  function refresh() {
+    if (pending) {
+      return;
+    }
+    pending = setTimeout(function () {
+      pending = null;
+      if (window.dashboardTabs) {
+        window.dashboardTabs.refresh('[data-live-pane]');
+      }
+    }, 300);
+  }
+
+  var source = new EventSource(script.dataset.url);
+  Object.keys(messages).forEach(function (type) {
+    source.addEventListener(type, function (event) {
+      notify(messages[type](JSON.parse(event.data)));
+      refresh();
+    });
+  });
+  source.addEventListener('reload', refresh);
+})();
@@ -0,0 +1,49 @@
+// Fetches each dashboard tab from its fragment URL the first time it is shown.
+(function () {
+  function load(pane, fresh) {
+    var url = pane.dataset.fragmentUrl;
+    if (!url) {
+      return Promise.resolve();
+    }
+    // A stale pane skips the browser cache, which otherwise keeps fragments for their max-age.
+    var options = {credentials: 'same-origin', cache: fresh || pane.dataset.stale ? 'no-cache' : 'default'};
+    pane.dataset.loaded = 'true';
+    delete pane.dataset.stale;
+    return fetch(url, options)
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.text();
+      })
+      .then(function (html) { pane.innerHTML = html; })
+      .catch(function () { delete pane.dataset.loaded; });
+  }
+
+  // Reload the tabs already shown and mark the rest stale, for when their data changes.
+  function refresh(selector) {
+    document.querySelectorAll(selector).forEach(function (pane) {
+      if (pane.dataset.loaded) {
+        load(pane, true);
+      } else {
+        pane.dataset.stale = 'true';
+      }
+    });
+  }
+
+  document.querySelectorAll('[data-fragment-url]').forEach(function (pane) {
+    if (pane.children.length) {
+      pane.dataset.loaded = 'true';
+    }
+  });
+  document.querySelectorAll('[data-bs-toggle="tab"]').forEach(function (link) {
+    link.addEventListener('show.bs.tab', function () {
+      var pane = document.querySelector(link.getAttribute('href'));
+      if (pane && !pane.dataset.loaded) {
+        load(pane, false);
+      }
+    });
+  });
+
+  window.dashboardTabs = {load: load, refresh: refresh};
+})();
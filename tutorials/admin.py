@@ -1,18 +1,131 @@
-from django.contrib import admin
+import io
+import tempfile
+
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group, Permission
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied, ValidationError
 from django.db.models import Q
+from django.utils import timezone
+from django.http import FileResponse
+from django.template.response import TemplateResponse
+from django.urls import path
 
 from .models import (
     User,
     TutorProfile,
+    TutorAvailability,
     StudentProfile,
     Term,
+    TermClosure,
     Venue,
     LessonRequest,
     Lesson,
-    Invoice
+    LessonException,
+    Invoice,
+    Job
 )
+from .exports import EXPORT_NAMES, csv_response, export_rows, write_xlsx
+from . import finance, reference_data, tasks
+from .forms import CSVImportForm, StatementUploadForm, TutorAvailabilityForm
+from .imports import LessonRequestImporter, StudentImporter, TutorImporter
+from .jobs import enqueue
+from .reconciliation import read_statement, reconcile
+from .recommendations import recommend_for_request
+
+
+@admin.action(description='Export selected rows as CSV')
+def export_as_csv(modeladmin, request, queryset):
+    """Stream the selected rows as a CSV download."""
+    return csv_response(EXPORT_NAMES[modeladmin.model], queryset)
+
+
+@admin.action(description='Export selected rows as XLSX')
+def export_as_xlsx(modeladmin, request, queryset):
+    """Write the selected rows to an XLSX workbook and return it as a download."""
+    name = EXPORT_NAMES[modeladmin.model]
+    file = tempfile.TemporaryFile()
+    try:
+        write_xlsx(export_rows(name, queryset), file)
+    except ImproperlyConfigured as error:
+        file.close()
+        modeladmin.message_user(request, str(error), messages.ERROR)
+        return None
+    file.seek(0)
+    return FileResponse(file, as_attachment=True, filename=f'{name}.xlsx')
+
+
+class TermListFilter(admin.SimpleListFilter):
+    """Filter by term, listing terms from the reference data cache instead of the database."""
+
+    title = 'term'
+    parameter_name = 'term__id__exact'
+
+    def lookups(self, request, model_admin):
+        return [(str(row[0]), row[1]) for row in reference_data.all_terms()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(term_id=self.value())
+        return queryset
+
+
+class VenueListFilter(admin.SimpleListFilter):
+    """Filter by venue, listing venues from the reference data cache instead of the database."""
+
+    title = 'venue'
+    parameter_name = 'venue__id__exact'
+
+    def lookups(self, request, model_admin):
+        return [(str(row[0]), row[1]) for row in reference_data.all_venues()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(venue_id=self.value())
+        return queryset
+
+
+class BulkImportAdminMixin:
+    """Adds an 'Import CSV' page to a ModelAdmin, backed by a tutorials.imports importer."""
+
+    importer_class = None
+    change_list_template = 'admin/tutorials/import_change_list.html'
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='%s_%s_import' % info),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        """Upload a CSV file and import it, listing any rejected rows."""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = CSVImportForm(request.POST or None, request.FILES or None)
+        errors = []
+        if request.method == 'POST' and form.is_valid():
+            file = io.TextIOWrapper(form.cleaned_data['csv_file'].file, encoding='utf-8-sig', newline='')
+            try:
+                result = self.importer_class().run(file)
+            except (ValidationError, UnicodeDecodeError) as error:
+                self.message_user(request, f'Could not import the file: {error}', messages.ERROR)
+            else:
+                errors = result.errors
+                level = messages.WARNING if errors else messages.SUCCESS
+                self.message_user(
+                    request,
+                    f'Imported {result.created} row(s), rejected {len(errors)}.',
+                    level
+                )
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f'Import {self.model._meta.verbose_name_plural}',
+            'form': form,
+            'columns': self.importer_class.columns(),
+            'errors': errors,
+        }
+        return TemplateResponse(request, 'admin/tutorials/bulk_import.html', context)
 
 
 @admin.register(User)
@@ -46,33 +159,87 @@ class CustomUserAdmin(UserAdmin):
 
 
 
+class TutorByLoadMixin:
+    """Lists tutor choices least loaded first, labelled with their load counters."""
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'tutor':
+            kwargs['queryset'] = TutorProfile.objects.select_related('user').order_by(
+                'weekly_minutes', 'pending_requests', 'pk'
+            )
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'tutor':
+            field.label_from_instance = lambda tutor: f'{tutor.user.full_name()} ({tutor.load_summary()})'
+        return field
+
+
 @admin.register(TutorProfile)
-class TutorProfileAdmin(admin.ModelAdmin):
-    list_display = ('user_full_name', 'experience_years', 'contact_number')
+class TutorProfileAdmin(BulkImportAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'user_full_name', 'experience_years', 'contact_number', 'active_lessons', 'weekly_hours', 'pending_requests'
+    )
+    list_select_related = ('user',)
     search_fields = ('user__first_name', 'user__last_name', 'contact_number')
     list_filter = ('experience_years', 'languages', 'specializations')
+    importer_class = TutorImporter
 
     def user_full_name(self, obj):
         return obj.user.full_name()
     user_full_name.short_description = 'Tutor Name'
 
+    def weekly_hours(self, obj):
+        return obj.weekly_hours
+    weekly_hours.short_description = 'Hours / week'
+    weekly_hours.admin_order_field = 'weekly_minutes'
+
+
+@admin.register(TutorAvailability)
+class TutorAvailabilityAdmin(admin.ModelAdmin):
+    form = TutorAvailabilityForm
+    list_display = ('tutor', 'updated_at')
+    list_select_related = ('tutor__user',)
+    search_fields = ('tutor__user__first_name', 'tutor__user__last_name')
+
 
 @admin.register(StudentProfile)
-class StudentProfileAdmin(admin.ModelAdmin):
+class StudentProfileAdmin(BulkImportAdminMixin, admin.ModelAdmin):
     list_display = ('user_full_name', 'contact_number', 'preferred_communication_method')
+    list_select_related = ('user',)
     search_fields = ('user__first_name', 'user__last_name', 'contact_number')
     list_filter = ('preferred_communication_method',)
+    importer_class = StudentImporter
 
     def user_full_name(self, obj):
         return obj.user.full_name()
     user_full_name.short_description = 'Student Name'
 
 
+class TermClosureInline(admin.TabularInline):
+    model = TermClosure
+    extra = 1
+
+
 @admin.register(Term)
 class TermAdmin(admin.ModelAdmin):
     list_display = ('name', 'start_date', 'end_date')
     list_filter = ('start_date', 'end_date')
     search_fields = ('name',)
+    inlines = [TermClosureInline]
+    actions = ['queue_invoice_documents', 'queue_term_reports']
+
+    @admin.action(description='Render invoice documents for selected terms in the background')
+    def queue_invoice_documents(self, request, queryset):
+        """Queue a job per selected term to render its invoices; see the render_invoices command."""
+        for term_id in queryset.values_list('pk', flat=True):
+            enqueue(tasks.render_term_invoices, term_id=term_id)
+        self.message_user(request, f'Queued {queryset.count()} invoice rendering job(s).', messages.SUCCESS)
+
+    @admin.action(description='Write term reports for selected terms in the background')
+    def queue_term_reports(self, request, queryset):
+        """Queue a job per selected term to write its tutor and venue reports; see the term_report command."""
+        for term_id in queryset.values_list('pk', flat=True):
+            enqueue(tasks.write_term_report, term_id=term_id)
+        self.message_user(request, f'Queued {queryset.count()} term report job(s).', messages.SUCCESS)
 
 
 @admin.register(Venue)
@@ -82,25 +249,53 @@ class VenueAdmin(admin.ModelAdmin):
 
 
 @admin.register(LessonRequest)
-class LessonRequestAdmin(admin.ModelAdmin):
-    list_display = ('student_name', 'term', 'frequency', 'status', 'requested_start_time')
-    list_filter = ('term', 'status', 'frequency')
+class LessonRequestAdmin(TutorByLoadMixin, BulkImportAdminMixin, admin.ModelAdmin):
+    list_display = ('student_name', 'tutor_load', 'term', 'frequency', 'status', 'requested_start_time')
+    list_select_related = ('student__user', 'tutor__user', 'term')
+    list_filter = (TermListFilter, 'status', 'frequency')
     search_fields = ('student__user__first_name', 'student__user__last_name', 'notes')
+    actions = [export_as_csv, export_as_xlsx]
+    importer_class = LessonRequestImporter
+    readonly_fields = ('recommended_tutors',)
 
     def student_name(self, obj):
         return obj.student.user.full_name()
     student_name.short_description = 'Student'
 
+    def tutor_load(self, obj):
+        return f'{obj.tutor.user.full_name()} ({obj.tutor.load_summary()})'
+    tutor_load.short_description = 'Tutor (load)'
+    tutor_load.admin_order_field = 'tutor__weekly_minutes'
+
+    def recommended_tutors(self, obj):
+        if obj.pk is None:
+            return '-'
+        ranked = recommend_for_request(obj, k=5)
+        tutors = TutorProfile.objects.select_related('user').in_bulk([tutor_id for tutor_id, _ in ranked])
+        return ', '.join(
+            f'{tutors[tutor_id].user.full_name()} ({score:.2f}; {tutors[tutor_id].load_summary()})'
+            for tutor_id, score in ranked if tutor_id in tutors
+        ) or '-'
+    recommended_tutors.short_description = 'Recommended tutors'
+
+
+class LessonExceptionInline(admin.TabularInline):
+    model = LessonException
+    extra = 0
+
 
 @admin.register(Lesson)
-class LessonAdmin(admin.ModelAdmin):
+class LessonAdmin(TutorByLoadMixin, admin.ModelAdmin):
     list_display = ('student_name', 'tutor_name', 'term', 'venue', 'start_date', 'start_time', 'frequency', 'active')
-    list_filter = ('term', 'frequency', 'active')
+    list_select_related = ('student__user', 'tutor__user', 'term', 'venue')
+    list_filter = (TermListFilter, VenueListFilter, 'frequency', 'active')
     search_fields = (
         'student__user__first_name', 'student__user__last_name',
         'tutor__user__first_name', 'tutor__user__last_name',
         'notes'
     )
+    actions = [export_as_csv, export_as_xlsx]
+    inlines = [LessonExceptionInline]
 
     def student_name(self, obj):
         return obj.student.user.full_name()
@@ -114,11 +309,88 @@ class LessonAdmin(admin.ModelAdmin):
 @admin.register(Invoice)
 class InvoiceAdmin(admin.ModelAdmin):
     list_display = ('student_name', 'term', 'amount', 'issued_date', 'paid_date')
-    list_filter = ('term', 'issued_date', 'paid_date')
+    list_select_related = ('student__user', 'term')
+    list_filter = (TermListFilter, 'issued_date', 'paid_date')
     search_fields = (
         'student__user__first_name', 'student__user__last_name',
     )
+    actions = [export_as_csv, export_as_xlsx]
+    change_list_template = 'admin/tutorials/invoice/change_list.html'
 
     def student_name(self, obj):
         return obj.student.user.full_name()
     student_name.short_description = 'Student'
+
+    def get_urls(self):
+        return [
+            path('reconcile/', self.admin_site.admin_view(self.reconcile_view), name='tutorials_invoice_reconcile'),
+            path('summary/', self.admin_site.admin_view(self.summary_view), name='tutorials_invoice_summary'),
+        ] + super().get_urls()
+
+    def summary_view(self, request):
+        """Show invoice totals per term and cohort and unpaid amounts by age, read from the summary table."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        rows = finance.summary_rows()
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Invoice summary',
+            'totals': finance.term_totals(rows),
+            'aging': finance.aging(rows),
+        }
+        return TemplateResponse(request, 'admin/tutorials/invoice_summary.html', context)
+
+    def reconcile_view(self, request):
+        """Upload a bank statement, mark matching invoices paid and list ambiguous lines."""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        form = StatementUploadForm(request.POST or None, request.FILES or None)
+        ambiguous = []
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['statement_file']
+            file = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            dry_run = form.cleaned_data['dry_run']
+            try:
+                result = reconcile(read_statement(file, upload.name), dry_run=dry_run)
+            except (ValidationError, UnicodeDecodeError) as error:
+                self.message_user(request, f'Could not read the statement: {error}', messages.ERROR)
+            else:
+                ambiguous = result.ambiguous
+                action = 'Would mark' if dry_run else 'Marked'
+                self.message_user(
+                    request,
+                    f'{action} {len(result.paid)} invoice(s) paid, {len(ambiguous)} ambiguous line(s), '
+                    f'{result.unmatched} unmatched.',
+                    messages.WARNING if ambiguous else messages.SUCCESS
+                )
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Reconcile bank statement',
+            'form': form,
+            'ambiguous': ambiguous,
+        }
+        return TemplateResponse(request, 'admin/tutorials/reconcile.html', context)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'status', 'attempts', 'run_at', 'duration', 'worker', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'last_error')
+    readonly_fields = (
+        'task', 'kwargs', 'status', 'run_at', 'attempts', 'max_attempts', 'worker',
+        'created_at', 'started_at', 'heartbeat_at', 'finished_at', 'duration', 'last_error',
+    )
+    actions = ['retry_jobs']
+
+    def has_add_permission(self, request):
+        # Jobs are queued by code with tutorials.jobs.enqueue().
+        return False
+
+    @admin.action(description='Retry selected failed jobs now')
+    def retry_jobs(self, request, queryset):
+        """Queue the selected failed jobs again with a fresh set of attempts."""
+        count = queryset.filter(status=Job.FAILED).update(status=Job.QUEUED, attempts=0, run_at=timezone.now())
+        self.message_user(request, f'Queued {count} failed job(s) again.', messages.SUCCESS)
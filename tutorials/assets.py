@@ -0,0 +1,170 @@
+"""App-server static file handler with pre-compressed variants and range requests."""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+# Preferred first: brotli beats gzip for the same text asset.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def find_static_file(path):
+    """Return the absolute path of a static file, preferring collected files over finders."""
+
+    if settings.STATIC_ROOT:
+        try:
+            full_path = safe_join(settings.STATIC_ROOT, path)
+        except SuspiciousFileOperation:
+            return None
+        if os.path.isfile(full_path):
+            return full_path
+    found = finders.find(path)
+    return found if found and os.path.isfile(found) else None
+
+
+def is_hashed(path):
+    """Return True if the path is a fingerprinted name from the staticfiles manifest."""
+
+    return path in getattr(staticfiles_storage, 'hashed_names', ())
+
+
+def accepted_encodings(request):
+    """Return the content codings listed in the request's Accept-Encoding header."""
+
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def parse_range(header, size):
+    """Return the (start, end) byte range of a single-range header, or None if unsatisfiable."""
+
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        # A suffix range asks for the final N bytes.
+        start = max(size - int(end), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def etag_matches(header, etag, weak=True):
+    """Return True if an If-None-Match or If-Range header names the etag; If-Range compares strongly."""
+
+    tags = [tag.strip() for tag in header.split(',')]
+    if weak:
+        return '*' in tags or etag in (tag.removeprefix('W/') for tag in tags)
+    return etag in tags
+
+
+def range_applies(request, etag, last_modified):
+    """Return True if a Range header should be honoured, which If-Range allows only while the file is unchanged."""
+
+    if 'Range' not in request.headers:
+        return False
+    if_range = request.headers.get('If-Range')
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return etag_matches(if_range, etag, weak=False)
+    return if_range == last_modified
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    Serve a static file with caching headers suited to its name.
+
+    Fingerprinted files are cached for a year; others must revalidate. When
+    the client accepts it, a pre-compressed .br or .gz variant is served.
+    Each variant is its own representation, with an ETag suffixed by its
+    coding. Single byte-range requests are answered from the uncompressed
+    file, and only while an If-Range validator still matches it.
+    """
+    full_path = find_static_file(path)
+    if full_path is None:
+        raise Http404(f'"{path}" does not exist')
+
+    stat = os.stat(full_path)
+    last_modified = http_date(stat.st_mtime)
+    identity_etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    ranged = range_applies(request, identity_etag, last_modified)
+    coding, file_path = (None, full_path) if ranged else encoded_variant(request, full_path)
+    etag = f'{identity_etag[:-1]}-{coding}"' if coding else identity_etag
+
+    if_none_match = request.headers.get('If-None-Match')
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    if (if_none_match is not None and etag_matches(if_none_match, etag)) or (
+        if_none_match is None and if_modified_since is not None and int(stat.st_mtime) <= if_modified_since
+    ):
+        response = HttpResponseNotModified()
+    elif ranged:
+        response = ranged_response(full_path, request.headers['Range'], stat.st_size)
+    else:
+        response = FileResponse(open(file_path, 'rb'))
+        if coding:
+            response['Content-Encoding'] = coding
+
+    if response.status_code != 304:
+        content_type, _ = mimetypes.guess_type(full_path)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+    if 'Content-Disposition' in response:
+        del response['Content-Disposition']
+    response['Last-Modified'] = last_modified
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_hashed(path) else REVALIDATE_CACHE_CONTROL
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def encoded_variant(request, full_path):
+    """Return the coding and path of the best pre-compressed variant the client accepts, or (None, full_path)."""
+
+    accepted = accepted_encodings(request)
+    for coding, suffix in ENCODINGS:
+        if coding in accepted and os.path.isfile(full_path + suffix):
+            return coding, full_path + suffix
+    return None, full_path
+
+
+def ranged_response(full_path, header, size):
+    """Return a 206 response for a satisfiable byte range, or 416 otherwise."""
+
+    byte_range = parse_range(header, size)
+    if byte_range is None:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    start, end = byte_range
+    with open(full_path, 'rb') as file:
+        file.seek(start)
+        content = file.read(end - start + 1)
+    response = HttpResponse(content, status=206)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,229 @@
+"""
+Weekly tutor availability as bitmaps of 15-minute slots.
+
+A week is 7 * 96 = 672 slots, packed into 84 bytes. Fortnightly lessons
+only occupy every other week, so occupancy is tracked over a two-week
+cycle: week parity is counted in whole weeks from EPOCH_MONDAY.
+"""
+import re
+from datetime import date, datetime, time
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .models import Lesson, TutorAvailability, TutorProfile
+from .recurrence import lesson_rule, stored_rule
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+BYTES_PER_WEEK = SLOTS_PER_WEEK // 8
+EPOCH_MONDAY = date(2024, 1, 1)
+MAX_FILTERED_TUTORS = 500
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+WINDOW_RE = re.compile(r'^(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})$', re.IGNORECASE)
+
+
+def week_parity(day):
+    """Return 0 or 1 depending on which week of the fortnightly cycle a date falls in."""
+
+    return ((day - EPOCH_MONDAY).days // 7) % 2
+
+
+def rule_weekdays(rule, start_date):
+    """
+    Return (weekday, weeks) pairs for the days a recurrence rule takes in the two-week cycle.
+
+    Rules repeating every other week take the start date's week; any other
+    interval, and fixed date lists, are treated as taking both weeks.
+    """
+    if rule.dates:
+        return [(weekday, [0, 1]) for weekday in sorted({day.weekday() for day in rule.dates})]
+    weeks = [week_parity(start_date)] if rule.interval == 2 else [0, 1]
+    return [(weekday, weeks) for weekday in rule.weekdays]
+
+
+def slot_range(weekday, start_time, duration_minutes):
+    """Return the (first, stop) slot indices covered by a session, rounded outwards."""
+
+    start = start_time.hour * 60 + start_time.minute
+    first = weekday * SLOTS_PER_DAY + start // SLOT_MINUTES
+    stop = weekday * SLOTS_PER_DAY + -(-(start + duration_minutes) // SLOT_MINUTES)
+    return first, min(stop, SLOTS_PER_WEEK)
+
+
+def window_mask(weekday, start_time, duration_minutes):
+    """Return a boolean week mask with the slots of one session set."""
+
+    mask = np.zeros(SLOTS_PER_WEEK, dtype=bool)
+    first, stop = slot_range(weekday, start_time, duration_minutes)
+    mask[first:stop] = True
+    return mask
+
+
+def pack(mask):
+    """Pack a boolean week mask into bytes for storage."""
+
+    return np.packbits(mask).tobytes()
+
+
+def unpack(slots):
+    """Unpack stored bytes into a boolean week mask."""
+
+    return np.unpackbits(np.frombuffer(bytes(slots), dtype=np.uint8))[:SLOTS_PER_WEEK].astype(bool)
+
+
+def parse_windows(text):
+    """Parse windows such as 'Tue 17:00-19:00; Thu 09:00-12:00' into a week mask."""
+
+    mask = np.zeros(SLOTS_PER_WEEK, dtype=bool)
+    for part in filter(None, (part.strip() for part in re.split(r'[;\n]', text))):
+        match = WINDOW_RE.match(part)
+        if not match:
+            raise ValidationError(f"'{part}' is not a window like 'Tue 17:00-19:00'.")
+        weekday = [day.lower() for day in WEEKDAYS].index(match.group(1).lower())
+        try:
+            start, end = (datetime.strptime(value, '%H:%M').time() for value in match.group(2, 3))
+        except ValueError:
+            raise ValidationError(f"'{part}' contains an invalid time.")
+        minutes = (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+        if minutes <= 0:
+            raise ValidationError(f"'{part}' must end after it starts.")
+        mask |= window_mask(weekday, start, minutes)
+    return mask
+
+
+def format_windows(mask):
+    """Describe a week mask as windows, e.g. 'Tue 17:00-19:00; Thu 09:00-12:00'."""
+
+    windows = []
+    for weekday in range(7):
+        day = mask[weekday * SLOTS_PER_DAY:(weekday + 1) * SLOTS_PER_DAY]
+        # Runs of free slots start where the padded mask rises and end where it falls.
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], day, [False])).astype(np.int8)))
+        for first, stop in zip(edges[::2], edges[1::2]):
+            start = time(*divmod(first * SLOT_MINUTES, 60))
+            end_minutes = stop * SLOT_MINUTES
+            end = '24:00' if end_minutes == 24 * 60 else time(*divmod(end_minutes, 60)).strftime('%H:%M')
+            windows.append(f'{WEEKDAYS[weekday]} {start:%H:%M}-{end}')
+    return '; '.join(windows)
+
+
+def _for_tutors(queryset, index):
+    # Long id lists would exceed the database's parameter limit, so large
+    # batches read every row and callers skip tutors outside the index.
+    if len(index) > MAX_FILTERED_TUTORS:
+        return queryset.all()
+    return queryset.filter(tutor_id__in=index)
+
+
+def set_availability(tutor, mask):
+    """Store a tutor's weekly free time."""
+
+    availability, _ = TutorAvailability.objects.update_or_create(tutor=tutor, defaults={'slots': pack(mask)})
+    return availability
+
+
+def occupancy(tutor_ids, term=None):
+    """
+    Return an (n, 2, BYTES_PER_WEEK) packed array of slots taken by active lessons.
+
+    Lessons in the given term are counted, or by default lessons in any term
+    that has not ended yet. All lessons are fetched in one query.
+    """
+    index = {tutor_id: position for position, tutor_id in enumerate(tutor_ids)}
+    taken = np.zeros((len(tutor_ids), 2, SLOTS_PER_WEEK), dtype=bool)
+    lessons = _for_tutors(Lesson.objects.filter(active=True), index)
+    if term is not None:
+        lessons = lessons.filter(term=term)
+    else:
+        lessons = lessons.filter(term__end_date__gte=timezone.localdate())
+    rows = lessons.values_list('tutor_id', 'start_date', 'start_time', 'duration_minutes', 'frequency', 'recurrence')
+    for tutor_id, start_date, start_time, duration, frequency, recurrence in rows:
+        if tutor_id not in index:
+            continue
+        rule = stored_rule(recurrence, frequency, start_date)
+        for weekday, weeks in rule_weekdays(rule, start_date):
+            first, stop = slot_range(weekday, start_time, duration)
+            taken[index[tutor_id], weeks, first:stop] = True
+    return np.packbits(taken, axis=2)
+
+
+def available_slots(tutor_ids):
+    """
+    Return an (n, BYTES_PER_WEEK) packed array of each tutor's recorded free time.
+
+    Tutors without recorded availability have no free slots.
+    """
+    available = np.zeros((len(tutor_ids), BYTES_PER_WEEK), dtype=np.uint8)
+    index = {tutor_id: position for position, tutor_id in enumerate(tutor_ids)}
+    for tutor_id, slots in _for_tutors(TutorAvailability.objects, index).values_list('tutor_id', 'slots'):
+        if tutor_id in index:
+            available[index[tutor_id]] = np.frombuffer(bytes(slots), dtype=np.uint8)
+    return available
+
+
+def free_slots(tutor_ids, term=None):
+    """Return an (n, 2, BYTES_PER_WEEK) packed array of each tutor's free slots."""
+
+    return available_slots(tutor_ids)[:, np.newaxis, :] & ~occupancy(tutor_ids, term)
+
+
+def fits(free, weekday, start_time, duration_minutes):
+    """Return an (n, 2) boolean array: whether each tutor is free for the window in each week."""
+
+    window = np.packbits(window_mask(weekday, start_time, duration_minutes))
+    # Only the bytes the window touches need comparing.
+    used = np.flatnonzero(window)
+    if not len(used):
+        return np.ones(free.shape[:2], dtype=bool)
+    window = window[used[0]:used[-1] + 1]
+    return ((free[..., used[0]:used[-1] + 1] & window) == window).all(axis=2)
+
+
+def find_free_tutors(weekday, start_time, duration_minutes, frequency='weekly', language=None, term=None):
+    """
+    Return ids of tutors free for a recurring session, checking all tutors at once.
+
+    Weekly sessions need the window free in both weeks of the cycle;
+    fortnightly sessions need it free in either week.
+    """
+    tutors = TutorProfile.objects.filter(availability__isnull=False)
+    if language:
+        tutors = tutors.filter(languages__icontains=language)
+    tutor_ids = list(tutors.values_list('id', flat=True))
+    if not tutor_ids:
+        return []
+    weeks_free = fits(free_slots(tutor_ids, term), weekday, start_time, duration_minutes)
+    matches = weeks_free.any(axis=1) if frequency == 'fortnightly' else weeks_free.all(axis=1)
+    return [tutor_ids[position] for position in np.flatnonzero(matches)]
+
+
+def tutor_is_free(tutor, start_date, start_time, duration_minutes, frequency='weekly', term=None, recurrence=''):
+    """
+    Return True if the tutor can take every session, or has not recorded availability.
+
+    Each weekday the recurrence rule (or the frequency) falls on is checked
+    in the weeks of the cycle it takes, as occupancy() books them.
+    """
+    if not TutorAvailability.objects.filter(tutor=tutor).exists():
+        return True
+    free = free_slots([tutor.pk], term)
+    rule = lesson_rule(recurrence, frequency, start_date)
+    return all(
+        fits(free, weekday, start_time, duration_minutes)[0, weeks].all()
+        for weekday, weeks in rule_weekdays(rule, start_date)
+    )
+
+
+def weekly_free_windows(tutor, term=None):
+    """Describe the windows in which the tutor is free every week."""
+
+    available = available_slots([tutor.pk])
+    if not available.any():
+        # Nothing is free to subtract lessons from, so skip reading them.
+        return ''
+    free = available[:, np.newaxis, :] & ~occupancy([tutor.pk], term)
+    return format_windows(np.unpackbits(free[0, 0] & free[0, 1])[:SLOTS_PER_WEEK].astype(bool))
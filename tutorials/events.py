@@ -0,0 +1,159 @@
+"""
+Change notifications pushed to open dashboards over Server-Sent Events.
+
+Signal receivers publish small events to per-profile channels such as
+'student:12' or 'tutor:3', and each open dashboard subscribes to its
+user's channels. The broker is chosen by the EVENTS_BROKER setting.
+LocalBroker fans events out within one process, which suits a single
+ASGI server and tests. A multi-node deployment would plug in a broker
+with the same publish/subscribe interface backed by a shared message bus.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+SUBSCRIPTION_QUEUE_SIZE = 100
+RETRY_MILLISECONDS = 5000
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class Subscription:
+    """A queue of events for one open connection, fed from any thread."""
+
+    def __init__(self, broker, channels, maxsize=SUBSCRIPTION_QUEUE_SIZE):
+        self.broker = broker
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Queue an event; safe to call from signal receivers in worker threads."""
+
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The connection's event loop has already closed.
+            pass
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind is told to reload instead of replaying everything.
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """Return the next event, or None if none arrives within the timeout."""
+
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return {'type': 'reload', 'data': {}}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process publish/subscribe, fanning events out to the subscriptions of this process."""
+
+    def __init__(self):
+        self.subscriptions = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def subscribe(self, channels):
+        """Return a Subscription to the channels; use it as an async context manager."""
+
+        subscription = Subscription(self, channels)
+        with self.lock:
+            for channel in channels:
+                self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscriptions[channel].discard(subscription)
+                if not self.subscriptions[channel]:
+                    del self.subscriptions[channel]
+
+
+def get_broker():
+    """Return the broker named by the EVENTS_BROKER setting, created once per process."""
+
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(getattr(settings, 'EVENTS_BROKER', 'tutorials.events.LocalBroker'))()
+        return _broker
+
+
+def publish(channels, event_type, **data):
+    """Publish an event to the channels once the surrounding transaction commits."""
+
+    event = {'type': event_type, 'data': data}
+
+    def send():
+        broker = get_broker()
+        for channel in channels:
+            broker.publish(channel, event)
+
+    transaction.on_commit(send)
+
+
+def student_channel(student_id):
+    return f'student:{student_id}'
+
+
+def tutor_channel(tutor_id):
+    return f'tutor:{tutor_id}'
+
+
+def user_channels(user):
+    """Return the channels a user's dashboard listens to."""
+
+    channels = [f'user:{user.pk}']
+    for relation, channel in (('student_profile', student_channel), ('tutor_profile', tutor_channel)):
+        profile = getattr(user, relation, None)
+        if profile is not None:
+            channels.append(channel(profile.pk))
+    return channels
+
+
+def format_event(event):
+    """Encode an event in the text/event-stream format."""
+
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+async def event_stream(channels, heartbeat=None):
+    """Yield the text/event-stream for the channels, with comment lines to keep idle connections open."""
+
+    heartbeat = heartbeat or getattr(settings, 'EVENTS_HEARTBEAT_SECONDS', 15)
+    yield f'retry: {RETRY_MILLISECONDS}\n\n'
+    async with get_broker().subscribe(channels) as subscription:
+        while True:
+            event = await subscription.get(heartbeat)
+            yield ': keep-alive\n\n' if event is None else format_event(event)
@@ -0,0 +1,158 @@
+"""Streaming CSV/XLSX exports of invoices, lessons and lesson requests."""
+import csv
+import importlib.util
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import CharField, Value
+from django.db.models.functions import Concat
+from django.http import StreamingHttpResponse
+
+from .models import Invoice, Lesson, LessonRequest
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _full_name(prefix):
+    """Return an expression joining first and last name, as User.full_name() does."""
+
+    return Concat(
+        f'{prefix}__first_name', Value(' '), f'{prefix}__last_name',
+        output_field=CharField()
+    )
+
+
+# Each export is a list of (column header, field or annotation) pairs.
+# Names are resolved by joins in SQL, so rows never touch model instances.
+EXPORTS = {
+    'invoices': {
+        'model': Invoice,
+        'annotations': {
+            'student_name': _full_name('student__user'),
+        },
+        'columns': [
+            ('Invoice ID', 'id'),
+            ('Student', 'student_name'),
+            ('Student email', 'student__user__email'),
+            ('Term', 'term__name'),
+            ('Amount', 'amount'),
+            ('Issued date', 'issued_date'),
+            ('Paid date', 'paid_date'),
+            ('Notes', 'notes'),
+        ],
+    },
+    'lessons': {
+        'model': Lesson,
+        'annotations': {
+            'student_name': _full_name('student__user'),
+            'tutor_name': _full_name('tutor__user'),
+        },
+        'columns': [
+            ('Lesson ID', 'id'),
+            ('Student', 'student_name'),
+            ('Tutor', 'tutor_name'),
+            ('Term', 'term__name'),
+            ('Venue', 'venue__name'),
+            ('Start date', 'start_date'),
+            ('Start time', 'start_time'),
+            ('Frequency', 'frequency'),
+            ('Duration (mins)', 'duration_minutes'),
+            ('Active', 'active'),
+        ],
+    },
+    'lesson_requests': {
+        'model': LessonRequest,
+        'annotations': {
+            'student_name': _full_name('student__user'),
+            'tutor_name': _full_name('tutor__user'),
+        },
+        'columns': [
+            ('Request ID', 'id'),
+            ('Student', 'student_name'),
+            ('Tutor', 'tutor_name'),
+            ('Term', 'term__name'),
+            ('Languages', 'requested_languages'),
+            ('Specializations', 'requested_specializations'),
+            ('Frequency', 'frequency'),
+            ('Duration (mins)', 'duration_minutes'),
+            ('Start date', 'requested_start_date'),
+            ('Start time', 'requested_start_time'),
+            ('Venue', 'requested_venue__name'),
+            ('Status', 'status'),
+        ],
+    },
+}
+
+EXPORT_NAMES = {export['model']: name for name, export in EXPORTS.items()}
+
+
+class Echo:
+    """File-like object that hands back each written line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(name, queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the header and then one tuple per row of the named export."""
+
+    export = EXPORTS[name]
+    if queryset is None:
+        queryset = export['model'].objects.all()
+    headers, fields = zip(*export['columns'])
+    yield headers
+    rows = (
+        queryset
+        .annotate(**export['annotations'])
+        .order_by('pk')
+        .values_list(*fields)
+    )
+    yield from rows.iterator(chunk_size=chunk_size)
+
+
+def stream_csv(rows):
+    """Yield each row as a line of CSV text."""
+
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(rows, file):
+    """Write rows as CSV to an open text file, one row at a time."""
+
+    writer = csv.writer(file)
+    for row in rows:
+        writer.writerow(row)
+
+
+def xlsx_available():
+    """Return True if the optional openpyxl package needed for XLSX exports is installed."""
+
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+def write_xlsx(rows, file):
+    """Write rows to an XLSX workbook. Requires the optional openpyxl package."""
+
+    try:
+        from openpyxl import Workbook
+    except ImportError as error:
+        raise ImproperlyConfigured('XLSX exports require the openpyxl package.') from error
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for row in rows:
+        sheet.append(row)
+    workbook.save(file)
+
+
+def csv_response(name, queryset=None, filename=None):
+    """Return a streaming HTTP response with the named export as CSV."""
+
+    response = StreamingHttpResponse(
+        stream_csv(export_rows(name, queryset)),
+        content_type='text/csv'
+    )
+    filename = filename or f'{name}.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,181 @@
+"""
+Materialized invoice totals by term, student cohort and issue date.
+
+Summing every invoice on each visit gets slower as invoices pile up, so
+InvoiceSummary keeps running counts and amounts issued and paid for each
+(term, cohort, issued_date), where a student's cohort is the year they
+joined. Invoices remember what they counted for when they were loaded;
+saving or deleting one applies the difference with F() updates in the
+same transaction as the write. rebuild() recomputes the table from the
+invoices with one grouped query, to be run nightly.
+
+The finance pages read only summary rows. Their number grows with the
+days invoices are issued on, not with the invoices, and the aging report
+buckets each row's outstanding total by the age of its issue date.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Invoice, InvoiceSummary, StudentProfile
+
+TOTALS = ('issued_count', 'issued_amount', 'paid_count', 'paid_amount')
+ZERO = Decimal('0.00')
+# Lower bound in days of each aging bucket, and its label.
+AGING_BUCKETS = ((0, 'Under 30 days'), (30, '30-59 days'), (60, '60-89 days'), (90, '90 days or more'))
+
+
+def totals(entry, sign=1):
+    """Return the summary totals a summary_entry() adds, or takes away with sign=-1."""
+
+    _, amount, paid = entry
+    amount = Decimal(str(amount))
+    return [sign, sign * amount, sign * paid, sign * amount * paid]
+
+
+def difference(old, new):
+    """Return {(term_id, student_id, issued_date): totals} to move from the old entry to the new one."""
+
+    deltas = defaultdict(lambda: [0, ZERO, 0, ZERO])
+    for entry, sign in ((old, -1), (new, 1)):
+        if entry is not None:
+            for index, value in enumerate(totals(entry, sign)):
+                deltas[entry[0]][index] += value
+    return deltas
+
+
+def apply(deltas):
+    """Add {(term_id, student_id, issued_date): totals} to the summary rows of the students' cohorts."""
+
+    deltas = {key: values for key, values in deltas.items() if any(values)}
+    if not deltas:
+        return
+    cohorts = dict(
+        StudentProfile.objects.filter(pk__in={student_id for _, student_id, _ in deltas})
+        .values_list('pk', 'user__date_joined__year')
+    )
+    rows = defaultdict(lambda: [0, ZERO, 0, ZERO])
+    for (term_id, student_id, issued_date), values in deltas.items():
+        if student_id in cohorts:
+            for index, value in enumerate(values):
+                rows[term_id, cohorts[student_id], issued_date][index] += value
+
+    for (term_id, cohort, issued_date), values in rows.items():
+        if not any(values):
+            continue
+        key = {'term_id': term_id, 'cohort': cohort, 'issued_date': issued_date}
+        changes = {name: F(name) + value for name, value in zip(TOTALS, values) if value}
+        if InvoiceSummary.objects.filter(**key).update(**changes) or min(values) < 0:
+            # A row to take away from that is missing is left for rebuild() to repair,
+            # which also keeps cascading deletes from recreating a deleted term's rows.
+            continue
+        try:
+            with transaction.atomic():
+                InvoiceSummary.objects.create(**key, **dict(zip(TOTALS, values)))
+        except IntegrityError:
+            InvoiceSummary.objects.filter(**key).update(**changes)
+
+
+def remember(invoice):
+    """Before a save or delete, learn what the stored invoice counted for if it was not loaded with it."""
+
+    if invoice._state.adding or hasattr(invoice, '_summarized'):
+        return
+    stored = Invoice.objects.filter(pk=invoice.pk).only(*Invoice.summary_fields).first()
+    invoice._summarized = stored.summary_entry() if stored else None
+
+
+def saved(invoice):
+    """Apply the change in the invoice's totals after it was saved."""
+
+    new = invoice.summary_entry()
+    apply(difference(getattr(invoice, '_summarized', None), new))
+    invoice._summarized = new
+
+
+def deleted(invoice):
+    """Take the invoice's totals off the summary after it was deleted."""
+
+    apply(difference(getattr(invoice, '_summarized', None), None))
+    invoice._summarized = None
+
+
+def record_payments(invoice_ids):
+    """Count invoices just marked paid with bulk_update, which sends no signals."""
+
+    deltas = defaultdict(lambda: [0, ZERO, 0, ZERO])
+    for term_id, student_id, issued_date, amount in Invoice.objects.filter(pk__in=invoice_ids).values_list(
+        'term_id', 'student_id', 'issued_date', 'amount'
+    ):
+        deltas[term_id, student_id, issued_date][2] += 1
+        deltas[term_id, student_id, issued_date][3] += amount
+    apply(deltas)
+
+
+def rebuild():
+    """Recompute the summary from every invoice with one grouped query, returning (rows, rows that drifted)."""
+
+    paid = Q(paid_date__isnull=False)
+    grouped = (
+        Invoice.objects.order_by()
+        .values('term_id', 'issued_date', cohort=F('student__user__date_joined__year'))
+        .annotate(
+            issued_count=Count('id'),
+            issued_amount=Sum('amount'),
+            paid_count=Count('id', filter=paid),
+            paid_amount=Coalesce(Sum('amount', filter=paid), ZERO),
+        )
+    )
+    with transaction.atomic():
+        current = {
+            (row.term_id, row.cohort, row.issued_date): tuple(getattr(row, name) for name in TOTALS)
+            for row in InvoiceSummary.objects.select_for_update()
+        }
+        rows = [InvoiceSummary(**row) for row in grouped]
+        rebuilt = {
+            (row.term_id, row.cohort, row.issued_date): tuple(getattr(row, name) for name in TOTALS) for row in rows
+        }
+        drifted = sum(current.get(key) != rebuilt.get(key) for key in current.keys() | rebuilt.keys())
+        InvoiceSummary.objects.all().delete()
+        InvoiceSummary.objects.bulk_create(rows)
+    return len(rows), drifted
+
+
+def summary_rows():
+    """Return every summary row with its term, newest term first."""
+
+    return list(InvoiceSummary.objects.select_related('term').order_by('-term__start_date', 'cohort', 'issued_date'))
+
+
+def term_totals(rows):
+    """Return the totals of each (term, cohort), summed over the rows' issue dates, in the rows' order."""
+
+    grouped = {}
+    for row in rows:
+        group = grouped.setdefault((row.term, row.cohort), dict.fromkeys(TOTALS, 0))
+        for name in TOTALS:
+            group[name] += getattr(row, name)
+    return [
+        {'term': term, 'cohort': cohort, **group,
+         'outstanding_count': group['issued_count'] - group['paid_count'],
+         'outstanding_amount': group['issued_amount'] - group['paid_amount']}
+        for (term, cohort), group in grouped.items()
+    ]
+
+
+def aging(rows, today=None):
+    """Return (label, count, amount) of unpaid invoices per bucket of days since they were issued."""
+
+    today = today or timezone.localdate()
+    buckets = [[label, 0, ZERO] for _, label in AGING_BUCKETS]
+    for row in rows:
+        if row.outstanding_count:
+            days = (today - row.issued_date).days
+            index = sum(days >= start for start, _ in AGING_BUCKETS[1:])
+            buckets[index][1] += row.outstanding_count
+            buckets[index][2] += row.outstanding_amount
+    return [tuple(bucket) for bucket in buckets]
@@ -2,7 +2,9 @@
 from django import forms
 from django.contrib.auth import authenticate
 from django.core.validators import RegexValidator
-from .models import User, StudentProfile, TutorProfile, LessonRequest, Term
+from .models import User, StudentProfile, TutorProfile, TutorAvailability, LessonRequest
+from . import reference_data
+from .availability import format_windows, pack, parse_windows, tutor_is_free, unpack
 from django.core.exceptions import ValidationError
 
 class LogInForm(forms.Form):
@@ -33,11 +35,38 @@ class LogInForm(forms.Form):
         return self.cleaned_data.get('user')
     # forms.py
 
+class TermChoiceField(forms.ChoiceField):
+    """Choice of a current or upcoming term, served from the reference data cache."""
+
+    def __init__(self, **kwargs):
+        super().__init__(choices=self.term_choices, **kwargs)
+
+    @staticmethod
+    def term_choices():
+        return [('', '---------')] + [(row[0], row[1]) for row in reference_data.current_terms()]
+
+    def to_python(self, value):
+        """Return the selected Term, built from the cached row without a query."""
+        if value in self.empty_values:
+            return None
+        for row in reference_data.current_terms():
+            if str(row[0]) == str(value):
+                return reference_data.term_from_row(row)
+        raise ValidationError(
+            self.error_messages['invalid_choice'],
+            code='invalid_choice',
+            params={'value': value},
+        )
+
+    def validate(self, value):
+        # to_python has already checked the value against the available terms.
+        forms.Field.validate(self, value)
+
+
 class LessonRequestForm(forms.ModelForm):
     """Form for students to request a lesson."""
 
-    term = forms.ModelChoiceField(
-        queryset=Term.objects.all(),
+    term = TermChoiceField(
         widget=forms.Select(attrs={'class': 'form-control'}),
         required=True
     )
@@ -54,6 +83,10 @@ class LessonRequestForm(forms.ModelForm):
         widget=forms.Select(attrs={'class': 'form-control'}),
         required=True
     )
+    recurrence = forms.CharField(
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g. FREQ=WEEKLY;BYDAY=MO,TH'}),
+        required=False
+    )
     duration_minutes = forms.IntegerField(
         widget=forms.NumberInput(
             attrs={'class': 'form-control', 'placeholder': 'Duration in minutes'}
@@ -76,7 +109,24 @@ class LessonRequestForm(forms.ModelForm):
 
     class Meta:
         model = LessonRequest
-        fields = ['term', 'requested_languages', 'requested_specializations', 'frequency', 'duration_minutes', 'requested_start_time', 'requested_start_date', 'notes']
+        fields = ['term', 'requested_languages', 'requested_specializations', 'frequency', 'recurrence', 'duration_minutes', 'requested_start_time', 'requested_start_date', 'notes']
+
+    def __init__(self, *args, tutor=None, **kwargs):
+        """Construct the form, optionally for a tutor whose availability is checked."""
+        super().__init__(*args, **kwargs)
+        self.tutor = tutor
+
+    def clean(self):
+        """Reject sessions that fall outside the tutor's free time."""
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get('requested_start_date')
+        start_time = cleaned_data.get('requested_start_time')
+        duration = cleaned_data.get('duration_minutes')
+        if self.tutor is not None and start_date and start_time and duration and duration > 0:
+            if not tutor_is_free(self.tutor, start_date, start_time, duration, cleaned_data.get('frequency'),
+                                 cleaned_data.get('term'), cleaned_data.get('recurrence', '')):
+                self.add_error('requested_start_time', 'The tutor is not available at this time.')
+        return cleaned_data
 
 class UserForm(forms.ModelForm):
     """Form to update user profiles."""
@@ -183,6 +233,32 @@ class TutorProfileForm(forms.ModelForm):
         model = TutorProfile
         fields = ['bio', 'experience_years', 'contact_number', 'languages', 'specializations']
 
+class TutorAvailabilityForm(forms.ModelForm):
+    """Form to edit a tutor's weekly free time as a list of windows."""
+
+    windows = forms.CharField(
+        label='Free time',
+        widget=forms.Textarea(attrs={'rows': 7, 'placeholder': 'Tue 17:00-19:00'}),
+        help_text="One window per line (or separated by ';'), e.g. 'Tue 17:00-19:00'.",
+        required=False
+    )
+
+    class Meta:
+        model = TutorAvailability
+        fields = ['tutor']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['windows'].initial = format_windows(unpack(self.instance.slots)).replace('; ', '\n')
+
+    def clean_windows(self):
+        return parse_windows(self.cleaned_data['windows'])
+
+    def save(self, commit=True):
+        self.instance.slots = pack(self.cleaned_data['windows'])
+        return super().save(commit)
+
 class NewPasswordMixin(forms.Form):
     """Form mixing for new_password and password_confirmation fields."""
 
@@ -302,4 +378,16 @@ class SignUpForm(forms.ModelForm):
         else:
             TutorProfile.objects.create(user=user)
 
-        return user
\ No newline at end of file
+        return user
+
+class CSVImportForm(forms.Form):
+    """Form for uploading a CSV file to bulk import in the admin."""
+
+    csv_file = forms.FileField(label='CSV file')
+
+
+class StatementUploadForm(forms.Form):
+    """Form for uploading a bank statement to reconcile in the admin."""
+
+    statement_file = forms.FileField(label='Bank statement (CSV or OFX)')
+    dry_run = forms.BooleanField(required=False, help_text='Only report matches, without marking invoices paid.')
@@ -0,0 +1,284 @@
+"""Batched CSV import of students, tutors and lesson requests."""
+import csv
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .loads import count_created
+from .models import User, StudentProfile, TutorProfile, Term, Venue, LessonRequest
+
+IMPORT_BATCH_SIZE = 1000
+
+
+def batches(iterable, size):
+    """Yield lists of at most size items from an iterable."""
+
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def clean_field(model, name, raw):
+    """Convert and validate a raw CSV value with the model field's own rules."""
+
+    field = model._meta.get_field(name)
+    raw = (raw or '').strip()
+    if raw == '':
+        if field.has_default():
+            return field.get_default()
+        if field.null:
+            raw = None
+    try:
+        return field.clean(raw, None)
+    except ValidationError as error:
+        raise ValidationError(f"{name}: {' '.join(error.messages)}")
+
+
+def constraint_message(error):
+    """Return the message of the model constraint an IntegrityError names, or the error itself."""
+
+    for model in (User, StudentProfile, TutorProfile, LessonRequest):
+        for constraint in model._meta.constraints:
+            if constraint.name in str(error):
+                return constraint.get_violation_error_message()
+    return str(error)
+
+
+class ImportResult:
+    """Counts of created rows and a list of (line number, message) errors."""
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def write_errors(self, file):
+        """Write the error report as CSV."""
+
+        writer = csv.writer(file)
+        writer.writerow(['line', 'error'])
+        writer.writerows(self.errors)
+
+
+class BulkImporter:
+    """
+    Base class for CSV importers.
+
+    Rows are read in batches. Each batch resolves its foreign keys with one
+    query per related model, builds unsaved instances for the valid rows and
+    inserts them with bulk_create in a single transaction. Rules the database
+    enforces with constraints are not checked row by row; if a batch breaks
+    one, it is inserted again a row at a time to report the offending lines.
+    """
+
+    required_columns = ()
+    optional_columns = ()
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    @classmethod
+    def columns(cls):
+        """Return every column the importer reads, required ones first."""
+        return cls.required_columns + cls.optional_columns
+
+    def run(self, file):
+        """Import every row of a CSV file and return an ImportResult."""
+
+        reader = csv.DictReader(file)
+        missing = [column for column in self.required_columns if column not in (reader.fieldnames or ())]
+        if missing:
+            raise ValidationError(f"Missing CSV columns: {', '.join(missing)}")
+
+        result = ImportResult()
+        # Line 1 is the header, so data starts on line 2.
+        for batch in batches(enumerate(reader, start=2), self.batch_size):
+            self.import_batch(batch, result)
+        return result
+
+    def import_batch(self, batch, result):
+        lookups = self.resolve([row for _, row in batch])
+        valid = []
+        for line, row in batch:
+            try:
+                valid.append((line, self.build(row, lookups)))
+            except ValidationError as error:
+                result.errors.append((line, '; '.join(error.messages)))
+        if not valid:
+            return
+        try:
+            with transaction.atomic():
+                self.save([objects for _, objects in valid])
+            result.created += len(valid)
+        except IntegrityError:
+            for line, objects in valid:
+                try:
+                    with transaction.atomic():
+                        self.save([objects])
+                    result.created += 1
+                except IntegrityError as error:
+                    result.errors.append((line, constraint_message(error)))
+
+    def resolve(self, rows):
+        """Return whatever lookups build() needs for this batch of rows."""
+        return {}
+
+    def build(self, row, lookups):
+        """Return unsaved object(s) for a row, or raise ValidationError."""
+        raise NotImplementedError
+
+    def save(self, objects):
+        """Insert the objects built for one batch."""
+        raise NotImplementedError
+
+
+class UserImporter(BulkImporter):
+    """Imports users together with their student or tutor profile."""
+
+    required_columns = ('username', 'email', 'first_name', 'last_name')
+    profile_model = None
+    profile_fields = ()
+    is_tutor = False
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        super().__init__(batch_size)
+        # Imported users have no password until they reset it, which also
+        # avoids hashing a password for every row.
+        self.password = make_password(None)
+        self.seen_usernames = set()
+        self.seen_emails = set()
+
+    def resolve(self, rows):
+        usernames = [(row.get('username') or '').strip() for row in rows]
+        emails = [User.objects.normalize_email((row.get('email') or '').strip()) for row in rows]
+        existing = User.objects.filter(Q(username__in=usernames) | Q(email__in=emails))
+        for username, email in existing.values_list('username', 'email'):
+            self.seen_usernames.add(username)
+            self.seen_emails.add(email)
+        return {}
+
+    def build(self, row, lookups):
+        user = User(
+            username=clean_field(User, 'username', row.get('username')),
+            email=User.objects.normalize_email(clean_field(User, 'email', row.get('email'))),
+            first_name=clean_field(User, 'first_name', row.get('first_name')),
+            last_name=clean_field(User, 'last_name', row.get('last_name')),
+            is_student=not self.is_tutor,
+            is_tutor=self.is_tutor,
+            password=self.password,
+        )
+        if user.username in self.seen_usernames:
+            raise ValidationError(f'username: {user.username} is already taken.')
+        if user.email in self.seen_emails:
+            raise ValidationError(f'email: {user.email} is already taken.')
+        profile = self.profile_model(**{
+            name: clean_field(self.profile_model, name, row.get(name)) for name in self.profile_fields
+        })
+        self.seen_usernames.add(user.username)
+        self.seen_emails.add(user.email)
+        return user, profile
+
+    def save(self, objects):
+        users = User.objects.bulk_create([user for user, _ in objects])
+        profiles = []
+        for user, (_, profile) in zip(users, objects):
+            profile.user = user
+            profiles.append(profile)
+        self.profile_model.objects.bulk_create(profiles)
+
+
+class StudentImporter(UserImporter):
+    profile_model = StudentProfile
+    profile_fields = ('contact_number', 'preferred_communication_method', 'notes')
+    optional_columns = profile_fields
+
+
+class TutorImporter(UserImporter):
+    profile_model = TutorProfile
+    profile_fields = ('bio', 'experience_years', 'contact_number', 'languages', 'specializations')
+    optional_columns = profile_fields
+    is_tutor = True
+
+
+class LessonRequestImporter(BulkImporter):
+    """Imports lesson requests, referring to students and tutors by username."""
+
+    required_columns = ('student', 'tutor', 'term', 'requested_start_date', 'requested_start_time')
+    optional_columns = (
+        'requested_languages', 'requested_specializations', 'frequency', 'duration_minutes',
+        'venue', 'status', 'notes',
+    )
+    request_fields = (
+        'requested_languages', 'requested_specializations', 'frequency', 'duration_minutes',
+        'requested_start_date', 'requested_start_time', 'status', 'notes',
+    )
+
+    def resolve(self, rows):
+        def names(column):
+            return {(row.get(column) or '').strip() for row in rows} - {''}
+
+        venues = {}
+        for pk, name in Venue.objects.filter(name__in=names('venue')).values_list('pk', 'name'):
+            # Venue names are not unique; a name shared by several venues is ambiguous.
+            venues[name] = None if name in venues else pk
+        return {
+            'student': dict(
+                StudentProfile.objects.filter(user__username__in=names('student'))
+                .values_list('user__username', 'pk')
+            ),
+            'tutor': dict(
+                TutorProfile.objects.filter(user__username__in=names('tutor'))
+                .values_list('user__username', 'pk')
+            ),
+            'term': dict(Term.objects.filter(name__in=names('term')).values_list('name', 'pk')),
+            'venue': venues,
+        }
+
+    def lookup(self, lookups, column, row, required=True):
+        value = (row.get(column) or '').strip()
+        if not value:
+            if required:
+                raise ValidationError(f'{column}: This field cannot be blank.')
+            return None
+        if value not in lookups[column]:
+            raise ValidationError(f'{column}: {value} does not exist.')
+        if lookups[column][value] is None:
+            raise ValidationError(f'{column}: {value} matches more than one {column}.')
+        return lookups[column][value]
+
+    def build(self, row, lookups):
+        errors = []
+        values = {}
+        for column in ('student', 'tutor', 'term', 'venue'):
+            try:
+                values[column] = self.lookup(lookups, column, row, required=column != 'venue')
+            except ValidationError as error:
+                errors.extend(error.messages)
+        for name in self.request_fields:
+            try:
+                values[name] = clean_field(LessonRequest, name, row.get(name))
+            except ValidationError as error:
+                errors.extend(error.messages)
+        if errors:
+            raise ValidationError(errors)
+
+        return LessonRequest(
+            student_id=values.pop('student'),
+            tutor_id=values.pop('tutor'),
+            term_id=values.pop('term'),
+            requested_venue_id=values.pop('venue'),
+            **values
+        )
+
+    def save(self, objects):
+        LessonRequest.objects.bulk_create(objects)
+        count_created(objects)
+
+
+IMPORTERS = {
+    'students': StudentImporter,
+    'tutors': TutorImporter,
+    'lesson_requests': LessonRequestImporter,
+}
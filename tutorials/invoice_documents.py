@@ -0,0 +1,91 @@
+"""Batch rendering of printable invoice documents."""
+import hashlib
+import importlib.util
+import json
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.template.loader import get_template, render_to_string
+
+from .models import Invoice
+from .processes import map_in_processes
+
+INVOICE_TEMPLATE = 'invoice_document.html'
+
+INVOICE_FIELDS = (
+    'id', 'amount', 'issued_date', 'paid_date', 'notes',
+    'term__name', 'term__start_date', 'term__end_date',
+    'student__contact_number',
+    'student__user__first_name', 'student__user__last_name', 'student__user__email',
+)
+
+
+def pdf_renderer_available():
+    """Return True if a local PDF renderer (WeasyPrint) is installed."""
+
+    return importlib.util.find_spec('weasyprint') is not None
+
+
+def invoice_rows(term):
+    """Return plain dicts for every invoice of the term, fetched in one joined query."""
+
+    return list(
+        Invoice.objects
+        .filter(term=term)
+        .order_by('pk')
+        .values(*INVOICE_FIELDS)
+    )
+
+
+def document_key(row, template_source):
+    """Return a content hash identifying the document a row renders to."""
+
+    payload = json.dumps(row, sort_keys=True, cls=DjangoJSONEncoder)
+    digest = hashlib.sha256(template_source.encode())
+    digest.update(payload.encode())
+    return digest.hexdigest()
+
+
+def render_document(job):
+    """Render one invoice to HTML (and PDF when requested); runs in a worker process."""
+
+    row, html_path, pdf_path = job
+    html = render_to_string(INVOICE_TEMPLATE, {'invoice': row})
+    html_path.parent.mkdir(parents=True, exist_ok=True)
+    html_path.write_text(html)
+    if pdf_path is not None:
+        from weasyprint import HTML
+        HTML(string=html).write_pdf(pdf_path)
+    return row['id']
+
+
+def render_invoices(term, output_dir, workers=None, pdf=None):
+    """
+    Render every invoice of a term into a content-addressed directory.
+
+    Documents whose content hash already exists on disk are skipped. A
+    manifest mapping invoice ids to document paths is written per term.
+    Returns a (rendered, skipped) tuple of counts.
+    """
+    output_dir = Path(output_dir)
+    if pdf is None:
+        pdf = pdf_renderer_available()
+    template_source = get_template(INVOICE_TEMPLATE).template.source
+
+    manifest = {}
+    jobs = []
+    for row in invoice_rows(term):
+        key = document_key(row, template_source)
+        html_path = output_dir / key[:2] / f'{key}.html'
+        pdf_path = html_path.with_suffix('.pdf') if pdf else None
+        manifest[row['id']] = str(html_path.relative_to(output_dir))
+        if html_path.exists() and (pdf_path is None or pdf_path.exists()):
+            continue
+        jobs.append((row, html_path, pdf_path))
+
+    map_in_processes(render_document, jobs, workers)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / f'term-{term.pk}.json'
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return len(jobs), len(manifest) - len(jobs)
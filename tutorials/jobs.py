@@ -0,0 +1,284 @@
+"""
+A database-backed job queue for work that should not run in a request.
+
+Tasks are plain functions registered with @task; enqueue() stores a Job
+row naming the task and its keyword arguments, in the caller's
+transaction, so a job queued by a request only becomes visible if the
+request's writes commit. run_workers starts a pool of worker processes
+that each claim one due job at a time, run it and record how long it
+took. A job that raises is queued again after an exponential backoff
+until it has used its attempts, then marked failed with its traceback.
+
+Claiming is atomic. Where the database supports SELECT ... FOR UPDATE
+SKIP LOCKED, a worker locks the oldest due job and skips those other
+workers hold. SQLite has no row locks, so there a worker moves a
+candidate from queued to running with a conditional UPDATE, which only
+one worker can win; the others try the next candidate.
+
+While a job runs, a thread in its worker records a heartbeat. When the
+workers start, requeue_stale() hands back jobs whose worker has gone: a
+process on this host that has exited, or any worker whose heartbeat
+stopped. A long job with a live worker is left alone however long it runs.
+A worker only records the outcome of a job it still holds, so one that
+was handed back while it ran cannot overwrite the job's next attempt.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+from .processes import setup_worker
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 30
+RETRY_BACKOFF_MAX_SECONDS = 3600
+HEARTBEAT_SECONDS = 30
+# A running job whose worker has not reported for this long is taken to have lost it.
+STALE_AFTER = timedelta(minutes=5)
+POLL_SECONDS = 1.0
+# Due jobs a worker tries to claim per poll when it cannot lock rows.
+CLAIM_CANDIDATES = 10
+
+TASKS = {}
+
+
+def task(func):
+    """Register a function as a task that enqueue() can schedule."""
+
+    func.task_name = f'{func.__module__}.{func.__qualname__}'
+    TASKS[func.task_name] = func
+    return func
+
+
+def resolve(name):
+    """Return the registered task with the given dotted name, importing its module if needed."""
+
+    if name not in TASKS:
+        try:
+            import_string(name)
+        except ImportError:
+            pass
+    if name not in TASKS:
+        raise LookupError(f"'{name}' is not a registered task.")
+    return TASKS[name]
+
+
+def enqueue(task, run_at=None, max_attempts=MAX_ATTEMPTS, **kwargs):
+    """
+    Queue a registered task (the function or its dotted name) to run with kwargs.
+
+    kwargs must be JSON serializable. run_at delays the job; it runs as soon
+    as a worker is free otherwise. Returns the Job.
+    """
+    name = task if isinstance(task, str) else getattr(task, 'task_name', None)
+    resolve(name or repr(task))
+    return Job.objects.create(task=name, kwargs=kwargs, run_at=run_at or timezone.now(), max_attempts=max_attempts)
+
+
+def backoff(attempts):
+    """Return how long to wait before retrying a job that has failed attempts times."""
+
+    return timedelta(seconds=min(RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1), RETRY_BACKOFF_MAX_SECONDS))
+
+
+def claim(worker):
+    """Atomically mark the oldest due job as running for this worker and return it, or None."""
+
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by('run_at', 'pk')
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = due.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status, job.attempts, job.worker = Job.RUNNING, job.attempts + 1, worker
+            job.started_at = job.heartbeat_at = now
+            job.save(update_fields=['status', 'attempts', 'worker', 'started_at', 'heartbeat_at'])
+            return job
+
+    for pk in due.values_list('pk', flat=True)[:CLAIM_CANDIDATES]:
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, attempts=F('attempts') + 1, worker=worker, started_at=now, heartbeat_at=now
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def record_heartbeat(job):
+    """Record that the worker running the job is still alive."""
+
+    Job.objects.filter(pk=job.pk, status=Job.RUNNING).update(heartbeat_at=timezone.now())
+
+
+@contextmanager
+def heartbeat(job):
+    """Record a heartbeat for the job every HEARTBEAT_SECONDS from a thread while the block runs."""
+
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT_SECONDS):
+                record_heartbeat(job)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'job-{job.pk}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run(job):
+    """
+    Run a claimed job, then record its duration and mark it done, queued for a retry or failed.
+
+    The outcome is only saved if the job is still running under this
+    worker; if it was handed back in the meantime, it is logged and left.
+    """
+
+    started = time.perf_counter()
+    try:
+        with heartbeat(job):
+            resolve(job.task)(**job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status, job.run_at = Job.QUEUED, timezone.now() + backoff(job.attempts)
+        else:
+            job.status = Job.FAILED
+    else:
+        job.status, job.last_error = Job.DONE, ''
+    job.duration = timedelta(seconds=time.perf_counter() - started)
+    job.finished_at = timezone.now()
+    recorded = Job.objects.filter(pk=job.pk, status=Job.RUNNING, worker=job.worker).update(
+        status=job.status, run_at=job.run_at, last_error=job.last_error,
+        duration=job.duration, finished_at=job.finished_at,
+    )
+    if not recorded:
+        logger.warning('Job %s was handed back while %s ran it; its outcome was not recorded.', job.pk, job.worker)
+    return job
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def worker_exited(worker):
+    """Return True if worker names a process on this host that is no longer running."""
+
+    host, _, pid = worker.rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        # The process exists but belongs to another user.
+        pass
+    return False
+
+
+def requeue_stale(older_than=STALE_AFTER):
+    """
+    Queue again, or fail, running jobs whose worker has gone; returns how many.
+
+    A worker has gone if it was a process on this host that has exited, or
+    if it has not recorded a heartbeat for older_than.
+    """
+    running = Job.objects.filter(status=Job.RUNNING)
+    silent = running.alias(last_seen=Coalesce('heartbeat_at', 'started_at')).filter(
+        last_seen__lt=timezone.now() - older_than
+    )
+    local = running.filter(worker__startswith=f'{socket.gethostname()}:').values_list('pk', 'worker')
+    exited = [pk for pk, worker in local if worker_exited(worker)]
+    gone = running.filter(pk__in=[*silent.values_list('pk', flat=True), *exited])
+    failed = gone.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error='The worker running the job stopped.'
+    )
+    return failed + gone.update(status=Job.QUEUED)
+
+
+def work(stop=None, burst=False, poll=POLL_SECONDS, max_jobs=None):
+    """
+    Claim and run jobs until stop is set, max_jobs have run, or, in burst mode, none are due.
+
+    Returns the number of jobs run.
+    """
+    name = worker_name()
+    count = 0
+    while not (stop and stop.is_set()) and (max_jobs is None or count < max_jobs):
+        if not connection.in_atomic_block:
+            # As between requests, drop a connection that broke or outlived CONN_MAX_AGE.
+            close_old_connections()
+        job = claim(name)
+        if job is None:
+            if burst:
+                break
+            if stop:
+                stop.wait(poll)
+            else:
+                time.sleep(poll)
+            continue
+        run(job)
+        count += 1
+    return count
+
+
+def _worker_process(stop, burst, poll):
+    setup_worker()
+    # The pool stops its workers through the event, after their current job.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    work(stop, burst=burst, poll=poll)
+
+
+def run_pool(concurrency, burst=False, poll=POLL_SECONDS):
+    """Run concurrency worker processes until interrupted, or in burst mode until no jobs are due."""
+
+    stop = multiprocessing.Event()
+    previous = signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    try:
+        if concurrency == 1:
+            work(stop, burst=burst, poll=poll)
+            return
+
+        # Children must open their own database connections rather than share the parent's.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_worker_process, args=(stop, burst, poll), name=f'jobs-worker-{number}')
+            for number in range(concurrency)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for process in processes:
+                process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
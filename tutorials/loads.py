@@ -0,0 +1,123 @@
+"""
+Denormalized tutor load counters.
+
+Each TutorProfile carries how many active lessons it has, the average
+minutes a week they take and how many pending lesson requests target it,
+so that admin screens can show and sort tutors by load without
+aggregating per row. Lessons and requests remember what they counted
+for when they were loaded; saving or deleting one applies the difference
+to the tutors' counters with a single F() UPDATE in the same transaction
+as the write. Bulk inserts bypass signals and count their rows with
+count_created(). recount() rebuilds every counter to repair any drift.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Lesson, LessonRequest, TutorProfile
+
+COUNTERS = ('active_lessons', 'weekly_minutes', 'pending_requests')
+RECOUNT_BATCH_SIZE = 500
+
+
+def difference(old, new):
+    """Return {tutor_id: {counter: delta}} to move from the old load to the new one."""
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    for load, sign in ((old, -1), (new, 1)):
+        if load is not None:
+            tutor_id, counts = load
+            for counter, amount in counts.items():
+                deltas[tutor_id][counter] += sign * amount
+    return deltas
+
+
+def apply(deltas):
+    """Add {tutor_id: {counter: delta}} to the tutors' counters with one UPDATE, if anything changed."""
+
+    deltas = {
+        tutor_id: {counter: delta for counter, delta in counts.items() if delta}
+        for tutor_id, counts in deltas.items()
+    }
+    deltas = {tutor_id: counts for tutor_id, counts in deltas.items() if counts}
+    if not deltas:
+        return
+    counters = {counter for counts in deltas.values() for counter in counts}
+    TutorProfile.objects.filter(pk__in=deltas).update(**{
+        # Clamped at zero so that a drifted counter cannot fail the write; recount() repairs it.
+        counter: Greatest(F(counter) + Case(
+            *[When(pk=tutor_id, then=Value(counts[counter]))
+              for tutor_id, counts in deltas.items() if counter in counts],
+            default=Value(0)
+        ), Value(0))
+        for counter in counters
+    })
+
+
+def remember(instance):
+    """Before a save or delete, learn what the stored row counted for if the instance was not loaded with it."""
+
+    if not instance._state.adding and not hasattr(instance, '_counted_load'):
+        stored = type(instance).objects.filter(pk=instance.pk).only(*instance.load_fields).first()
+        instance._counted_load = stored.load() if stored else None
+    counted = getattr(instance, '_counted_load', None)
+    instance._previous_tutor_id = counted[0] if counted else None
+
+
+def tutors(instance):
+    """Return the ids of the tutor the instance had before this save or delete and of its tutor now."""
+
+    return {getattr(instance, '_previous_tutor_id', None), instance.tutor_id} - {None}
+
+
+def saved(instance):
+    """Apply the change in the instance's load after it was saved."""
+
+    new = instance.load()
+    apply(difference(getattr(instance, '_counted_load', None), new))
+    instance._counted_load = new
+
+
+def deleted(instance):
+    """Take the instance's load off its tutor after it was deleted."""
+
+    apply(difference(getattr(instance, '_counted_load', None), None))
+    instance._counted_load = None
+
+
+def count_created(objects):
+    """Count rows inserted with bulk_create, which sends no signals."""
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    for instance in objects:
+        instance._counted_load = tutor_id, counts = instance.load()
+        for counter, amount in counts.items():
+            deltas[tutor_id][counter] += amount
+    apply(deltas)
+
+
+def recount():
+    """Recompute every tutor's counters from their lessons and requests, returning the tutors that drifted."""
+
+    with transaction.atomic():
+        tutors = list(TutorProfile.objects.select_for_update().only('id', *COUNTERS).order_by('pk'))
+        totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        lessons = Lesson.objects.filter(active=True).only(*Lesson.load_fields)
+        for lesson in lessons.iterator(chunk_size=RECOUNT_BATCH_SIZE):
+            tutor_id, counts = lesson.load()
+            for counter, amount in counts.items():
+                totals[tutor_id][counter] += amount
+        pending = LessonRequest.objects.filter(status='pending').values('tutor_id').annotate(count=Count('id'))
+        for row in pending:
+            totals[row['tutor_id']]['pending_requests'] = row['count']
+
+        drifted = []
+        for tutor in tutors:
+            if any(getattr(tutor, counter) != totals[tutor.pk][counter] for counter in COUNTERS):
+                for counter in COUNTERS:
+                    setattr(tutor, counter, totals[tutor.pk][counter])
+                drifted.append(tutor)
+        TutorProfile.objects.bulk_update(drifted, COUNTERS, batch_size=RECOUNT_BATCH_SIZE)
+    return drifted
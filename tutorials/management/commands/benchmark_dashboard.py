@@ -0,0 +1,98 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from tutorials.models import User
+
+
+class Command(BaseCommand):
+    """Build automation command to benchmark the dashboard under concurrent load."""
+
+    help = 'Compares dashboard latency through the WSGI and ASGI handlers at a given concurrency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='User whose dashboard is requested')
+        parser.add_argument('--query', default='', help='Query string, e.g. q_language=Python')
+        parser.add_argument('-n', '--requests', type=int, default=200)
+        parser.add_argument('-c', '--concurrency', type=int, default=20)
+        parser.add_argument('--mode', choices=['wsgi', 'asgi', 'all'], default='all')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        path = reverse('dashboard')
+        if options['query']:
+            path += f"?{options['query']}"
+        total, concurrency = options['requests'], options['concurrency']
+
+        runs = []
+        if options['mode'] in ('wsgi', 'all'):
+            runs.append(('WSGI, one thread per connection', self.run_wsgi))
+        if options['mode'] in ('asgi', 'all'):
+            runs.append(('ASGI', self.run_asgi))
+
+        for label, run in runs:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                latencies, failures, elapsed = run(user, path, total, concurrency)
+            self.report(label, latencies, failures, elapsed, concurrency)
+
+    def run_wsgi(self, user, path, total, concurrency):
+        """Issue requests through the sync handler from a pool of client threads."""
+
+        def request(_):
+            client = Client()
+            client.force_login(user)
+            started = time.perf_counter()
+            response = client.get(path)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(request, range(total)))
+        elapsed = time.perf_counter() - started
+        return self.split(results, elapsed)
+
+    def run_asgi(self, user, path, total, concurrency):
+        """Issue requests through the async handler from a single event loop."""
+        return async_to_sync(self._run_asgi)(user, path, total, concurrency)
+
+    async def _run_asgi(self, user, path, total, concurrency):
+        client = AsyncClient()
+        await client.aforce_login(user)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        return self.split(results, elapsed)
+
+    def split(self, results, elapsed):
+        latencies = [latency for latency, status in results if status == 200]
+        failures = sum(1 for _, status in results if status != 200)
+        return latencies, failures, elapsed
+
+    def report(self, label, latencies, failures, elapsed, concurrency):
+        if len(latencies) < 2:
+            self.stdout.write(f'{label}: not enough successful requests ({failures} failed)')
+            return
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{label}: {len(latencies)} ok, {failures} failed at concurrency {concurrency}, '
+            f'{len(latencies) / elapsed:.1f} req/s, '
+            f'p50 {percentiles[49] * 1000:.1f}ms, p95 {percentiles[94] * 1000:.1f}ms, '
+            f'p99 {percentiles[98] * 1000:.1f}ms'
+        )
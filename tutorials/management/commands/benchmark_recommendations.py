@@ -0,0 +1,101 @@
+import random
+import statistics
+import time
+from datetime import date, time as clock_time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from tutorials.availability import BYTES_PER_WEEK
+from tutorials.recommendations import TutorIndex
+
+
+class Command(BaseCommand):
+    """Build automation command to benchmark tutor recommendations on synthetic data."""
+
+    help = 'Builds an in-memory index of synthetic tutors and times top-k recommendation queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tutors', type=int, default=50000)
+        parser.add_argument('--tags', type=int, default=200, help='Distinct languages and specializations')
+        parser.add_argument('-n', '--queries', type=int, default=200)
+        parser.add_argument('-k', type=int, default=10)
+        parser.add_argument('--updates', type=int, default=100, help='Single-tutor refreshes to time')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        random.seed(options['seed'])
+        vocabulary = [f'tag{number}' for number in range(options['tags'])]
+        total = options['tutors']
+
+        def rows(ids):
+            return [
+                (tutor_id, ', '.join(random.sample(vocabulary, 3)), ', '.join(random.sample(vocabulary, 2)),
+                 random.randint(0, 15))
+                for tutor_id in ids
+            ]
+
+        def bitmaps(count):
+            available = rng.integers(0, 256, (count, BYTES_PER_WEEK), dtype=np.uint8)
+            taken = rng.integers(0, 256, (count, 2, BYTES_PER_WEEK), dtype=np.uint8) & rng.integers(
+                0, 256, (count, 2, BYTES_PER_WEEK), dtype=np.uint8) & available[:, np.newaxis, :]
+            return available, taken
+
+        index = TutorIndex()
+        started = time.perf_counter()
+        index.update(rows(range(1, total + 1)), *bitmaps(total))
+        build = time.perf_counter() - started
+        self.stdout.write(
+            f'Built {total} tutor vectors with {len(index.columns)} tags in {build * 1000:.0f}ms '
+            f'({index.features.nbytes / 2 ** 20:.1f} MiB features, {index.free.nbytes / 2 ** 20:.1f} MiB slots).'
+        )
+
+        updates = []
+        for _ in range(options['updates']):
+            tutor_id = random.randint(1, total)
+            started = time.perf_counter()
+            index.update(rows([tutor_id]), *bitmaps(1))
+            updates.append(time.perf_counter() - started)
+        if updates:
+            self.stdout.write(f'Incremental refresh of one tutor: median {statistics.median(updates) * 1000:.3f}ms')
+
+        latencies = []
+        for _ in range(options['queries']):
+            query = {
+                'languages': ', '.join(random.sample(vocabulary, 2)),
+                'specializations': random.choice(vocabulary),
+                'start_date': date(2025, 1, 6 + random.randint(0, 6)),
+                'start_time': clock_time(random.randint(8, 19), random.choice([0, 15, 30, 45])),
+                'duration_minutes': random.choice([30, 45, 60, 90]),
+                'frequency': random.choice(['weekly', 'fortnightly']),
+            }
+            started = time.perf_counter()
+            index.top(options['k'], **query)
+            latencies.append(time.perf_counter() - started)
+        self.report(f'Top-{options["k"]} over {total} tutors', latencies)
+
+        # A broad search, paging through every tutor with a tag containing 'tag1'.
+        latencies, after = [], None
+        for _ in range(options['queries']):
+            started = time.perf_counter()
+            rows = index.page('tag1', after=after, limit=21)
+            latencies.append(time.perf_counter() - started)
+            after = (rows[19][1], rows[19][0]) if len(rows) == 21 else None
+        self.report(f'Search page of 20 over {total} tutors', latencies)
+
+        latencies = []
+        for _ in range(options['queries']):
+            started = time.perf_counter()
+            index.facets(index.matching(random.choice(vocabulary)))
+            latencies.append(time.perf_counter() - started)
+        self.report(f'Facet counts for a search over {total} tutors', latencies)
+
+    def report(self, label, latencies):
+        if len(latencies) < 2:
+            return
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{label}: {len(latencies)} queries, '
+            f'p50 {percentiles[49] * 1000:.2f}ms, p95 {percentiles[94] * 1000:.2f}ms, '
+            f'p99 {percentiles[98] * 1000:.2f}ms'
+        )
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SOURCE_IMAGE = 'electric-pink-color-abstraction.jpg'
+OUTPUT_DIR = 'images'
+OUTPUT_NAME = 'background'
+WIDTHS = (1280, 1920, 2560)
+FORMATS = (
+    ('avif', 'AVIF', {'quality': 50}),
+    ('webp', 'WEBP', {'quality': 70, 'method': 6}),
+    ('jpg', 'JPEG', {'quality': 75, 'optimize': True, 'progressive': True}),
+)
+
+
+class Command(BaseCommand):
+    """Build automation command to generate responsive versions of the background image."""
+
+    help = 'Writes resized AVIF, WebP and JPEG versions of the background image to static/images'
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image, features
+        except ImportError:
+            raise CommandError('Building images requires the Pillow package.')
+
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        output_dir = static_dir / OUTPUT_DIR
+        output_dir.mkdir(exist_ok=True)
+
+        with Image.open(static_dir / SOURCE_IMAGE) as source:
+            source = source.convert('RGB')
+            for width in WIDTHS:
+                height = round(source.height * width / source.width)
+                resized = source.resize((width, height), Image.LANCZOS)
+                for extension, image_format, save_options in FORMATS:
+                    if image_format != 'JPEG' and not features.check(image_format.lower()):
+                        self.stderr.write(f'Skipping {image_format}: not supported by this Pillow build.')
+                        continue
+                    path = output_dir / f'{OUTPUT_NAME}-{width}.{extension}'
+                    resized.save(path, image_format, **save_options)
+                    self.stdout.write(f'{path.relative_to(static_dir)}: {path.stat().st_size // 1024} KiB')
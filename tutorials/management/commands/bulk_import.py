@@ -0,0 +1,41 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.imports import IMPORTERS, IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """Build automation command to import students, tutors or lesson requests from CSV."""
+
+    help = 'Imports students, tutors or lesson requests from a CSV file in validated batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('csv_file')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--errors', help='Write the per-row error report to this CSV file')
+
+    def handle(self, *args, **options):
+        importer = IMPORTERS[options['kind']](batch_size=options['batch_size'])
+        started = time.perf_counter()
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as file:
+                result = importer.run(file)
+        except (OSError, ValidationError) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='') as file:
+                result.write_errors(file)
+        else:
+            for line, message in result.errors:
+                self.stderr.write(f'line {line}: {message}')
+
+        rows = result.created + len(result.errors)
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(
+            f'Imported {result.created} {options["kind"]}, rejected {len(result.errors)} row(s) '
+            f'in {elapsed:.2f}s ({rate:.0f} rows/s).'
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.exports import EXPORTS, EXPORT_CHUNK_SIZE, export_rows, write_csv, write_xlsx, xlsx_available
+from tutorials.models import Term
+
+
+class Command(BaseCommand):
+    """Build automation command to export invoices, lessons or lesson requests."""
+
+    help = 'Streams invoices, lessons or lesson requests to a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('export', choices=sorted(EXPORTS))
+        parser.add_argument('--term', help='Only export rows belonging to the term with this name')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('-o', '--output', help='File to write to (CSV defaults to stdout)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        name = options['export']
+        queryset = EXPORTS[name]['model'].objects.all()
+        if options['term']:
+            try:
+                term = Term.objects.get(name=options['term'])
+            except Term.DoesNotExist:
+                raise CommandError(f"Term '{options['term']}' does not exist.")
+            queryset = queryset.filter(term=term)
+
+        rows = export_rows(name, queryset, chunk_size=options['chunk_size'])
+        if options['format'] == 'xlsx':
+            if not options['output']:
+                raise CommandError('XLSX exports need an --output file.')
+            # Checked before the file is opened, so a failed export leaves no empty file behind.
+            if not xlsx_available():
+                raise CommandError('XLSX exports require the openpyxl package.')
+            with open(options['output'], 'wb') as file:
+                write_xlsx(rows, file)
+        elif options['output']:
+            with open(options['output'], 'w', newline='') as file:
+                write_csv(rows, file)
+        else:
+            write_csv(rows, self.stdout)
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+from tutorials.finance import rebuild
+
+
+class Command(BaseCommand):
+    """Build automation command to rebuild the invoice summary from the invoices."""
+
+    help = 'Recomputes the invoice totals by term, cohort and issue date, repairing any drift; run nightly'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows, drifted = rebuild()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Rebuilt {rows} invoice summary row(s), {drifted} changed, in {elapsed:.2f}s.')
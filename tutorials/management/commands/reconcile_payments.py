@@ -0,0 +1,38 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.reconciliation import read_statement, reconcile
+
+
+class Command(BaseCommand):
+    """Build automation command to mark invoices paid from a bank statement."""
+
+    help = 'Matches a bank statement (CSV or OFX) against unpaid invoices and marks the matches paid'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement_file')
+        parser.add_argument('--dry-run', action='store_true', help='Report matches without updating invoices')
+        parser.add_argument('--report', help='Write ambiguous statement lines to this CSV file')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['statement_file'], newline='', encoding='utf-8-sig') as file:
+                result = reconcile(read_statement(file, options['statement_file']), dry_run=options['dry_run'])
+        except (OSError, ValidationError) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+
+        if options['report']:
+            with open(options['report'], 'w', newline='') as file:
+                result.write_report(file)
+        else:
+            for line, transaction, problem in result.ambiguous:
+                self.stderr.write(f'line {line}: {transaction}: {problem}')
+
+        action = 'Would mark' if options['dry_run'] else 'Marked'
+        self.stdout.write(
+            f'{action} {len(result.paid)} invoice(s) paid, {len(result.ambiguous)} ambiguous line(s), '
+            f'{result.unmatched} unmatched, in {elapsed:.2f}s.'
+        )
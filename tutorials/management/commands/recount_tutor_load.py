@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+from tutorials.loads import recount
+
+
+class Command(BaseCommand):
+    """Build automation command to rebuild the tutors' load counters from their lessons and requests."""
+
+    help = "Recounts every tutor's active lessons, weekly minutes and pending requests, repairing any drift"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        drifted = recount()
+        elapsed = time.perf_counter() - started
+        if options['verbosity'] > 1:
+            for tutor in drifted:
+                self.stdout.write(f'~ tutor {tutor.pk}: {tutor.load_summary()}')
+        self.stdout.write(f'Repaired the load counters of {len(drifted)} tutor(s) in {elapsed:.2f}s.')
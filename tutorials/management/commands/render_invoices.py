@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.invoice_documents import pdf_renderer_available, render_invoices
+from tutorials.models import Term
+
+
+class Command(BaseCommand):
+    """Build automation command to render printable invoices for a term."""
+
+    help = 'Renders HTML (and PDF if WeasyPrint is installed) documents for every invoice of a term'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', required=True, help='Name of the term to render invoices for')
+        parser.add_argument('-o', '--output', default='invoices', help='Directory to write documents to')
+        parser.add_argument('-w', '--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+        parser.add_argument('--no-pdf', action='store_true', help='Only render HTML documents')
+
+    def handle(self, *args, **options):
+        try:
+            term = Term.objects.get(name=options['term'])
+        except Term.DoesNotExist:
+            raise CommandError(f"Term '{options['term']}' does not exist.")
+
+        pdf = pdf_renderer_available() and not options['no_pdf']
+        started = time.perf_counter()
+        rendered, skipped = render_invoices(term, options['output'], workers=options['workers'], pdf=pdf)
+        elapsed = time.perf_counter() - started
+
+        rate = rendered / elapsed if elapsed else 0
+        formats = 'HTML and PDF' if pdf else 'HTML'
+        self.stdout.write(
+            f'Rendered {rendered} {formats} invoice(s) for {term.name}, '
+            f'skipped {skipped} unchanged, in {elapsed:.2f}s ({rate:.1f} documents/s).'
+        )
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.models import Term
+from tutorials.rollover import describe, plan_rollover, rollover
+
+
+class Command(BaseCommand):
+    """Build automation command to copy a term's active lessons into the next term."""
+
+    help = 'Clones the active lessons of one term into another, skipping lessons that would clash'
+
+    def add_arguments(self, parser):
+        parser.add_argument('from_term', help='Name of the term to copy lessons from')
+        parser.add_argument('to_term', help='Name of the term to copy lessons into')
+        parser.add_argument('--dry-run', action='store_true', help='Show the lessons that would be created or skipped')
+
+    def handle(self, *args, **options):
+        from_term, to_term = (self.get_term(options[name]) for name in ('from_term', 'to_term'))
+        if from_term == to_term:
+            raise CommandError('The terms must be different.')
+
+        started = time.perf_counter()
+        if options['dry_run']:
+            new_lessons, skipped = plan_rollover(from_term, to_term)
+        else:
+            new_lessons, skipped = rollover(from_term, to_term)
+        elapsed = time.perf_counter() - started
+
+        if options['dry_run'] or options['verbosity'] > 1:
+            for lesson in new_lessons:
+                self.stdout.write(f'+ {describe(lesson)}')
+            for lesson, reason in skipped:
+                self.stdout.write(f'- {describe(lesson)}: {reason}')
+
+        action = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(
+            f'{action} {len(new_lessons)} lesson(s) in {to_term.name} from {from_term.name}, '
+            f'skipped {len(skipped)}, in {elapsed:.2f}s.'
+        )
+
+    def get_term(self, name):
+        try:
+            return Term.objects.get(name=name)
+        except Term.DoesNotExist:
+            raise CommandError(f"Term '{name}' does not exist.")
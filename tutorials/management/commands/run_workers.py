@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+from tutorials.jobs import POLL_SECONDS, requeue_stale, run_pool
+from tutorials.models import Job
+
+
+class Command(BaseCommand):
+    """Build automation command to run background jobs from the job queue."""
+
+    help = 'Runs a pool of worker processes that claim and run queued jobs until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-c', '--concurrency', type=int, default=1, help='Worker processes to run')
+        parser.add_argument('--burst', action='store_true', help='Stop once no jobs are due')
+        parser.add_argument('--poll', type=float, default=POLL_SECONDS, help='Seconds to wait when no jobs are due')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1.')
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} job(s) whose worker stopped.')
+
+        since = timezone.now()
+        started = time.perf_counter()
+        run_pool(options['concurrency'], burst=options['burst'], poll=options['poll'])
+        elapsed = time.perf_counter() - started
+
+        finished = dict(
+            Job.objects.filter(finished_at__gte=since).order_by().values_list('status').annotate(count=Count('id'))
+        )
+        self.stdout.write(
+            f"Workers stopped after {elapsed:.2f}s: {finished.get(Job.DONE, 0)} job(s) done, "
+            f"{finished.get(Job.QUEUED, 0)} to retry, {finished.get(Job.FAILED, 0)} failed."
+        )
@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tutorials import tasks
+from tutorials.jobs import enqueue
+from tutorials.reminders import REMINDER_BATCH_SIZE, REMINDER_INTERVAL_DAYS, overdue_invoices, send_reminders
+
+
+class Command(BaseCommand):
+    """Build automation command to email payment reminders for overdue invoices."""
+
+    help = 'Emails a reminder for every unpaid invoice past its due date that was not reminded recently'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--payment-days', type=int, default=settings.INVOICE_PAYMENT_DAYS,
+            help='Days after issue that an invoice falls due (default: INVOICE_PAYMENT_DAYS)'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=REMINDER_INTERVAL_DAYS,
+            help='Days to wait before reminding about the same invoice again'
+        )
+        parser.add_argument('--batch-size', type=int, default=REMINDER_BATCH_SIZE, help='Messages sent per batch')
+        parser.add_argument('--rate', type=float, default=None, help='Most messages to send per second')
+        parser.add_argument('--dry-run', action='store_true', help='Count the reminders without sending them')
+        parser.add_argument('--queue', action='store_true', help='Queue a job for run_workers to send them instead')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        if options['queue'] and not options['dry_run']:
+            job = enqueue(
+                tasks.send_invoice_reminders, payment_days=options['payment_days'],
+                interval_days=options['interval'], batch_size=options['batch_size'], rate=options['rate']
+            )
+            self.stdout.write(f'Queued invoice reminders as job {job.pk}.')
+            return
+
+        started = time.perf_counter()
+        invoices = overdue_invoices(payment_days=options['payment_days'], interval_days=options['interval'])
+        if options['dry_run']:
+            self.stdout.write(f'Would send {len(invoices)} invoice reminder(s).')
+            return
+
+        sent = send_reminders(
+            invoices, payment_days=options['payment_days'], batch_size=options['batch_size'], rate=options['rate']
+        )
+        elapsed = time.perf_counter() - started
+        rate = sent / elapsed if elapsed else 0
+        self.stdout.write(f'Sent {sent} invoice reminder(s) in {elapsed:.2f}s ({rate:.1f} messages/s).')
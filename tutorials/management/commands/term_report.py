@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.models import Term
+from tutorials.term_reports import REPORT_FORMATS, term_usage, write_term_reports
+
+
+class Command(BaseCommand):
+    """Build automation command to report tutor hours and venue utilization for a term."""
+
+    help = "Writes a workload report per tutor, a tutor summary and a venue utilization report for a term"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', required=True, help='Name of the term to report on')
+        parser.add_argument('-o', '--output', default='reports', help='Directory to write reports to')
+        parser.add_argument('-f', '--format', choices=REPORT_FORMATS, default='csv')
+        parser.add_argument('-w', '--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+
+    def handle(self, *args, **options):
+        try:
+            term = Term.objects.get(name=options['term'])
+        except Term.DoesNotExist:
+            raise CommandError(f"Term '{options['term']}' does not exist.")
+
+        started = time.perf_counter()
+        usage = term_usage(term)
+        aggregated = time.perf_counter()
+        paths = write_term_reports(usage, options['output'], options['format'], workers=options['workers'])
+        finished = time.perf_counter()
+
+        self.stdout.write(
+            f'Reported {usage.hours.sum():.1f} hours over {len(usage.days)} session(s) '
+            f'for {len(usage.tutor_ids)} tutor(s) and {len(usage.venue_ids)} venue(s) in {term.name}: '
+            f'aggregated in {aggregated - started:.2f}s, wrote {len(paths)} file(s) in {finished - aggregated:.2f}s.'
+        )
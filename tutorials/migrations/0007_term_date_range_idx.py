@@ -0,0 +1,30 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:31
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0006_lessonrequest_tutor'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ProgrammingLanguage',
+        ),
+        migrations.DeleteModel(
+            name='Specialization',
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))]),
+        ),
+        migrations.AddIndex(
+            model_name='term',
+            index=models.Index(fields=['end_date', 'start_date'], name='term_date_range_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0007_term_date_range_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TutorAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slots', models.BinaryField(help_text='Packed bitmap of free 15-minute slots in a week.')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tutor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='tutorials.tutorprofile')),
+            ],
+            options={
+                'verbose_name': 'Tutor Availability',
+                'verbose_name_plural': 'Tutor Availabilities',
+            },
+        ),
+    ]
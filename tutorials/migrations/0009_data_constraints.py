@@ -0,0 +1,60 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Duplicate (student, term) pairs listed when the unique constraint cannot be added.
+DUPLICATES_REPORTED = 20
+
+
+def check_duplicate_invoices(apps, schema_editor):
+    """Stop with a report of students invoiced more than once for a term, which the constraint would reject."""
+    Invoice = apps.get_model('tutorials', 'Invoice')
+    duplicates = list(
+        Invoice.objects.using(schema_editor.connection.alias).order_by()
+        .values('student_id', 'term_id').annotate(count=Count('id')).filter(count__gt=1)
+        .order_by('term_id', 'student_id')
+    )
+    if not duplicates:
+        return
+    lines = [
+        f"  student {row['student_id']}, term {row['term_id']}: {row['count']} invoices"
+        for row in duplicates[:DUPLICATES_REPORTED]
+    ]
+    if len(duplicates) > DUPLICATES_REPORTED:
+        lines.append(f'  ... and {len(duplicates) - DUPLICATES_REPORTED} more')
+    raise RuntimeError(
+        f'{len(duplicates)} student(s) have more than one invoice for the same term. Merge or delete '
+        'the duplicates, then run migrate again:\n' + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0008_tutoravailability'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.CheckConstraint(condition=models.Q(('amount__gte', 0)), name='invoice_amount_non_negative', violation_error_message='Amount cannot be negative.'),
+        ),
+        migrations.RunPython(check_duplicate_invoices, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('student', 'term'), name='unique_invoice_per_student_term', violation_error_message='This student already has an invoice for this term.'),
+        ),
+        migrations.AddConstraint(
+            model_name='lesson',
+            constraint=models.CheckConstraint(condition=models.Q(('duration_minutes__gt', 0)), name='lesson_duration_positive', violation_error_message='Duration must be greater than zero.'),
+        ),
+        migrations.AddConstraint(
+            model_name='lessonrequest',
+            constraint=models.CheckConstraint(condition=models.Q(('duration_minutes__gt', 0)), name='lesson_request_duration_positive', violation_error_message='Duration must be greater than zero.'),
+        ),
+        migrations.AddConstraint(
+            model_name='term',
+            constraint=models.CheckConstraint(condition=models.Q(('start_date__lte', models.F('end_date'))), name='term_start_before_end', violation_error_message='Start date must be before end date.'),
+        ),
+    ]
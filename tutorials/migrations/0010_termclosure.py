@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0009_data_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(help_text='Last closed day; the same as the start date for a single day.')),
+                ('reason', models.CharField(blank=True, help_text='e.g. Half term, Bank holiday', max_length=100)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='closures', to='tutorials.term')),
+            ],
+            options={
+                'ordering': ['start_date'],
+                'constraints': [models.CheckConstraint(condition=models.Q(('start_date__lte', models.F('end_date'))), name='term_closure_start_before_end', violation_error_message='Start date must be before end date.')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-19 16:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0010_termclosure'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lesson',
+            name='notes',
+            field=models.TextField(blank=True, help_text='Additional notes for this lesson. Record cancelled or moved sessions as lesson exceptions.'),
+        ),
+        migrations.CreateModel(
+            name='LessonException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_date', models.DateField(help_text='The date the session would have taken place.')),
+                ('cancelled', models.BooleanField(default=False)),
+                ('new_date', models.DateField(blank=True, null=True)),
+                ('new_time', models.TimeField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='tutorials.lesson')),
+                ('new_venue', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tutorials.venue')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('lesson', 'original_date'), name='unique_lesson_exception_per_date', violation_error_message='This session already has an exception.')],
+            },
+        ),
+    ]
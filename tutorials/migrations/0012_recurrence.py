@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-19 17:02
+
+import tutorials.recurrence
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0011_lessonexception'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='recurrence',
+            field=models.CharField(blank=True, help_text='Optional rule overriding the frequency: FREQ=WEEKLY with INTERVAL and BYDAY, e.g. FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH, or a date list such as RDATE=2024-09-02,2024-09-16.', max_length=255, validators=[tutorials.recurrence.validate_recurrence]),
+        ),
+        migrations.AddField(
+            model_name='lessonrequest',
+            name='recurrence',
+            field=models.CharField(blank=True, help_text='Optional rule such as FREQ=WEEKLY;BYDAY=MO,TH, overriding the frequency.', max_length=255, validators=[tutorials.recurrence.validate_recurrence]),
+        ),
+    ]
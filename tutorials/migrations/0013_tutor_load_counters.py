@@ -0,0 +1,95 @@
+# Generated by Django 5.1.2 on 2026-10-19 17:14
+
+from collections import defaultdict
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models import Count
+
+BATCH_SIZE = 500
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+MAX_INTERVAL = 52
+
+
+def sessions_per_week(recurrence, frequency):
+    """Return the average sessions a week of a recurrence rule as stored at this migration, as Rule.per_week() does."""
+    try:
+        if not recurrence.strip():
+            raise ValueError('blank rule')
+        parts = {}
+        for part in recurrence.strip().upper().split(';'):
+            name, _, value = part.partition('=')
+            if not value or name.strip() in parts:
+                raise ValueError(part)
+            parts[name.strip()] = value.strip()
+        if 'RDATE' in parts:
+            if len(parts) > 1:
+                raise ValueError(recurrence)
+            dates = sorted({date.fromisoformat(value.strip()) for value in parts['RDATE'].split(',')})
+            return len(dates) / ((dates[-1] - dates[0]).days // 7 + 1)
+        if set(parts) - {'FREQ', 'INTERVAL', 'BYDAY'} or parts.get('FREQ') != 'WEEKLY':
+            raise ValueError(recurrence)
+        interval = int(parts.get('INTERVAL', '1'))
+        weekdays = {day.strip() for day in parts['BYDAY'].split(',')} if 'BYDAY' in parts else set()
+        if not 1 <= interval <= MAX_INTERVAL or weekdays - set(WEEKDAYS):
+            raise ValueError(recurrence)
+        return max(len(weekdays), 1) / interval
+    except ValueError:
+        # A blank or unreadable rule repeats by the lesson's frequency.
+        return 0.5 if frequency == 'fortnightly' else 1
+
+
+def count_existing_load(apps, schema_editor):
+    """Fill the new counters from the lessons and requests already stored."""
+    alias = schema_editor.connection.alias
+    TutorProfile = apps.get_model('tutorials', 'TutorProfile')
+    Lesson = apps.get_model('tutorials', 'Lesson')
+    LessonRequest = apps.get_model('tutorials', 'LessonRequest')
+
+    totals = defaultdict(lambda: {'active_lessons': 0, 'weekly_minutes': 0, 'pending_requests': 0})
+    lessons = Lesson.objects.using(alias).filter(active=True).values_list(
+        'tutor_id', 'duration_minutes', 'frequency', 'recurrence'
+    )
+    for tutor_id, duration, frequency, recurrence in lessons.iterator(chunk_size=BATCH_SIZE):
+        totals[tutor_id]['active_lessons'] += 1
+        totals[tutor_id]['weekly_minutes'] += round(duration * sessions_per_week(recurrence, frequency))
+    pending = (
+        LessonRequest.objects.using(alias).filter(status='pending', tutor__isnull=False)
+        .values('tutor_id').annotate(count=Count('id')).order_by()
+    )
+    for row in pending:
+        totals[row['tutor_id']]['pending_requests'] = row['count']
+
+    tutors = list(TutorProfile.objects.using(alias).filter(pk__in=list(totals)).only('id'))
+    for tutor in tutors:
+        for counter, value in totals[tutor.pk].items():
+            setattr(tutor, counter, value)
+    TutorProfile.objects.using(alias).bulk_update(
+        tutors, ['active_lessons', 'weekly_minutes', 'pending_requests'], batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0012_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tutorprofile',
+            name='active_lessons',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of active lessons.'),
+        ),
+        migrations.AddField(
+            model_name='tutorprofile',
+            name='pending_requests',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of pending lesson requests for this tutor.'),
+        ),
+        migrations.AddField(
+            model_name='tutorprofile',
+            name='weekly_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Average minutes a week taught across active lessons.'),
+        ),
+        migrations.RunPython(count_existing_load, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.2 on 2026-10-19 17:25
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 500
+
+
+def summarize_existing_invoices(apps, schema_editor):
+    """Fill the summary from the invoices already stored."""
+    alias = schema_editor.connection.alias
+    Invoice = apps.get_model('tutorials', 'Invoice')
+    InvoiceSummary = apps.get_model('tutorials', 'InvoiceSummary')
+
+    paid = Q(paid_date__isnull=False)
+    grouped = (
+        Invoice.objects.using(alias).order_by()
+        .values('term_id', 'issued_date', cohort=F('student__user__date_joined__year'))
+        .annotate(
+            issued_count=Count('id'),
+            issued_amount=Sum('amount'),
+            paid_count=Count('id', filter=paid),
+            paid_amount=Coalesce(Sum('amount', filter=paid), Decimal('0.00')),
+        )
+    )
+    InvoiceSummary.objects.using(alias).bulk_create(
+        [InvoiceSummary(**row) for row in grouped], batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0013_tutor_load_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort', models.PositiveSmallIntegerField(help_text='Year the students joined.')),
+                ('issued_date', models.DateField()),
+                ('issued_count', models.PositiveIntegerField(default=0)),
+                ('issued_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('paid_count', models.PositiveIntegerField(default=0)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoice_summaries', to='tutorials.term')),
+            ],
+            options={
+                'verbose_name_plural': 'Invoice summaries',
+                'constraints': [models.UniqueConstraint(fields=('term', 'cohort', 'issued_date'), name='unique_invoice_summary')],
+            },
+        ),
+        migrations.RunPython(summarize_existing_invoices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-19 17:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0014_invoice_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sent_date', models.DateField()),
+                ('email', models.EmailField(help_text='Address the reminder was sent to.', max_length=254)),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='tutorials.invoice')),
+            ],
+            options={
+                'ordering': ['-sent_date'],
+                'constraints': [models.UniqueConstraint(fields=('invoice', 'sent_date'), name='unique_invoice_reminder_per_day')],
+            },
+        ),
+    ]
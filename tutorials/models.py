@@ -1,11 +1,14 @@
 from django.core.validators import RegexValidator, MinValueValidator
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from libgravatar import Gravatar
 
 from django.conf import settings
 
+from .recurrence import stored_rule, validate_recurrence
+
 from decimal import Decimal
 
 class User(AbstractUser):
@@ -66,6 +69,18 @@ class TutorProfile(models.Model):
     )
     languages = models.TextField(blank=True, help_text="Programming languages this tutor can teach.")
     specializations = models.TextField(blank=True, help_text="Advanced areas this tutor can teach.")
+    # Load counters, kept in step with lesson and request writes by tutorials.loads.
+    active_lessons = models.PositiveIntegerField(default=0, editable=False, help_text="Number of active lessons.")
+    weekly_minutes = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Average minutes a week taught across active lessons."
+    )
+    pending_requests = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of pending lesson requests for this tutor."
+    )
 
     class Meta:
         verbose_name = 'Tutor Profile'
@@ -74,12 +89,40 @@ class TutorProfile(models.Model):
     def __str__(self):
         return f"Tutor: {self.user.full_name()}"
 
+    @property
+    def weekly_hours(self):
+        return round(self.weekly_minutes / 60, 1)
+
+    def load_summary(self):
+        return f"{self.active_lessons} lessons, {self.weekly_hours:g} h/week, {self.pending_requests} pending"
+
     def clean(self):
         super().clean()
         if self.experience_years < 0:
             raise ValidationError({'experience_years': 'Experience years cannot be negative.'})
 
 
+class TutorAvailability(models.Model):
+    """
+    A tutor's weekly free time, stored as a bitmap of 15-minute slots.
+    Bit 0 is Monday 00:00-00:15; see tutorials.availability for helpers.
+    """
+    tutor = models.OneToOneField(
+        TutorProfile,
+        on_delete=models.CASCADE,
+        related_name='availability'
+    )
+    slots = models.BinaryField(help_text="Packed bitmap of free 15-minute slots in a week.")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Tutor Availability'
+        verbose_name_plural = 'Tutor Availabilities'
+
+    def __str__(self):
+        return f"Availability: {self.tutor.user.full_name()}"
+
+
 class StudentProfile(models.Model):
     """
     Additional fields for student users.
@@ -114,14 +157,50 @@ class Term(models.Model):
 
     class Meta:
         ordering = ['start_date']
+        indexes = [
+            # Serves "terms that have not ended yet" lookups without a table scan.
+            models.Index(fields=['end_date', 'start_date'], name='term_date_range_idx'),
+        ]
+        # Enforced by the database too, so bulk writes need not full_clean() each row.
+        # full_clean() still checks it through validate_constraints().
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(start_date__lte=models.F('end_date')),
+                name='term_start_before_end',
+                violation_error_message='Start date must be before end date.',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
-    def clean(self):
-        super().clean()
-        if self.start_date > self.end_date:
-            raise ValidationError('Start date must be before end date.')
+
+class TermClosure(models.Model):
+    """
+    Days within a term when no lessons take place, such as half term or a bank holiday.
+    """
+    term = models.ForeignKey(
+        Term,
+        on_delete=models.CASCADE,
+        related_name='closures'
+    )
+    start_date = models.DateField()
+    end_date = models.DateField(help_text="Last closed day; the same as the start date for a single day.")
+    reason = models.CharField(max_length=100, blank=True, help_text="e.g. Half term, Bank holiday")
+
+    class Meta:
+        ordering = ['start_date']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(start_date__lte=models.F('end_date')),
+                name='term_closure_start_before_end',
+                violation_error_message='Start date must be before end date.',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.reason or 'Closed'}: {self.start_date} to {self.end_date}"
+
     
 class Venue(models.Model):
     """
@@ -138,7 +217,31 @@ class Venue(models.Model):
     def __str__(self):
         return self.name
     
-class LessonRequest(models.Model):
+class TutorLoadMixin:
+    """
+    Remembers what a row counted towards its tutor's load when it was loaded,
+    so that saving it can apply just the difference. See tutorials.loads.
+    """
+    load_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields().intersection(cls.load_fields):
+            instance._counted_load = instance.load()
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The load counters are updated by signals, inside this transaction.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def load(self):
+        """Return (tutor_id, {counter: amount}) this row adds to its tutor's load counters."""
+        raise NotImplementedError
+
+
+class LessonRequest(TutorLoadMixin, models.Model):
     """
     Represents a request from a student for lessons in a given term.
     These requests will be manually handled by the admin team.
@@ -171,6 +274,12 @@ class LessonRequest(models.Model):
         choices=FREQUENCY_CHOICES,
         default='weekly'
     )
+    recurrence = models.CharField(
+        max_length=255,
+        blank=True,
+        validators=[validate_recurrence],
+        help_text="Optional rule such as FREQ=WEEKLY;BYDAY=MO,TH, overriding the frequency."
+    )
     duration_minutes = models.PositiveIntegerField(
         default=60,
         help_text="Duration of each lesson in minutes"
@@ -202,15 +311,25 @@ class LessonRequest(models.Model):
         help_text="Additional notes from the student."
     )
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(duration_minutes__gt=0),
+                name='lesson_request_duration_positive',
+                violation_error_message='Duration must be greater than zero.',
+            ),
+        ]
+
+    load_fields = {'tutor_id', 'status'}
+
     def __str__(self):
         return f"Request by {self.student} for {self.term}"
 
-    def clean(self):
-        super().clean()
-        if self.duration_minutes <= 0:
-            raise ValidationError({'duration_minutes': 'Duration must be greater than zero.'})
+    def load(self):
+        return self.tutor_id, {'pending_requests': 1} if self.status == 'pending' else {}
+
 
-class Lesson(models.Model):
+class Lesson(TutorLoadMixin, models.Model):
     """
     Represents a scheduled lesson in a given term.
     Lessons are typically created by the admin team based on requests.
@@ -259,6 +378,15 @@ class Lesson(models.Model):
         default='weekly',
         help_text="How often the lesson occurs."
     )
+    recurrence = models.CharField(
+        max_length=255,
+        blank=True,
+        validators=[validate_recurrence],
+        help_text=(
+            "Optional rule overriding the frequency: FREQ=WEEKLY with INTERVAL and BYDAY, "
+            "e.g. FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH, or a date list such as RDATE=2024-09-02,2024-09-16."
+        )
+    )
     duration_minutes = models.PositiveIntegerField(
         default=60,
         help_text="Duration of each lesson in minutes."
@@ -269,16 +397,69 @@ class Lesson(models.Model):
     )
     notes = models.TextField(
         blank=True,
-        help_text="Additional notes for this lesson (e.g., cancellations, changes)."
+        help_text="Additional notes for this lesson. Record cancelled or moved sessions as lesson exceptions."
     )
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(duration_minutes__gt=0),
+                name='lesson_duration_positive',
+                violation_error_message='Duration must be greater than zero.',
+            ),
+        ]
+
+    load_fields = {'tutor_id', 'active', 'duration_minutes', 'frequency', 'recurrence', 'start_date'}
+
     def __str__(self):
         return f"Lesson: {self.student.user.full_name()} with {self.tutor.user.full_name()} at {self.venue}"
 
+    def load(self):
+        if not self.active:
+            return self.tutor_id, {}
+        rule = stored_rule(self.recurrence, self.frequency, self.start_date)
+        return self.tutor_id, {'active_lessons': 1, 'weekly_minutes': round(self.duration_minutes * rule.per_week())}
+
+
+class LessonException(models.Model):
+    """
+    A change to one session of a lesson: either cancelled, or moved to a new date, time or venue.
+    """
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name='exceptions'
+    )
+    original_date = models.DateField(help_text="The date the session would have taken place.")
+    cancelled = models.BooleanField(default=False)
+    new_date = models.DateField(null=True, blank=True)
+    new_time = models.TimeField(null=True, blank=True)
+    new_venue = models.ForeignKey(
+        Venue,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['lesson', 'original_date'],
+                name='unique_lesson_exception_per_date',
+                violation_error_message='This session already has an exception.',
+            ),
+        ]
+
+    def __str__(self):
+        change = 'cancelled' if self.cancelled else 'moved'
+        return f"Session on {self.original_date} {change}"
+
     def clean(self):
         super().clean()
-        if self.duration_minutes <= 0:
-            raise ValidationError({'duration_minutes': 'Duration must be greater than zero.'})
+        if not (self.cancelled or self.new_date or self.new_time or self.new_venue_id):
+            raise ValidationError('Cancel the session or give it a new date, time or venue.')
 
 
 class Invoice(models.Model):
@@ -315,11 +496,138 @@ class Invoice(models.Model):
 
     class Meta:
         ordering = ['-issued_date']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(amount__gte=0),
+                name='invoice_amount_non_negative',
+                violation_error_message='Amount cannot be negative.',
+            ),
+            models.UniqueConstraint(
+                fields=['student', 'term'],
+                name='unique_invoice_per_student_term',
+                violation_error_message='This student already has an invoice for this term.',
+            ),
+        ]
+
+    summary_fields = {'term_id', 'student_id', 'issued_date', 'amount', 'paid_date'}
 
     def __str__(self):
         return f"Invoice for {self.student.user.full_name()} - {self.term.name}"
 
-    def clean(self):
-        super().clean()
-        if self.amount < 0:
-            raise ValidationError({'amount': 'Amount cannot be negative.'})
\ No newline at end of file
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the invoice counted for in the finance summary; see tutorials.finance.
+        if not instance.get_deferred_fields().intersection(cls.summary_fields):
+            instance._summarized = instance.summary_entry()
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The finance summary is updated by signals, inside this transaction.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def summary_entry(self):
+        """Return ((term_id, student_id, issued_date), amount, paid) this invoice adds to the finance summary."""
+        return (self.term_id, self.student_id, self.issued_date), self.amount, self.paid_date is not None
+
+
+class InvoiceSummary(models.Model):
+    """
+    Running invoice totals for one term, student cohort and issue date.
+    Kept in step with invoice writes by signals and rebuilt nightly; see tutorials.finance.
+    """
+    term = models.ForeignKey(
+        Term,
+        on_delete=models.CASCADE,
+        related_name='invoice_summaries'
+    )
+    cohort = models.PositiveSmallIntegerField(help_text="Year the students joined.")
+    issued_date = models.DateField()
+    issued_count = models.PositiveIntegerField(default=0)
+    issued_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    paid_count = models.PositiveIntegerField(default=0)
+    paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name_plural = 'Invoice summaries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'cohort', 'issued_date'],
+                name='unique_invoice_summary',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Invoices issued {self.issued_date} to the {self.cohort} cohort for {self.term}"
+
+    @property
+    def outstanding_count(self):
+        return self.issued_count - self.paid_count
+
+    @property
+    def outstanding_amount(self):
+        return self.issued_amount - self.paid_amount
+
+
+class InvoiceReminder(models.Model):
+    """
+    Records a payment reminder emailed for an overdue invoice.
+    Invoices reminded recently are skipped by send_invoice_reminders, so reruns send no duplicates.
+    """
+    invoice = models.ForeignKey(
+        Invoice,
+        on_delete=models.CASCADE,
+        related_name='reminders'
+    )
+    sent_date = models.DateField()
+    email = models.EmailField(help_text="Address the reminder was sent to.")
+
+    class Meta:
+        ordering = ['-sent_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['invoice', 'sent_date'],
+                name='unique_invoice_reminder_per_day',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Reminder for invoice {self.invoice_id} sent {self.sent_date}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work: a registered task and its keyword arguments.
+    Queued with tutorials.jobs.enqueue() and run by the run_workers command.
+    """
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+    task = models.CharField(max_length=200, help_text="Dotted path of the registered task.")
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=[(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')],
+        default=QUEUED
+    )
+    run_at = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run.")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    worker = models.CharField(max_length=100, blank=True, help_text="Worker that last claimed the job.")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Last time the worker running the job reported it was alive."
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True, help_text="Run time of the last attempt.")
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.get_status_display()})"
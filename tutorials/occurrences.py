@@ -0,0 +1,166 @@
+"""
+Expand lessons into the dates they actually take place.
+
+A lesson repeats by its recurrence rule, or every week or fortnight, from
+its start date to the end of its term; see tutorials.recurrence. Days
+the term is closed come from one cached, sorted array of day ordinals
+per term and are masked out of each lesson's dates in a single
+vectorized step, so expanding a timetable costs no queries.
+Cancelled and moved sessions are fetched for a whole batch of lessons
+with one query and merged in as each lesson's dates are walked.
+
+A term's timeline can run to thousands of sessions, so each is a small
+slotted row holding its date and time plus references to details shared
+by every session of its lesson and venue, rather than a copied dict.
+"""
+from collections import namedtuple
+from datetime import date
+from operator import attrgetter
+
+import numpy as np
+
+from . import reference_data
+from .models import LessonException
+from .recurrence import compile_rule, stored_rule
+
+EMPTY = np.zeros(0, dtype=np.int64)
+
+Place = namedtuple('Place', ['venue', 'address', 'room'])
+NO_PLACE = Place('N/A', 'N/A', 'N/A')
+
+
+class LessonDetails:
+    """What every session of one lesson shows, built once per lesson."""
+
+    __slots__ = ('tutor', 'tutor_email', 'student', 'email', 'frequency', 'duration')
+
+    def __init__(self, tutor=None, tutor_email=None, student=None, email=None, frequency=None, duration=None):
+        self.tutor = tutor
+        self.tutor_email = tutor_email
+        self.student = student
+        self.email = email
+        self.frequency = frequency
+        self.duration = duration
+
+
+def _shared(owner, name):
+    return property(lambda session: getattr(getattr(session, owner), name))
+
+
+class Session:
+    """One session on a timeline, reading shared fields from its lesson's details and place."""
+
+    __slots__ = ('date', 'time', 'details', 'place')
+
+    def __init__(self, date, time, details, place):
+        self.date = date
+        self.time = time
+        self.details = details
+        self.place = place
+
+    tutor = _shared('details', 'tutor')
+    tutor_email = _shared('details', 'tutor_email')
+    student = _shared('details', 'student')
+    email = _shared('details', 'email')
+    frequency = _shared('details', 'frequency')
+    duration = _shared('details', 'duration')
+    venue = _shared('place', 'venue')
+    address = _shared('place', 'address')
+    room = _shared('place', 'room')
+
+
+def closed_days(closures, term_id):
+    """Return the sorted ordinals of the term's closed days from term_closures()."""
+
+    return np.asarray(closures.get(term_id, EMPTY), dtype=np.int64)
+
+
+def rule_ordinals(recurrence, frequency, start_date, term):
+    """Return an array of the ordinals of the days a lesson's rule falls on in the term, closed or not."""
+
+    rule = stored_rule(recurrence, frequency, start_date)
+    return compile_rule(str(rule), term.start_date, term.end_date).ordinals(start_date)
+
+
+def open_mask(days, closed):
+    """Return a mask of the days, an array of ordinals, that are not in closed, a sorted array of ordinals."""
+
+    if not (len(closed) and len(days)):
+        return np.ones(len(days), dtype=bool)
+    # closed is sorted, so a binary search finds whether each day is in it.
+    found = np.minimum(np.searchsorted(closed, days), len(closed) - 1)
+    return closed[found] != days
+
+
+def lesson_ordinals(lesson, closures):
+    """Return an array of the ordinals of the lesson's teaching days in its term."""
+
+    days = rule_ordinals(lesson.recurrence, lesson.frequency, lesson.start_date, lesson.term)
+    return days[open_mask(days, closed_days(closures, lesson.term_id))]
+
+
+def lesson_dates(lesson, closures=None):
+    """Return the dates the lesson takes place, skipping days its term is closed."""
+
+    if closures is None:
+        closures = reference_data.term_closures()
+    return [date.fromordinal(int(day)) for day in lesson_ordinals(lesson, closures)]
+
+
+def exceptions_by_lesson(lessons):
+    """Return {lesson_id: {original_date: LessonException}} for a batch of lessons."""
+
+    found = {}
+    exceptions = LessonException.objects.filter(
+        lesson__in=[lesson.pk for lesson in lessons]
+    ).select_related('new_venue')
+    for exception in exceptions:
+        found.setdefault(exception.lesson_id, {})[exception.original_date] = exception
+    return found
+
+
+def lesson_sessions(lesson, closures, exceptions):
+    """
+    Yield (date, time, venue) for each session of the lesson that goes ahead.
+
+    exceptions is the lesson's {original_date: LessonException}; cancelled
+    sessions are skipped and moved ones take their new date, time or venue.
+    """
+    for session_date in lesson_dates(lesson, closures):
+        exception = exceptions.get(session_date)
+        if exception is None:
+            yield session_date, lesson.start_time, lesson.venue
+        elif not exception.cancelled:
+            yield (
+                exception.new_date or session_date,
+                exception.new_time or lesson.start_time,
+                exception.new_venue or lesson.venue,
+            )
+
+
+def place(venue, places):
+    """Return the shared Place for a venue, adding it to the places dict on first use."""
+
+    if venue is None:
+        return NO_PLACE
+    if venue.pk not in places:
+        places[venue.pk] = Place(venue.name, venue.address, venue.room_number)
+    return places[venue.pk]
+
+
+def timeline(lessons, describe):
+    """
+    Return every session of the lessons as Session rows sorted by date and time.
+
+    describe(lesson) returns the LessonDetails shared by the lesson's sessions.
+    """
+    closures = reference_data.term_closures()
+    exceptions = exceptions_by_lesson(lessons)
+    places = {}
+    sessions = []
+    for lesson in lessons:
+        details = describe(lesson)
+        for session_date, session_time, venue in lesson_sessions(lesson, closures, exceptions.get(lesson.pk, {})):
+            sessions.append(Session(session_date, session_time, details, place(venue, places)))
+    sessions.sort(key=attrgetter('date', 'time'))
+    return sessions
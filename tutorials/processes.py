@@ -0,0 +1,29 @@
+"""Spread CPU-bound batch work, such as rendering documents, over worker processes."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+
+
+def setup_worker():
+    """Make sure Django is configured in processes started with 'spawn'."""
+
+    if not apps.ready:
+        django.setup()
+
+
+def map_in_processes(function, jobs, workers=None):
+    """
+    Return [function(job) for job in jobs], run across worker processes.
+
+    workers defaults to the number of CPUs. With one worker, or one job,
+    everything runs in this process. function and the jobs must pickle.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [function(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=setup_worker) as executor:
+        # A few batches per worker keeps them busy without a round trip per job.
+        chunksize = max(1, len(jobs) // (workers * 4))
+        return list(executor.map(function, jobs, chunksize=chunksize))
@@ -0,0 +1,361 @@
+"""
+Tutor recommendations ranked with NumPy.
+
+Each tutor is a row of a feature matrix: normalised experience, spare
+capacity and one column per language or specialization tag. A query is
+scored against every tutor with a single matrix product, then adjusted by
+whether the tutor's availability bitmap fits the requested time. The tag
+columns double as an inverted index: their sums are the facet counts
+shown beside search results.
+
+The matrix lives in process memory. Changes to tutors, their lessons or
+their availability are appended to a change log in the cache, so every
+process refreshes only the rows that changed instead of rebuilding.
+"""
+import re
+import threading
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+from .availability import BYTES_PER_WEEK, SLOT_MINUTES, available_slots, fits, occupancy, week_parity
+from .models import TutorProfile
+from .reference_data import CACHE_TIMEOUT, invalidate, version
+
+CHANGES = 'tutor-vectors'
+MAX_REPLAYED_CHANGES = 1000
+
+EXPERIENCE_CAP = 10
+LOAD_CAP_HOURS = 20
+FIXED_FEATURES = 2  # experience, spare capacity
+TAG_KINDS = ('language', 'specialization')
+FACET_LIMIT = 10
+
+WEIGHT_TAGS = 0.5
+WEIGHT_EXPERIENCE = 0.2
+WEIGHT_SPARE = 0.1
+WEIGHT_AVAILABLE = 0.2
+
+# Number of set bits in every byte value, for counting packed slots.
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1)
+
+_index = None
+_lock = threading.Lock()
+
+
+def tags(text):
+    """Split a free-text list such as 'Python, Django' into lowercase tags."""
+
+    return {tag.strip() for tag in re.split(r'[,;/\n]+', (text or '').lower()) if tag.strip()}
+
+
+def tutor_tags(languages, specializations):
+    """Return a tutor's (kind, tag) pairs."""
+
+    return {('language', tag) for tag in tags(languages)} | {
+        ('specialization', tag) for tag in tags(specializations)}
+
+
+def _change_key(number):
+    return f'recommendations:change:{number}'
+
+
+def tutor_changed(tutor_id):
+    """Append a tutor to the change log so every process refreshes its row."""
+
+    number = invalidate(CHANGES)
+    cache.set(_change_key(number), tutor_id, CACHE_TIMEOUT)
+
+
+def tutor_changed_on_commit(tutor_id):
+    """Record the change once the surrounding transaction commits."""
+
+    transaction.on_commit(lambda: tutor_changed(tutor_id))
+
+
+class TutorIndex:
+    """In-memory feature vectors for every tutor."""
+
+    def __init__(self, version=0):
+        self.version = version
+        self.columns = {}
+        self.ids = []
+        self.id_array = np.zeros(0, dtype=np.int64)
+        self.position = {}
+        self.features = np.zeros((0, FIXED_FEATURES), dtype=np.float32, order='F')
+        self.free = np.zeros((0, 2, BYTES_PER_WEEK), dtype=np.uint8)
+        self.has_availability = np.zeros(0, dtype=bool)
+        self.active = np.zeros(0, dtype=bool)
+        # Active tutors per tag column, kept up to date as rows change.
+        self.tag_counts = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    def update(self, rows, available, taken):
+        """
+        Insert or replace tutors' vectors.
+
+        rows are (id, languages, specializations, experience_years) tuples,
+        available and taken the packed bitmaps aligned with them.
+        """
+        row_tags = [tutor_tags(languages, specializations) for _, languages, specializations, _ in rows]
+        self._grow(
+            [tutor_id for tutor_id, *_ in rows if tutor_id not in self.position],
+            {tag for found in row_tags for tag in found if tag not in self.columns}
+        )
+        positions = np.array([self.position[row[0]] for row in rows], dtype=np.intp)
+        if not len(positions):
+            return
+        hours = POPCOUNT[taken].sum(axis=(1, 2)) * SLOT_MINUTES / 60 / 2
+        experience = np.array([row[3] for row in rows], dtype=np.float32)
+
+        self._count(positions, -1)
+        self.features[positions] = 0
+        self.features[positions, 0] = np.minimum(experience, EXPERIENCE_CAP) / EXPERIENCE_CAP
+        self.features[positions, 1] = 1 - np.minimum(hours, LOAD_CAP_HOURS) / LOAD_CAP_HOURS
+        for position, found in zip(positions, row_tags):
+            self.features[position, [self.columns[tag] for tag in found]] = 1
+        self.free[positions] = available[:, np.newaxis, :] & ~taken
+        self.has_availability[positions] = available.any(axis=1)
+        self.active[positions] = True
+        self._count(positions, 1)
+
+    def remove(self, tutor_ids):
+        """Exclude deleted tutors from results."""
+
+        positions = np.array([self.position[tutor_id] for tutor_id in tutor_ids if tutor_id in self.position],
+                             dtype=np.intp)
+        self._count(positions, -1)
+        self.active[positions] = False
+
+    def _count(self, positions, sign):
+        """Add or subtract the active rows at positions from the tag counts."""
+
+        positions = positions[self.active[positions]]
+        if len(positions):
+            self.tag_counts += sign * self.features[positions, FIXED_FEATURES:].sum(axis=0, dtype=np.int64)
+
+    def _grow(self, new_ids, new_tags):
+        for tag in sorted(new_tags):
+            self.columns[tag] = FIXED_FEATURES + len(self.columns)
+        for tutor_id in new_ids:
+            self.position[tutor_id] = len(self.ids)
+            self.ids.append(tutor_id)
+        rows, columns = len(self.ids) - len(self.features), len(new_tags)
+        if rows or columns:
+            self.features = np.asfortranarray(np.pad(self.features, ((0, rows), (0, columns))))
+            self.tag_counts = np.pad(self.tag_counts, (0, columns))
+        if rows:
+            self.id_array = np.array(self.ids, dtype=np.int64)
+            self.free = np.pad(self.free, ((0, rows), (0, 0), (0, 0)))
+            self.has_availability = np.pad(self.has_availability, (0, rows))
+            self.active = np.pad(self.active, (0, rows))
+
+    def load(self, tutor_ids=None):
+        """Read tutors from the database, all of them or just the given ids."""
+
+        profiles = TutorProfile.objects.all()
+        if tutor_ids is not None:
+            profiles = profiles.filter(id__in=tutor_ids)
+        rows = list(profiles.values_list('id', 'languages', 'specializations', 'experience_years'))
+        if tutor_ids is not None:
+            self.remove(set(tutor_ids) - {row[0] for row in rows})
+        ids = [row[0] for row in rows]
+        self.update(rows, available_slots(ids), occupancy(ids))
+
+    def catch_up(self, current):
+        """Replay the change log up to the current version; False if a full rebuild is needed."""
+
+        if current == self.version:
+            return True
+        if not self.version < current <= self.version + MAX_REPLAYED_CHANGES:
+            return False
+        keys = [_change_key(number) for number in range(self.version + 1, current + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) < len(keys):
+            return False
+        self.load(set(changes.values()))
+        self.version = current
+        return True
+
+    def scores(self, languages='', specializations='', start_date=None, start_time=None,
+               duration_minutes=60, frequency='weekly'):
+        """
+        Return (scores, eligible) arrays over every row of the index.
+
+        Tutors are eligible if they teach at least one requested tag, or
+        all active tutors are when no tags are requested.
+        """
+        wanted = tags(languages) | tags(specializations)
+        known = sorted((column, tag) for (_, tag), column in self.columns.items() if tag in wanted)
+        found = sorted({tag for _, tag in known})
+        # Only the fixed and requested columns carry weight, and the matrix is
+        # column-major, so the product reads just those columns. Each requested
+        # tag gets its own result column, summing its language and
+        # specialization columns.
+        weights = np.zeros((FIXED_FEATURES + len(known), 1 + len(found)), dtype=np.float32)
+        weights[0, 0], weights[1, 0] = WEIGHT_EXPERIENCE, WEIGHT_SPARE
+        for row, (_, tag) in enumerate(known, FIXED_FEATURES):
+            weights[row, 1 + found.index(tag)] = 1
+        result = self.features[:, list(range(FIXED_FEATURES)) + [column for column, _ in known]] @ weights
+        # A tag listed as both a language and a specialization counts once.
+        scores, matched = result[:, 0], np.minimum(result[:, 1:], 1).sum(axis=1)
+        if wanted:
+            scores += WEIGHT_TAGS * matched / len(wanted)
+        else:
+            scores += WEIGHT_TAGS
+
+        if start_time is None:
+            available = np.full(len(self.ids), 0.5, dtype=np.float32)
+        else:
+            weekday = start_date.weekday() if start_date else 0
+            weeks_free = fits(self.free, weekday, start_time, duration_minutes)
+            if frequency == 'fortnightly' and start_date:
+                fit = weeks_free[:, week_parity(start_date)]
+            elif frequency == 'fortnightly':
+                fit = weeks_free.any(axis=1)
+            else:
+                fit = weeks_free.all(axis=1)
+            # Tutors who have not recorded availability are neither favoured nor penalised.
+            available = np.where(self.has_availability, fit.astype(np.float32), 0.5)
+        scores += WEIGHT_AVAILABLE * available
+
+        eligible = self.active & (matched > 0) if wanted else self.active.copy()
+        return scores, eligible
+
+    def containing(self, text, kind):
+        """Return a boolean array of tutors with a tag of the given kind containing text."""
+
+        text = text.strip().lower()
+        columns = [column for (tag_kind, tag), column in self.columns.items() if tag_kind == kind and text in tag]
+        return self.features[:, columns].any(axis=1)
+
+    def matching(self, languages='', specializations='', tutor_ids=None):
+        """Return a boolean array of the active tutors matching a search."""
+
+        eligible = self.active.copy()
+        for kind, text in zip(TAG_KINDS, (languages, specializations)):
+            if text.strip():
+                eligible &= self.containing(text, kind)
+        if tutor_ids is not None:
+            eligible &= np.isin(self.id_array, tutor_ids)
+        return eligible
+
+    def facets(self, eligible=None, limit=FACET_LIMIT):
+        """
+        Return {kind: [(tag, count), ...]} for the most common tags, most common first.
+
+        Without eligible the maintained counts are read directly; otherwise
+        the tag columns are summed over the eligible rows only.
+        """
+        if eligible is None:
+            counts = self.tag_counts
+        elif np.count_nonzero(eligible) * 32 < len(eligible):
+            # Gathering a few rows is cheaper than reading every column in full.
+            counts = self.features[np.flatnonzero(eligible), FIXED_FEATURES:].sum(axis=0)
+        else:
+            counts = eligible.astype(np.float32) @ self.features[:, FIXED_FEATURES:]
+        found = {kind: [] for kind in TAG_KINDS}
+        for (kind, tag), column in self.columns.items():
+            count = int(counts[column - FIXED_FEATURES])
+            if count:
+                found[kind].append((tag, count))
+        return {kind: sorted(pairs, key=lambda pair: (-pair[1], pair[0]))[:limit] for kind, pairs in found.items()}
+
+    def page(self, languages='', specializations='', tutor_ids=None, after=None, limit=20, eligible=None):
+        """
+        Return up to limit (tutor_id, score) pairs ordered by score, then id.
+
+        Tutors must have tags containing each search text, and be among
+        tutor_ids if given, unless the matching array is passed as eligible.
+        after is the (score, tutor_id) of the last row of the previous page,
+        so pages stay stable as the index changes.
+        """
+        if eligible is None:
+            eligible = self.matching(languages, specializations, tutor_ids)
+        scores, _ = self.scores(languages=languages, specializations=specializations)
+        if after is not None:
+            score, tutor_id = after
+            eligible = eligible & ((scores < score) | ((scores == score) & (self.id_array > tutor_id)))
+
+        candidates = np.flatnonzero(eligible)
+        if len(candidates) > limit:
+            # Keep every candidate scoring at least the limit-th best, so ties are broken by id below.
+            threshold = np.partition(-scores[candidates], limit - 1)[limit - 1]
+            candidates = candidates[-scores[candidates] <= threshold]
+        candidates = candidates[np.lexsort((self.id_array[candidates], -scores[candidates]))][:limit]
+        return [(self.ids[position], float(scores[position])) for position in candidates]
+
+    def top(self, k=10, **query):
+        """Return the k best (tutor_id, score) pairs for a query, best first."""
+
+        scores, eligible = self.scores(**query)
+        candidates = np.flatnonzero(eligible)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(self.ids[position], float(scores[position])) for position in candidates]
+
+
+def get_index():
+    """Return this process's index, refreshed with any changes recorded since it was built."""
+
+    global _index
+    current = version(CHANGES)
+    if _index is None or not _index.catch_up(current):
+        index = TutorIndex(current)
+        index.load()
+        _index = index
+    return _index
+
+
+def reset():
+    """Drop this process's index so the next call rebuilds it."""
+
+    global _index
+    with _lock:
+        _index = None
+
+
+def recommend(k=10, **query):
+    """Return the k best (tutor_id, score) pairs for a query."""
+
+    with _lock:
+        return get_index().top(k, **query)
+
+
+def recommend_for_request(lesson_request, k=10):
+    """Return the k best (tutor_id, score) pairs for a lesson request."""
+
+    return recommend(
+        k,
+        languages=lesson_request.requested_languages,
+        specializations=lesson_request.requested_specializations,
+        start_date=lesson_request.requested_start_date,
+        start_time=lesson_request.requested_start_time,
+        duration_minutes=lesson_request.duration_minutes,
+        frequency=lesson_request.frequency,
+    )
+
+
+def search_page(languages='', specializations='', tutor_ids=None, after=None, limit=20):
+    """
+    Return (rows, facets) for one keyset page of search results.
+
+    rows are (tutor_id, score) pairs, best first, and facets count the
+    tags of every matching tutor, not just those on the page.
+    """
+    with _lock:
+        index = get_index()
+        eligible = index.matching(languages, specializations, tutor_ids)
+        rows = index.page(languages, specializations, after=after, limit=limit, eligible=eligible)
+        return rows, index.facets(eligible)
+
+
+def facets():
+    """Return the most common tags across every tutor."""
+
+    with _lock:
+        return get_index().facets()
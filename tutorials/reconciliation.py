@@ -0,0 +1,286 @@
+"""
+Match bank statement lines to unpaid invoices and mark them paid.
+
+Statements are read one line at a time, so memory depends on the number of
+unpaid invoices rather than the length of the statement. Unpaid invoices
+are indexed in dictionaries by invoice number and by (amount, payer name).
+Matched invoices that are still unpaid when the run commits are marked
+paid with a single bulk_update.
+"""
+import csv
+import re
+from collections import defaultdict
+from functools import lru_cache
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import events, finance
+from .models import Invoice
+
+RECONCILE_BATCH_SIZE = 1000
+
+REFERENCE_RE = re.compile(r'(?:invoice|inv)\s*(?:no\.?|number)?\s*#?\s*(\d+)|#\s*(\d+)', re.IGNORECASE)
+OFX_TAG_RE = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y%m%d')
+
+CSV_COLUMNS = {
+    'date': ('date', 'posted', 'transaction date'),
+    'amount': ('amount', 'credit', 'paid in'),
+    'reference': ('reference', 'description', 'memo', 'details'),
+    'name': ('name', 'payer', 'payee', 'counterparty'),
+}
+
+
+class StatementLine:
+    """One credit from a bank statement, or a line that could not be read and the reason why."""
+
+    __slots__ = ('line', 'date', 'amount', 'reference', 'name', 'problem')
+
+    def __init__(self, line, date, amount, reference='', name='', problem=''):
+        self.line = line
+        self.date = date
+        self.amount = amount
+        self.reference = reference
+        self.name = name
+        self.problem = problem
+
+    def __str__(self):
+        date = self.date.isoformat() if self.date else ''
+        amount = self.amount if self.amount is not None else ''
+        return ' '.join(str(part) for part in (date, amount, self.name, self.reference) if part != '')
+
+
+def unreadable(line, error, reference='', name=''):
+    """Return a StatementLine reporting why a statement line could not be read."""
+
+    return StatementLine(line, None, None, reference, name, problem=' '.join(error.messages))
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    """Parse a statement date in any of the supported formats; statements repeat few dates, so results are cached."""
+
+    value = value.strip()
+    for format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, format).date()
+        except ValueError:
+            continue
+    raise ValidationError(f"'{value}' is not a recognised date.")
+
+
+def parse_amount(value):
+    """Parse an amount such as '1,250.00' or '£80' into a Decimal."""
+
+    try:
+        return Decimal(re.sub(r'[^\d.\-]', '', value))
+    except InvalidOperation:
+        raise ValidationError(f"'{value}' is not a valid amount.")
+
+
+def name_keys(name):
+    """
+    Return normalised forms of a name for matching.
+
+    Tokens are lowercased and sorted, so 'SMITH JOHN' matches 'John Smith',
+    and an initial form such as 'j smith' is included for statements that
+    abbreviate first names.
+    """
+    tokens = re.findall(r'[a-z]+', name.lower())
+    if not tokens:
+        return set()
+    keys = {' '.join(sorted(tokens))}
+    if len(tokens) > 1:
+        keys.add(' '.join(sorted([tokens[0][0], tokens[-1]])))
+    return keys
+
+
+def invoice_numbers(reference):
+    """Return the invoice numbers quoted in a payment reference."""
+
+    return {int(first or second) for first, second in REFERENCE_RE.findall(reference)}
+
+
+def read_csv(file):
+    """Yield StatementLines from a bank CSV export, skipping debits."""
+
+    reader = csv.DictReader(file)
+    headers = {(header or '').strip().lower(): header for header in reader.fieldnames or ()}
+    columns = {}
+    for column, aliases in CSV_COLUMNS.items():
+        columns[column] = next((headers[alias] for alias in aliases if alias in headers), None)
+    missing = [column for column in ('date', 'amount') if columns[column] is None]
+    if missing:
+        raise ValidationError(f"Missing CSV columns: {', '.join(missing)}")
+
+    for line, row in enumerate(reader, start=2):
+        values = {column: (row.get(header) or '') if header else '' for column, header in columns.items()}
+        try:
+            amount = parse_amount(values['amount']) if values['amount'].strip() else Decimal('0')
+            if amount > 0:
+                yield StatementLine(line, parse_date(values['date']), amount, values['reference'], values['name'])
+        except ValidationError as error:
+            yield unreadable(line, error, values['reference'], values['name'])
+
+
+def read_ofx(file):
+    """Yield StatementLines from an OFX (SGML or XML) statement, skipping debits."""
+
+    transaction_fields = None
+    for line, text in enumerate(file, start=1):
+        for closing, tag, value in OFX_TAG_RE.findall(text):
+            tag = tag.upper()
+            if tag == 'STMTTRN' and not closing:
+                transaction_fields = {'line': line}
+            elif tag == 'STMTTRN' and transaction_fields is not None:
+                reference, name = transaction_fields.get('MEMO', ''), transaction_fields.get('NAME', '')
+                try:
+                    amount = parse_amount(transaction_fields.get('TRNAMT', '0'))
+                    if amount > 0:
+                        # OFX dates are YYYYMMDD, optionally followed by a time and zone.
+                        date = parse_date(transaction_fields.get('DTPOSTED', '')[:8])
+                        yield StatementLine(transaction_fields['line'], date, amount, reference, name)
+                except ValidationError as error:
+                    yield unreadable(transaction_fields['line'], error, reference, name)
+                transaction_fields = None
+            elif transaction_fields is not None and not closing:
+                transaction_fields[tag] = value.strip()
+
+
+def read_statement(file, name=''):
+    """Pick the reader for a statement file by its name, or by sniffing its first line."""
+
+    if name.lower().endswith(('.ofx', '.qfx')):
+        return read_ofx(file)
+    if name.lower().endswith('.csv'):
+        return read_csv(file)
+    first = file.readline()
+    file.seek(0)
+    return read_ofx(file) if first.lstrip().startswith(('OFXHEADER', '<?xml', '<OFX')) else read_csv(file)
+
+
+class InvoiceIndex:
+    """Unpaid invoices keyed by number and by (amount, payer name)."""
+
+    def __init__(self, invoices=None):
+        self.amounts = {}
+        self.students = {}
+        self.keys = defaultdict(list)
+        self.by_amount_and_name = defaultdict(set)
+        rows = invoices if invoices is not None else (
+            Invoice.objects.filter(paid_date__isnull=True)
+            .values_list('id', 'amount', 'student_id', 'student__user__first_name', 'student__user__last_name')
+            .iterator(chunk_size=RECONCILE_BATCH_SIZE)
+        )
+        for invoice_id, amount, student_id, first_name, last_name in rows:
+            self.amounts[invoice_id] = amount
+            self.students[invoice_id] = student_id
+            for key in name_keys(f'{first_name} {last_name}'):
+                self.keys[invoice_id].append((amount, key))
+                self.by_amount_and_name[amount, key].add(invoice_id)
+
+    def remove(self, invoice_id):
+        """Drop a matched invoice so a second payment cannot match it."""
+
+        del self.amounts[invoice_id]
+        for key in self.keys.pop(invoice_id, ()):
+            self.by_amount_and_name[key].discard(invoice_id)
+
+    def match(self, statement_line):
+        """Return (invoice_id, None) for a unique match, (None, reason) otherwise."""
+
+        numbers = invoice_numbers(statement_line.reference)
+        quoted = [number for number in numbers if number in self.amounts]
+        if len(quoted) > 1:
+            return None, f"quotes several unpaid invoices: {', '.join(f'#{n}' for n in sorted(quoted))}"
+        if quoted:
+            number = quoted[0]
+            if self.amounts[number] != statement_line.amount:
+                return None, f'amount differs from invoice #{number} ({self.amounts[number]})'
+            return number, None
+
+        candidates = set()
+        for key in name_keys(statement_line.name):
+            candidates |= self.by_amount_and_name.get((statement_line.amount, key), set())
+        if len(candidates) > 1:
+            return None, f"matches several unpaid invoices: {', '.join(f'#{n}' for n in sorted(candidates))}"
+        if candidates:
+            return candidates.pop(), None
+        if numbers:
+            return None, f"quotes invoice {', '.join(f'#{n}' for n in sorted(numbers))}, which is not unpaid"
+        return None, None
+
+
+class ReconciliationResult:
+    """Matched invoices, ambiguous statement lines and a count of unmatched ones."""
+
+    def __init__(self):
+        self.paid = {}
+        self.ambiguous = []
+        self.unmatched = 0
+
+    def write_report(self, file):
+        """Write the ambiguous lines as CSV."""
+
+        writer = csv.writer(file)
+        writer.writerow(['line', 'transaction', 'problem'])
+        writer.writerows(self.ambiguous)
+
+
+def reconcile(lines, dry_run=False, index=None):
+    """
+    Match statement lines to unpaid invoices and mark the matches paid.
+
+    Lines that fit more than one invoice, quote an invoice with a different
+    amount or cannot be read are reported rather than guessed at, as are
+    matches whose invoice was paid some other way while the statement was
+    being read.
+    """
+    index = index or InvoiceIndex()
+    result = ReconciliationResult()
+    matched = {}
+    for statement_line in lines:
+        if statement_line.problem:
+            result.ambiguous.append((statement_line.line, str(statement_line), statement_line.problem))
+            continue
+        invoice_id, problem = index.match(statement_line)
+        if invoice_id is not None:
+            result.paid[invoice_id] = statement_line.date
+            matched[invoice_id] = statement_line
+            index.remove(invoice_id)
+        elif problem:
+            result.ambiguous.append((statement_line.line, str(statement_line), problem))
+        else:
+            result.unmatched += 1
+
+    if not dry_run and result.paid:
+        with transaction.atomic():
+            ids = list(result.paid)
+            unpaid = set()
+            for start in range(0, len(ids), RECONCILE_BATCH_SIZE):
+                unpaid.update(
+                    Invoice.objects.select_for_update()
+                    .filter(pk__in=ids[start:start + RECONCILE_BATCH_SIZE], paid_date__isnull=True)
+                    .values_list('pk', flat=True)
+                )
+            for invoice_id in sorted(result.paid.keys() - unpaid, key=lambda invoice_id: matched[invoice_id].line):
+                statement_line = matched[invoice_id]
+                result.ambiguous.append(
+                    (statement_line.line, str(statement_line), f'invoice #{invoice_id} was already paid')
+                )
+                del result.paid[invoice_id]
+
+            invoices = [Invoice(pk=invoice_id, paid_date=paid_date) for invoice_id, paid_date in result.paid.items()]
+            Invoice.objects.bulk_update(invoices, ['paid_date'], batch_size=RECONCILE_BATCH_SIZE)
+            # bulk_update sends no signals, so count the payments and notify the students' open dashboards here.
+            finance.record_payments(result.paid)
+            for invoice_id, paid_date in result.paid.items():
+                # publish() waits for this transaction to commit.
+                events.publish(
+                    [events.student_channel(index.students[invoice_id])],
+                    'invoice', id=invoice_id, paid_date=paid_date, deleted=False
+                )
+    return result
@@ -0,0 +1,157 @@
+"""
+Recurrence rules for lessons, a small subset of iCalendar RRULE.
+
+A rule is either weekly, such as ``FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH``,
+or a fixed list of dates, such as ``RDATE=2024-09-02,2024-09-16``. A rule
+is compiled once per term into an array of candidate day ordinals. The
+compiled rules are kept in an LRU cache keyed by the rule text and the
+term's bounds, so every lesson that shares a pattern reuses the same
+arrays and only applies its own start date.
+"""
+import logging
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+from django.core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+MAX_INTERVAL = 52
+RULE_CACHE_SIZE = 1024
+
+
+class Rule:
+    """A parsed rule: every interval weeks on the given weekdays, or on fixed dates."""
+
+    def __init__(self, interval=1, weekdays=(), dates=()):
+        self.interval = interval
+        self.weekdays = tuple(sorted(set(weekdays)))
+        self.dates = tuple(sorted(set(dates)))
+
+    def __str__(self):
+        if self.dates:
+            return 'RDATE=' + ','.join(day.isoformat() for day in self.dates)
+        text = 'FREQ=WEEKLY'
+        if self.interval > 1:
+            text += f';INTERVAL={self.interval}'
+        if self.weekdays:
+            text += ';BYDAY=' + ','.join(WEEKDAYS[weekday] for weekday in self.weekdays)
+        return text
+
+    def on(self, weekday):
+        """Return this rule repeating on the given weekday if it names none of its own."""
+
+        if self.dates or self.weekdays:
+            return self
+        return Rule(self.interval, [weekday])
+
+    def per_week(self):
+        """Return the average number of sessions a week, over the weeks a date list spans."""
+
+        if self.dates:
+            return len(self.dates) / ((self.dates[-1] - self.dates[0]).days // 7 + 1)
+        return max(len(self.weekdays), 1) / self.interval
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def parse_rule(text):
+    """Parse rule text into a Rule, raising ValidationError if it is not supported."""
+
+    parts = {}
+    for part in text.strip().upper().split(';'):
+        name, _, value = part.partition('=')
+        if not value or name in parts:
+            raise ValidationError(f'Malformed recurrence rule part: {part!r}.')
+        parts[name.strip()] = value.strip()
+
+    if 'RDATE' in parts:
+        if len(parts) > 1:
+            raise ValidationError('RDATE cannot be combined with other rule parts.')
+        try:
+            return Rule(dates=[date.fromisoformat(value.strip()) for value in parts['RDATE'].split(',')])
+        except ValueError:
+            raise ValidationError('RDATE must be a comma-separated list of YYYY-MM-DD dates.')
+
+    unknown = set(parts) - {'FREQ', 'INTERVAL', 'BYDAY'}
+    if unknown:
+        raise ValidationError(f"Unsupported recurrence rule parts: {', '.join(sorted(unknown))}.")
+    if parts.get('FREQ') != 'WEEKLY':
+        raise ValidationError('Only FREQ=WEEKLY rules are supported.')
+    try:
+        interval = int(parts.get('INTERVAL', '1'))
+    except ValueError:
+        interval = 0
+    if not 1 <= interval <= MAX_INTERVAL:
+        raise ValidationError(f'INTERVAL must be a whole number from 1 to {MAX_INTERVAL}.')
+    weekdays = [value.strip() for value in parts['BYDAY'].split(',')] if 'BYDAY' in parts else []
+    if any(weekday not in WEEKDAYS for weekday in weekdays):
+        raise ValidationError(f"BYDAY must list days from {', '.join(WEEKDAYS)}.")
+    return Rule(interval, [WEEKDAYS.index(weekday) for weekday in weekdays])
+
+
+def validate_recurrence(text):
+    """Model field validator for recurrence rule text."""
+
+    if text:
+        parse_rule(text)
+
+
+def lesson_rule(recurrence, frequency, start_date):
+    """Return the Rule a lesson or request repeats by, falling back to its frequency."""
+
+    if recurrence:
+        rule = parse_rule(recurrence)
+    else:
+        rule = Rule(2 if frequency == 'fortnightly' else 1)
+    return rule.on(start_date.weekday())
+
+
+def stored_rule(recurrence, frequency, start_date):
+    """
+    Return lesson_rule() for a saved lesson, falling back to its frequency if its rule no longer parses.
+
+    Rules are validated when saved, but one written before a rule part was
+    dropped, or by raw SQL, must not break every page that reads it.
+    """
+    try:
+        return lesson_rule(recurrence, frequency, start_date)
+    except ValidationError:
+        logger.warning('Ignoring invalid recurrence rule %r; repeating by frequency instead.', recurrence)
+        return lesson_rule('', frequency, start_date)
+
+
+class CompiledRule:
+    """The days a rule can fall on within a term, shared by every lesson using it."""
+
+    def __init__(self, rule, term_start, term_end):
+        first, last = term_start.toordinal(), term_end.toordinal()
+        self.interval = rule.interval
+        # Weeks are counted from the Monday of the term's first week.
+        self.monday = first - term_start.weekday()
+        if rule.dates:
+            days = np.array([day.toordinal() for day in rule.dates], dtype=np.int64)
+            days = days[(days >= first) & (days <= last)]
+        else:
+            days = np.arange(first, last + 1, dtype=np.int64)
+            days = days[np.isin((days - self.monday) % 7, rule.weekdays)]
+        self.days = days
+        self.weeks = (days - self.monday) // 7
+        self.days.flags.writeable = self.weeks.flags.writeable = False
+
+    def ordinals(self, start_date):
+        """Return the ordinals of the days on or after start_date, in step with its week."""
+
+        start = start_date.toordinal()
+        mask = self.days >= start
+        if self.interval > 1:
+            mask &= (self.weeks - (start - self.monday) // 7) % self.interval == 0
+        return self.days[mask]
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def compile_rule(text, term_start, term_end):
+    """Return the CompiledRule for rule text within a term's bounds."""
+
+    return CompiledRule(parse_rule(text), term_start, term_end)
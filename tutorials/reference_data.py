@@ -0,0 +1,103 @@
+"""Cached, version-stamped reference data (terms, closures and venues) for forms, the admin and timetables."""
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils import timezone
+
+from .models import Term, TermClosure, Venue
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+TERM_FIELDS = ('id', 'name', 'start_date', 'end_date')
+VENUE_FIELDS = ('id', 'name', 'address', 'room_number', 'capacity')
+
+
+def _version_key(name):
+    return f'reference-data:{name}:version'
+
+
+def version(name):
+    """Return the current version stamp of a reference data set."""
+
+    key = _version_key(name)
+    current = cache.get(key)
+    if current is None:
+        cache.add(key, 1, timeout=None)
+        current = cache.get(key, 1)
+    return current
+
+
+def versions(names):
+    """Return the version stamps of several data sets with one cache round trip."""
+
+    stamps = cache.get_many([_version_key(name) for name in names])
+    return {name: stamps.get(_version_key(name), 1) for name in names}
+
+
+def invalidate(name):
+    """Bump the version stamp so every cached copy of the data set goes stale, returning the new stamp."""
+
+    key = _version_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+        return 2
+
+
+def invalidate_on_commit(name):
+    """
+    Invalidate a data set once the current transaction commits.
+
+    Invalidating before the commit would let a concurrent read cache the
+    rows as they were, under the new stamp, until the next change.
+    """
+    transaction.on_commit(lambda: invalidate(name))
+
+
+def _cached(name, suffix, load):
+    key = f'reference-data:{name}:{version(name)}:{suffix}'
+    rows = cache.get(key)
+    if rows is None:
+        rows = load()
+        cache.set(key, rows, CACHE_TIMEOUT)
+    return rows
+
+
+def all_terms():
+    """Return (id, name, start_date, end_date) tuples for every term, oldest first."""
+
+    return _cached('term', 'all', lambda: list(Term.objects.values_list(*TERM_FIELDS)))
+
+
+def current_terms(today=None):
+    """Return terms that have not ended yet, using the term date-range index."""
+
+    today = today or timezone.localdate()
+    return _cached(
+        'term', f'current:{today.isoformat()}',
+        lambda: list(Term.objects.filter(end_date__gte=today).values_list(*TERM_FIELDS))
+    )
+
+
+def term_closures():
+    """Return {term_id: sorted tuple of closed day ordinals} for every term with closures."""
+
+    def load():
+        closed = {}
+        for term_id, start, end in TermClosure.objects.values_list('term_id', 'start_date', 'end_date'):
+            closed.setdefault(term_id, set()).update(range(start.toordinal(), end.toordinal() + 1))
+        return {term_id: tuple(sorted(days)) for term_id, days in closed.items()}
+
+    return _cached('closure', 'all', load)
+
+
+def all_venues():
+    """Return (id, name, address, room_number, capacity) tuples for every venue."""
+
+    return _cached('venue', 'all', lambda: list(Venue.objects.values_list(*VENUE_FIELDS)))
+
+
+def term_from_row(row):
+    """Build a Term instance from a cached row without querying the database."""
+
+    return Term.from_db(router.db_for_read(Term), TERM_FIELDS, row)
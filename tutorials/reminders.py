@@ -0,0 +1,94 @@
+"""
+Payment reminders for overdue invoices.
+
+Overdue invoices are read with their student's name and email in one
+joined query, which also leaves out invoices reminded within the last
+interval. The reminder template is compiled once and rendered per
+invoice, and messages are sent in batches over a single backend
+connection, as send_mass_mail() does, optionally throttled to a number
+of messages per second. Each batch is recorded in the InvoiceReminder
+log once it has been sent, so a rerun after a failure does not remind
+anyone in an earlier batch twice; the batch that failed is not recorded,
+so up to one batch of reminders may be sent again.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import Invoice, InvoiceReminder
+
+REMINDER_TEMPLATE = 'emails/invoice_reminder.txt'
+REMINDER_BATCH_SIZE = 100
+REMINDER_INTERVAL_DAYS = 14
+
+REMINDER_FIELDS = (
+    'id', 'amount', 'issued_date', 'term__name',
+    'student__user__first_name', 'student__user__last_name', 'student__user__email',
+)
+
+
+def overdue_invoices(today=None, payment_days=None, interval_days=REMINDER_INTERVAL_DAYS):
+    """Return plain dicts for unpaid invoices past their due date and not reminded within interval_days."""
+
+    today = today or timezone.localdate()
+    payment_days = settings.INVOICE_PAYMENT_DAYS if payment_days is None else payment_days
+    return list(
+        Invoice.objects
+        .filter(paid_date__isnull=True, issued_date__lte=today - timedelta(days=payment_days))
+        .exclude(student__user__email='')
+        .exclude(reminders__sent_date__gt=today - timedelta(days=interval_days))
+        .order_by('pk')
+        .values(*REMINDER_FIELDS)
+    )
+
+
+def reminder_message(template, invoice, payment_days, connection):
+    """Return the reminder EmailMessage for one overdue invoice row."""
+
+    body = template.render({'invoice': invoice, 'due_date': invoice['issued_date'] + timedelta(days=payment_days)})
+    return EmailMessage(
+        f"Reminder: invoice #{invoice['id']} for {invoice['term__name']} is overdue",
+        body,
+        settings.DEFAULT_FROM_EMAIL,
+        [invoice['student__user__email']],
+        connection=connection,
+    )
+
+
+def send_reminders(invoices, today=None, payment_days=None, batch_size=REMINDER_BATCH_SIZE, rate=None,
+                   connection=None):
+    """
+    Email a reminder for each invoice row over one connection, in batches of batch_size.
+
+    With rate set, sending waits between batches so that no more than rate
+    messages go out per second. Returns the number of reminders the
+    backend reports as sent.
+    """
+    today = today or timezone.localdate()
+    payment_days = settings.INVOICE_PAYMENT_DAYS if payment_days is None else payment_days
+    template = get_template(REMINDER_TEMPLATE)
+    connection = connection or get_connection()
+    started = time.monotonic()
+    sent = 0
+    connection.open()
+    try:
+        for start in range(0, len(invoices), batch_size):
+            batch = invoices[start:start + batch_size]
+            if rate and sent:
+                time.sleep(max(0.0, started + sent / rate - time.monotonic()))
+            delivered = connection.send_messages(
+                [reminder_message(template, invoice, payment_days, connection) for invoice in batch]
+            )
+            InvoiceReminder.objects.bulk_create(
+                [InvoiceReminder(invoice_id=invoice['id'], sent_date=today, email=invoice['student__user__email'])
+                 for invoice in batch],
+                ignore_conflicts=True,
+            )
+            sent += delivered or 0
+    finally:
+        connection.close()
+    return sent
@@ -0,0 +1,151 @@
+"""Copy a term's active lessons into the next term, skipping anything that would clash."""
+from datetime import timedelta
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import events
+from .availability import SLOTS_PER_WEEK, rule_weekdays, slot_range
+from .loads import count_created
+from .models import Lesson
+from .recommendations import tutor_changed_on_commit
+from .recurrence import Rule, parse_rule, stored_rule
+
+ROLLOVER_BATCH_SIZE = 1000
+
+
+def first_weekday_on_or_after(day, weekday):
+    """Return the first date on or after day that falls on the given weekday."""
+
+    return day + timedelta(days=(weekday - day.weekday()) % 7)
+
+
+def shift_recurrence(recurrence, offset, term):
+    """
+    Return a recurrence moved by offset into term, or None if nothing is left.
+
+    Weekly rules carry over as they are. Fixed RDATE dates are moved by
+    the same number of weeks as the lesson's start, and those that land
+    outside the term are dropped.
+    """
+    if not recurrence:
+        return recurrence
+    try:
+        rule = parse_rule(recurrence)
+    except ValidationError:
+        # Copies repeat by frequency, as stored_rule() treats the original.
+        return ''
+    if not rule.dates:
+        return recurrence
+    dates = [day + offset for day in rule.dates if term.start_date <= day + offset <= term.end_date]
+    return str(Rule(dates=dates)) if dates else None
+
+
+class Timetable:
+    """Slots booked by each tutor or student over the two-week cycle."""
+
+    def __init__(self):
+        self.booked = {}
+
+    def _weeks(self, key):
+        if key not in self.booked:
+            self.booked[key] = np.zeros((2, SLOTS_PER_WEEK), dtype=bool)
+        return self.booked[key]
+
+    @staticmethod
+    def _windows(lesson):
+        rule = stored_rule(lesson.recurrence, lesson.frequency, lesson.start_date)
+        for weekday, weeks in rule_weekdays(rule, lesson.start_date):
+            yield weeks, *slot_range(weekday, lesson.start_time, lesson.duration_minutes)
+
+    def clashes(self, key, lesson):
+        booked = self._weeks(key)
+        return any(booked[weeks, first:stop].any() for weeks, first, stop in self._windows(lesson))
+
+    def book(self, key, lesson):
+        booked = self._weeks(key)
+        for weeks, first, stop in self._windows(lesson):
+            booked[weeks, first:stop] = True
+
+
+def plan_rollover(from_term, to_term):
+    """
+    Return (new_lessons, skipped) for copying from_term's active lessons into to_term.
+
+    New lessons are unsaved and start on the same weekday in the new term,
+    with any fixed dates moved along with them. skipped holds (lesson, reason)
+    pairs for lessons that fall outside the term or would double-book their
+    tutor or student.
+    """
+    timetable = Timetable()
+    existing = Lesson.objects.filter(term=to_term, active=True).only(
+        'tutor_id', 'student_id', 'start_date', 'start_time', 'duration_minutes', 'frequency', 'recurrence'
+    )
+    for lesson in existing.iterator(chunk_size=ROLLOVER_BATCH_SIZE):
+        timetable.book(('tutor', lesson.tutor_id), lesson)
+        timetable.book(('student', lesson.student_id), lesson)
+
+    lessons = (
+        Lesson.objects.filter(term=from_term, active=True)
+        .select_related('tutor__user', 'student__user', 'venue')
+        .order_by('start_date', 'start_time', 'id')
+    )
+    new_lessons, skipped = [], []
+    for lesson in lessons.iterator(chunk_size=ROLLOVER_BATCH_SIZE):
+        start_date = first_weekday_on_or_after(to_term.start_date, lesson.start_date.weekday())
+        recurrence = shift_recurrence(lesson.recurrence, start_date - lesson.start_date, to_term)
+        new_lesson = Lesson(
+            request_id=lesson.request_id,
+            tutor=lesson.tutor,
+            student=lesson.student,
+            term=to_term,
+            venue=lesson.venue,
+            start_date=start_date,
+            start_time=lesson.start_time,
+            frequency=lesson.frequency,
+            recurrence=recurrence or '',
+            duration_minutes=lesson.duration_minutes,
+        )
+        if new_lesson.start_date > to_term.end_date:
+            skipped.append((lesson, 'falls after the end of the term'))
+        elif recurrence is None:
+            skipped.append((lesson, 'none of its dates fall in the term'))
+        elif timetable.clashes(('tutor', lesson.tutor_id), new_lesson):
+            skipped.append((lesson, 'tutor is already booked'))
+        elif timetable.clashes(('student', lesson.student_id), new_lesson):
+            skipped.append((lesson, 'student is already booked'))
+        else:
+            timetable.book(('tutor', lesson.tutor_id), new_lesson)
+            timetable.book(('student', lesson.student_id), new_lesson)
+            new_lessons.append(new_lesson)
+    return new_lessons, skipped
+
+
+def rollover(from_term, to_term):
+    """Create the planned lessons with one bulk insert in a single transaction."""
+
+    new_lessons, skipped = plan_rollover(from_term, to_term)
+    with transaction.atomic():
+        Lesson.objects.bulk_create(new_lessons, batch_size=ROLLOVER_BATCH_SIZE)
+        # bulk_create sends no signals, so count the new lessons, refresh the tutors'
+        # recommendation vectors and tell open dashboards about them here, once per person.
+        count_created(new_lessons)
+        for tutor_id in {lesson.tutor_id for lesson in new_lessons}:
+            tutor_changed_on_commit(tutor_id)
+        channels = {events.tutor_channel(lesson.tutor_id) for lesson in new_lessons}
+        channels |= {events.student_channel(lesson.student_id) for lesson in new_lessons}
+        if channels:
+            events.publish(sorted(channels), 'lesson', id=None, deleted=False)
+    return new_lessons, skipped
+
+
+def describe(lesson):
+    """Describe a lesson on one line for the rollover diff."""
+
+    venue = f' at {lesson.venue}' if lesson.venue else ''
+    return (
+        f'{lesson.student.user.full_name()} with {lesson.tutor.user.full_name()}, '
+        f'{lesson.start_date:%a} {lesson.start_time:%H:%M} from {lesson.start_date.isoformat()} '
+        f'({lesson.frequency}, {lesson.duration_minutes} min){venue}'
+    )
@@ -0,0 +1,103 @@
+"""
+Keyset-paginated tutor search with cached result cards.
+
+Results are ordered by relevance from the recommendation index, then by
+id. A page is addressed by the (score, id) of the previous page's last
+row rather than an offset, so each page costs the same however deep it
+is. Each tutor's card HTML is cached under the tutor's card version,
+which signals bump when the profile or its user changes. Facet counts of
+the languages and specializations among all results come from the same
+index, without reading any profile text.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+
+from . import reference_data
+from .models import TutorProfile
+from .recommendations import facets, search_page
+
+SEARCH_PAGE_SIZE = 20
+CARD_TEMPLATE = 'partials/tutor_card.html'
+
+
+class SearchPage:
+    """The cards of one page of results, the cursor for the next page, if any, and facet counts."""
+
+    def __init__(self, tutor_ids, cards, next_cursor, facets=None):
+        self.tutor_ids = tutor_ids
+        self.cards = cards
+        self.next_cursor = next_cursor
+        self.facets = facets or {}
+
+    def __bool__(self):
+        return bool(self.cards)
+
+
+def format_cursor(score, tutor_id):
+    return f'{score!r}_{tutor_id}'
+
+
+def parse_cursor(value):
+    """Return the (score, tutor_id) encoded in a cursor, or None if it is missing or malformed."""
+
+    try:
+        score, tutor_id = (value or '').split('_')
+        return float(score), int(tutor_id)
+    except ValueError:
+        return None
+
+
+def card_name(tutor_id):
+    return f'tutor-card:{tutor_id}'
+
+
+def invalidate_card(tutor_id):
+    """Make the tutor's cached card stale once the surrounding transaction commits."""
+
+    transaction.on_commit(lambda: reference_data.invalidate(card_name(tutor_id)))
+
+
+def render_cards(tutor_ids):
+    """Return the result card HTML for each tutor, rendering and caching only stale cards."""
+
+    versions = reference_data.versions([card_name(tutor_id) for tutor_id in tutor_ids])
+    keys = {tutor_id: f'{card_name(tutor_id)}:{versions[card_name(tutor_id)]}' for tutor_id in tutor_ids}
+    cards = cache.get_many(keys.values())
+    missing = [tutor_id for tutor_id in tutor_ids if keys[tutor_id] not in cards]
+    if missing:
+        profiles = TutorProfile.objects.select_related('user').in_bulk(missing)
+        rendered = {
+            keys[tutor_id]: render_to_string(CARD_TEMPLATE, {'tutor': profile})
+            for tutor_id, profile in profiles.items()
+        }
+        cache.set_many(rendered, reference_data.CACHE_TIMEOUT)
+        cards.update(rendered)
+    return [cards[keys[tutor_id]] for tutor_id in tutor_ids if keys[tutor_id] in cards]
+
+
+def search_tutors(q_name='', q_language='', q_specialization='', after=None, page_size=SEARCH_PAGE_SIZE):
+    """
+    Return a SearchPage of tutors matching the search.
+
+    If nothing was searched for, the page is empty and its facets count
+    every tutor.
+    """
+    if not (q_name or q_language or q_specialization):
+        return SearchPage([], [], None, facets())
+    tutor_ids = None
+    if q_name:
+        tutor_ids = list(TutorProfile.objects.filter(
+            Q(user__first_name__icontains=q_name) |
+            Q(user__last_name__icontains=q_name) |
+            Q(user__username__icontains=q_name)
+        ).values_list('id', flat=True))
+    # Ask for one extra row to learn whether there is a next page.
+    rows, counts = search_page(q_language, q_specialization, tutor_ids, parse_cursor(after), page_size + 1)
+    next_cursor = None
+    if len(rows) > page_size:
+        last_id, last_score = rows[page_size - 1]
+        next_cursor = format_cursor(last_score, last_id)
+    page_ids = [tutor_id for tutor_id, _ in rows[:page_size]]
+    return SearchPage(page_ids, render_cards(page_ids), next_cursor, counts)
@@ -0,0 +1,133 @@
+"""Signal receivers that keep caches and derived data in step with model changes."""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import events, finance, loads, recommendations, reference_data, search
+from .models import (
+    Invoice, Lesson, LessonException, LessonRequest, Term, TermClosure, TutorAvailability, TutorProfile, User, Venue
+)
+
+
+@receiver([post_save, post_delete], sender=Term)
+def invalidate_terms(sender, **kwargs):
+    """Drop cached term choices when a term changes."""
+    reference_data.invalidate_on_commit('term')
+
+
+@receiver([post_save, post_delete], sender=TermClosure)
+def invalidate_closures(sender, **kwargs):
+    """Drop cached closed days when a term closure changes."""
+    reference_data.invalidate_on_commit('closure')
+
+
+@receiver([post_save, post_delete], sender=Venue)
+def invalidate_venues(sender, **kwargs):
+    """Drop cached venue choices when a venue changes."""
+    reference_data.invalidate_on_commit('venue')
+
+
+@receiver([post_save, post_delete], sender=TutorProfile)
+def refresh_tutor_vector(sender, instance, **kwargs):
+    """Refresh a tutor's recommendation vector and search card when their profile changes."""
+    recommendations.tutor_changed_on_commit(instance.pk)
+    search.invalidate_card(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def refresh_tutor_card(sender, instance, update_fields=None, **kwargs):
+    """Re-render a tutor's search card when their name or email changes."""
+    if update_fields == frozenset({'last_login'}):
+        return
+    for tutor_id in TutorProfile.objects.filter(user=instance).values_list('id', flat=True):
+        search.invalidate_card(tutor_id)
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+@receiver([post_save, post_delete], sender=TutorAvailability)
+def refresh_tutor_load(sender, instance, **kwargs):
+    """Refresh a tutor's load and free time when their lessons or availability change."""
+    for tutor_id in loads.tutors(instance):
+        recommendations.tutor_changed_on_commit(tutor_id)
+
+
+@receiver([pre_save, pre_delete], sender=Lesson)
+@receiver([pre_save, pre_delete], sender=LessonRequest)
+def remember_tutor_load(sender, instance, raw=False, **kwargs):
+    """Learn what a lesson or request counted towards its tutor's load before it changes."""
+    if not raw:
+        loads.remember(instance)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_save, sender=LessonRequest)
+def count_tutor_load(sender, instance, raw=False, **kwargs):
+    """Apply a saved lesson or request's change in load to its tutors' counters."""
+    if not raw:
+        loads.saved(instance)
+
+
+@receiver(post_delete, sender=Lesson)
+@receiver(post_delete, sender=LessonRequest)
+def uncount_tutor_load(sender, instance, **kwargs):
+    """Take a deleted lesson or request off its tutor's counters."""
+    loads.deleted(instance)
+
+
+@receiver([pre_save, pre_delete], sender=Invoice)
+def remember_invoice_totals(sender, instance, raw=False, **kwargs):
+    """Learn what an invoice counted towards the finance summary before it changes."""
+    if not raw:
+        finance.remember(instance)
+
+
+@receiver(post_save, sender=Invoice)
+def count_invoice_totals(sender, instance, raw=False, **kwargs):
+    """Apply a saved invoice's change in totals to the finance summary."""
+    if not raw:
+        finance.saved(instance)
+
+
+@receiver(post_delete, sender=Invoice)
+def uncount_invoice_totals(sender, instance, **kwargs):
+    """Take a deleted invoice off the finance summary."""
+    finance.deleted(instance)
+
+
+@receiver([post_save, post_delete], sender=LessonRequest)
+def push_lesson_request(sender, instance, **kwargs):
+    """Tell the student's and tutors' open dashboards about a request's status."""
+    events.publish(
+        [events.student_channel(instance.student_id)]
+        + [events.tutor_channel(tutor_id) for tutor_id in loads.tutors(instance)],
+        'lesson_request', id=instance.pk, status=instance.status, deleted='created' not in kwargs
+    )
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def push_lesson(sender, instance, **kwargs):
+    """Tell the student's and tutors' open dashboards their timetable changed, including a tutor it moved from."""
+    events.publish(
+        [events.student_channel(instance.student_id)]
+        + [events.tutor_channel(tutor_id) for tutor_id in loads.tutors(instance)],
+        'lesson', id=instance.pk, deleted='created' not in kwargs
+    )
+
+
+@receiver([post_save, post_delete], sender=LessonException)
+def push_lesson_exception(sender, instance, **kwargs):
+    """Tell the student's and tutor's open dashboards a session was cancelled or moved."""
+    lesson = Lesson.objects.filter(pk=instance.lesson_id).values('student_id', 'tutor_id').first()
+    if lesson:
+        events.publish(
+            [events.student_channel(lesson['student_id']), events.tutor_channel(lesson['tutor_id'])],
+            'lesson', id=instance.lesson_id, deleted=False
+        )
+
+
+@receiver([post_save, post_delete], sender=Invoice)
+def push_invoice(sender, instance, **kwargs):
+    """Tell the student's open dashboard about a new, changed or paid invoice."""
+    events.publish(
+        [events.student_channel(instance.student_id)],
+        'invoice', id=instance.pk, paid_date=instance.paid_date, deleted='created' not in kwargs
+    )
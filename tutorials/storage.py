@@ -0,0 +1,56 @@
+"""Static file storage that fingerprints and pre-compresses collected assets."""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are skipped if the package is not installed
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.map')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes .gz and .br variants of text assets.
+
+    Until collectstatic has written a manifest (development and tests), file
+    names are served unhashed instead of raising a missing manifest error.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    @property
+    def hashed_names(self):
+        """The fingerprinted names in the manifest, as a set rebuilt only when the manifest changes."""
+
+        key = (id(self.hashed_files), len(self.hashed_files))
+        if getattr(self, '_hashed_names_key', None) != key:
+            self._hashed_names = frozenset(self.hashed_files.values()) - self.hashed_files.keys()
+            self._hashed_names_key = key
+        return self._hashed_names
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in list(paths) + list(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                self.compress(name)
+
+    def compress(self, name):
+        """Write gzip and brotli copies of a file next to it, if they are smaller."""
+
+        with self.open(name) as file:
+            content = file.read()
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) < len(content):
+                with open(self.path(name + suffix), 'wb') as file:
+                    file.write(compressed)
@@ -0,0 +1,39 @@
+"""Background tasks that workers run from the job queue; see tutorials.jobs."""
+from . import finance, loads
+from .invoice_documents import pdf_renderer_available, render_invoices
+from .jobs import task
+from .models import Term
+from .reminders import REMINDER_BATCH_SIZE, REMINDER_INTERVAL_DAYS, overdue_invoices, send_reminders
+from .term_reports import term_usage, write_term_reports
+
+
+@task
+def send_invoice_reminders(payment_days=None, interval_days=REMINDER_INTERVAL_DAYS, batch_size=REMINDER_BATCH_SIZE,
+                           rate=None):
+    """Email reminders for every overdue invoice not reminded recently."""
+    invoices = overdue_invoices(payment_days=payment_days, interval_days=interval_days)
+    return send_reminders(invoices, payment_days=payment_days, batch_size=batch_size, rate=rate)
+
+
+@task
+def render_term_invoices(term_id, output_dir='invoices'):
+    """Render a term's invoice documents; the worker is itself one process of a pool, so use one process."""
+    return render_invoices(Term.objects.get(pk=term_id), output_dir, workers=1, pdf=pdf_renderer_available())
+
+
+@task
+def write_term_report(term_id, output_dir='reports', format='csv'):
+    """Write a term's tutor hours and venue utilization reports."""
+    write_term_reports(term_usage(Term.objects.get(pk=term_id)), output_dir, format=format, workers=1)
+
+
+@task
+def rebuild_finance_summary():
+    """Recompute the invoice summary; see tutorials.finance."""
+    finance.rebuild()
+
+
+@task
+def recount_tutor_load():
+    """Repair the tutors' load counters; see tutorials.loads."""
+    loads.recount()
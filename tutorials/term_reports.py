@@ -0,0 +1,221 @@
+"""
+Term reports of tutor workload and venue utilization.
+
+A term's active lessons are read with one values() query and their
+exceptions with another, then every session is expanded into parallel
+NumPy arrays: day ordinal, start minute, duration, tutor and venue. The
+tutor x week hours and venue x weekday x hour booked minutes are each
+aggregated with a single bincount, so no Python loop runs per session.
+A report file is then written per tutor, plus a tutor summary and a venue
+utilization report, in parallel across a process pool.
+"""
+import csv
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+from django.template.loader import render_to_string
+
+from . import reference_data
+from .models import Lesson, LessonException
+from .occurrences import EMPTY, closed_days, open_mask, rule_ordinals
+from .processes import map_in_processes
+
+REPORT_TEMPLATE = 'term_report.html'
+REPORT_FORMATS = ('csv', 'html')
+WEEKDAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+HOUR_STARTS = np.arange(24) * 60
+
+LESSON_FIELDS = (
+    'id', 'tutor_id', 'venue_id', 'start_date', 'start_time', 'duration_minutes', 'frequency', 'recurrence',
+    'tutor__user__first_name', 'tutor__user__last_name', 'venue__name',
+)
+EXCEPTION_FIELDS = ('lesson_id', 'original_date', 'cancelled', 'new_date', 'new_time', 'new_venue_id', 'new_venue__name')
+
+
+def minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+class TermUsage:
+    """
+    The sessions of a term's lessons as parallel arrays, and the matrices aggregated from them.
+
+    hours and sessions are tutor x week; booked is venue x weekday x hour
+    in minutes, and utilization divides it by the minutes each hour is
+    open over the term.
+    """
+
+    def __init__(self, term, lessons, exceptions, closed):
+        self.term = term
+        self.monday = term.start_date.toordinal() - term.start_date.weekday()
+        self.weeks = (term.end_date.toordinal() - self.monday) // 7 + 1
+        self.tutors = {row['tutor_id']: f"{row['tutor__user__first_name']} {row['tutor__user__last_name']}"
+                       for row in lessons}
+        self.venues = {row['venue_id']: row['venue__name'] for row in lessons if row['venue_id']}
+        self.venues.update(
+            (row['new_venue_id'], row['new_venue__name']) for row in exceptions if row['new_venue_id']
+        )
+        self.expand(lessons, exceptions, closed)
+        self.aggregate(closed)
+
+    def expand(self, lessons, exceptions, closed):
+        """Fill the session arrays, skipping closed days and applying cancelled and moved sessions."""
+        parts = [
+            rule_ordinals(row['recurrence'], row['frequency'], row['start_date'], self.term) for row in lessons
+        ]
+        counts = [len(days) for days in parts]
+        days = np.concatenate(parts) if parts else EMPTY
+        lesson = np.repeat(np.arange(len(lessons)), counts)
+        minute = np.repeat([minute_of_day(row['start_time']) for row in lessons], counts).astype(np.int64)
+        duration = np.repeat([row['duration_minutes'] for row in lessons], counts).astype(np.int64)
+        tutor = np.repeat([row['tutor_id'] for row in lessons], counts).astype(np.int64)
+        venue = np.repeat([row['venue_id'] or 0 for row in lessons], counts).astype(np.int64)
+
+        keep = open_mask(days, closed)
+        lesson, days, minute, duration, tutor, venue = (
+            array[keep] for array in (lesson, days, minute, duration, tutor, venue)
+        )
+
+        if exceptions:
+            # Sessions are ordered by lesson, then day, so one sorted key finds every exception's session.
+            key = lesson * 2 ** 22 + days
+            position = {row['id']: index for index, row in enumerate(lessons)}
+            wanted = np.array([position[row['lesson_id']] * 2 ** 22 + row['original_date'].toordinal()
+                               for row in exceptions], dtype=np.int64)
+            found = np.minimum(np.searchsorted(key, wanted), max(len(key) - 1, 0))
+            keep = np.ones(len(days), dtype=bool)
+            for row, index, matched in zip(exceptions, found, key[found] == wanted if len(key) else []):
+                if not matched:
+                    continue
+                if row['cancelled']:
+                    keep[index] = False
+                    continue
+                if row['new_date']:
+                    days[index] = row['new_date'].toordinal()
+                if row['new_time']:
+                    minute[index] = minute_of_day(row['new_time'])
+                if row['new_venue_id']:
+                    venue[index] = row['new_venue_id']
+            # A session moved outside the term is not counted in it.
+            keep &= (days >= self.monday) & (days < self.monday + self.weeks * 7)
+            days, minute, duration, tutor, venue = (array[keep] for array in (days, minute, duration, tutor, venue))
+
+        self.days, self.minute, self.duration, self.tutor, self.venue = days, minute, duration, tutor, venue
+
+    def aggregate(self, closed):
+        """Sum the sessions into the tutor x week and venue x weekday x hour matrices."""
+        self.tutor_ids = np.array(sorted(self.tutors), dtype=np.int64)
+        tutor = np.searchsorted(self.tutor_ids, self.tutor)
+        week = (self.days - self.monday) // 7
+        cells = tutor * self.weeks + week
+        shape = (len(self.tutor_ids), self.weeks)
+        self.sessions = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape)
+        self.hours = np.bincount(cells, weights=self.duration / 60, minlength=shape[0] * shape[1]).reshape(shape)
+
+        self.venue_ids = np.array(sorted(self.venues), dtype=np.int64)
+        booked = self.venue > 0
+        venue = np.searchsorted(self.venue_ids, self.venue[booked])
+        weekday = (self.days[booked] - self.monday) % 7
+        start = self.minute[booked][:, np.newaxis]
+        end = np.minimum(start + self.duration[booked][:, np.newaxis], 24 * 60)
+        # Minutes of each session falling in each hour of its day, sessions x 24.
+        overlap = np.clip(np.minimum(end, HOUR_STARTS + 60) - np.maximum(start, HOUR_STARTS), 0, 60)
+        cells = ((venue * 7 + weekday) * 24)[:, np.newaxis] + np.arange(24)
+        shape = (len(self.venue_ids), 7, 24)
+        self.booked = np.bincount(
+            cells.ravel(), weights=overlap.ravel(), minlength=shape[0] * 7 * 24
+        ).reshape(shape)
+
+        first, last = self.term.start_date.toordinal(), self.term.end_date.toordinal()
+        term_days = np.arange(first, last + 1, dtype=np.int64)
+        term_days = term_days[open_mask(term_days, closed)]
+        open_minutes = np.bincount((term_days - self.monday) % 7, minlength=7) * 60
+        self.utilization = np.divide(
+            self.booked, open_minutes[:, np.newaxis], out=np.zeros(shape), where=open_minutes[:, np.newaxis] > 0
+        )
+
+    def week_start(self, week):
+        return date.fromordinal(self.monday + week * 7)
+
+    def tutor_report(self, index):
+        """Return the title, header and rows of one tutor's report."""
+        tutor_id = int(self.tutor_ids[index])
+        rows = [
+            [self.week_start(week).isoformat(), int(self.sessions[index, week]), f'{self.hours[index, week]:.2f}']
+            for week in range(self.weeks)
+        ]
+        rows.append(['Total', int(self.sessions[index].sum()), f'{self.hours[index].sum():.2f}'])
+        return {
+            'title': f'{self.tutors[tutor_id]} - {self.term.name}',
+            'header': ['Week starting', 'Sessions', 'Hours'],
+            'rows': rows,
+        }
+
+    def summary_report(self):
+        """Return the title, header and rows of the report of every tutor's hours."""
+        rows = [
+            [self.tutors[int(tutor_id)], int(self.sessions[index].sum()), f'{self.hours[index].sum():.2f}',
+             f'{self.hours[index].mean():.2f}', f'{self.hours[index].max():.2f}']
+            for index, tutor_id in enumerate(self.tutor_ids)
+        ]
+        return {
+            'title': f'Tutor hours - {self.term.name}',
+            'header': ['Tutor', 'Sessions', 'Hours', 'Mean hours / week', 'Busiest week hours'],
+            'rows': rows,
+        }
+
+    def venue_report(self):
+        """Return the title, header and rows of the venue utilization report, one row per booked hour."""
+        rows = [
+            [self.venues[int(self.venue_ids[venue])], WEEKDAY_NAMES[weekday], f'{hour:02d}:00',
+             f'{self.booked[venue, weekday, hour] / 60:.2f}', f'{self.utilization[venue, weekday, hour]:.1%}']
+            for venue, weekday, hour in zip(*np.nonzero(self.booked))
+        ]
+        return {
+            'title': f'Venue utilization - {self.term.name}',
+            'header': ['Venue', 'Weekday', 'Hour', 'Booked hours', 'Utilization'],
+            'rows': rows,
+        }
+
+
+def term_usage(term):
+    """Return the TermUsage of a term's active lessons, read with two queries."""
+
+    lessons = list(Lesson.objects.filter(term=term, active=True).order_by('pk').values(*LESSON_FIELDS))
+    exceptions = list(
+        LessonException.objects.filter(lesson__term=term, lesson__active=True).values(*EXCEPTION_FIELDS)
+    ) if lessons else []
+    return TermUsage(term, lessons, exceptions, closed_days(reference_data.term_closures(), term.pk))
+
+
+def write_report(job):
+    """Write one report as CSV or HTML; runs in a worker process."""
+
+    path, context = job
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.html':
+        path.write_text(render_to_string(REPORT_TEMPLATE, context))
+    else:
+        with path.open('w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(context['header'])
+            writer.writerows(context['rows'])
+    return path
+
+
+def write_term_reports(usage, output_dir, format='csv', workers=None):
+    """
+    Write a report per tutor under tutors/, plus tutors and venues summaries, into output_dir.
+
+    Returns the paths written.
+    """
+    output_dir = Path(output_dir)
+    jobs = [(output_dir / f'tutors.{format}', usage.summary_report()),
+            (output_dir / f'venues.{format}', usage.venue_report())]
+    jobs += [
+        (output_dir / 'tutors' / f'tutor-{tutor_id}.{format}', usage.tutor_report(index))
+        for index, tutor_id in enumerate(usage.tutor_ids)
+    ]
+
+    return map_in_processes(write_report, jobs, workers)
@@ -1,6 +1,7 @@
 """Tests for LessonRequestForm."""
 from django.test import TestCase
-from datetime import time, date
+from datetime import date, timedelta
+from django.core.cache import cache
 from tutorials.forms import LessonRequestForm
 from tutorials.models import Term
 
@@ -8,11 +9,11 @@ class LessonRequestFormTestCase(TestCase):
     """Test suite for LessonRequestForm."""
 
     def setUp(self):
-        # Create a sample Term for form tests
+        # Create a sample Term for form tests; only current and upcoming terms can be chosen
         self.term = Term.objects.create(
             name="Spring 2025",
-            start_date=date(2025, 4, 1),
-            end_date=date(2025, 6, 30)
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=90)
         )
 
     def test_form_is_valid_with_minimum_data(self):
@@ -70,3 +71,31 @@ class LessonRequestFormTestCase(TestCase):
         }
         form = LessonRequestForm(data=form_data)
         self.assertFalse(form.is_valid(), "Form should be invalid if requested_start_date is blank.")
+
+    def test_form_only_offers_current_and_upcoming_terms(self):
+        past_term = Term.objects.create(
+            name="Autumn 2000",
+            start_date=date(2000, 9, 1),
+            end_date=date(2000, 12, 15)
+        )
+        form = LessonRequestForm()
+        choices = [value for value, _ in form.fields['term'].choices]
+        self.assertIn(self.term.id, choices)
+        self.assertNotIn(past_term.id, choices)
+        form = LessonRequestForm(data={'term': past_term.id})
+        self.assertIn('term', form.errors)
+
+    def test_term_choices_are_cached_until_a_term_changes(self):
+        cache.clear()
+        list(LessonRequestForm().fields['term'].choices)
+        with self.assertNumQueries(0):
+            form = LessonRequestForm(data={'term': self.term.id})
+            list(form.fields['term'].choices)
+            self.assertEqual(form.fields['term'].clean(self.term.id), self.term)
+        self.term.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term.save()
+            # Until the rename commits, other readers keep the cached choices.
+            self.assertEqual(dict(LessonRequestForm().fields['term'].choices)[self.term.id], "Spring 2025")
+        choices = dict(LessonRequestForm().fields['term'].choices)
+        self.assertEqual(choices[self.term.id], "Renamed")
@@ -0,0 +1,138 @@
+"""Tests for the bulk_import management command and admin upload."""
+import csv
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.imports import LessonRequestImporter, StudentImporter, TutorImporter
+from tutorials.models import StudentProfile, TutorProfile, Term, Venue, LessonRequest
+
+User = get_user_model()
+
+def csv_text(header, rows):
+    out = StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+class BulkImportCommandTestCase(TestCase):
+    """Test suite for the bulk_import command and importers."""
+
+    def setUp(self):
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 1), end_date=date(2024, 12, 15))
+        self.venue = Venue.objects.create(name='Lab 101')
+        tutor_user = User.objects.create_user(username='@tutorsam', email='sam@example.org', is_student=False, is_tutor=True)
+        self.tutor = TutorProfile.objects.create(user=tutor_user)
+        student_user = User.objects.create_user(username='@studentjo', email='jo@example.org')
+        self.student = StudentProfile.objects.create(user=student_user)
+
+    def test_imports_students_with_profiles(self):
+        data = csv_text(
+            ['username', 'email', 'first_name', 'last_name', 'contact_number'],
+            [['@alice', 'alice@example.org', 'Alice', 'Smith', '0123'],
+             ['@bobby', 'bob@example.org', 'Bob', 'Jones', '']]
+        )
+        result = StudentImporter().run(StringIO(data))
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors, [])
+        alice = User.objects.get(username='@alice')
+        self.assertTrue(alice.is_student)
+        self.assertFalse(alice.has_usable_password())
+        self.assertEqual(alice.student_profile.contact_number, '0123')
+
+    def test_imports_tutors(self):
+        data = csv_text(
+            ['username', 'email', 'first_name', 'last_name', 'languages', 'experience_years'],
+            [['@carol', 'carol@example.org', 'Carol', 'King', 'Python', '4']]
+        )
+        result = TutorImporter().run(StringIO(data))
+        self.assertEqual(result.created, 1)
+        carol = User.objects.get(username='@carol')
+        self.assertTrue(carol.is_tutor)
+        self.assertEqual(carol.tutor_profile.experience_years, 4)
+
+    def test_reports_invalid_and_duplicate_rows(self):
+        data = csv_text(
+            ['username', 'email', 'first_name', 'last_name'],
+            [['@studentjo', 'new@example.org', 'Jo', 'Again'],
+             ['bad', 'bad@example.org', 'Bad', 'Name'],
+             ['@dave', 'not-an-email', 'Dave', 'Day'],
+             ['@erin', 'erin@example.org', 'Erin', 'Ek'],
+             ['@erin', 'erin2@example.org', 'Erin', 'Twice']]
+        )
+        result = StudentImporter().run(StringIO(data))
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _ in result.errors], [2, 3, 4, 6])
+        self.assertIn('username', result.errors[0][1])
+
+    def test_imports_lesson_requests_with_one_lookup_per_batch(self):
+        rows = [
+            ['@studentjo', '@tutorsam', 'Autumn 2024', 'Lab 101', '2024-09-02', '10:00', 'Python', '45']
+            for _ in range(50)
+        ]
+        rows.append(['@studentjo', '@nobody', 'Autumn 2024', '', '2024-09-02', '10:00', 'Python', '0'])
+        data = csv_text(
+            ['student', 'tutor', 'term', 'venue', 'requested_start_date', 'requested_start_time',
+             'requested_languages', 'duration_minutes'],
+            rows
+        )
+        # Student, tutor, term and venue lookups, then one insert and one counter update
+        # between SAVEPOINT and RELEASE.
+        with self.assertNumQueries(8):
+            result = LessonRequestImporter(batch_size=100).run(StringIO(data))
+        self.assertEqual(result.created, 50)
+        self.assertEqual(result.errors[0][0], 52)
+        self.assertIn('tutor: @nobody does not exist.', result.errors[0][1])
+        lesson_request = LessonRequest.objects.first()
+        self.assertEqual(lesson_request.requested_venue, self.venue)
+        self.assertEqual(lesson_request.duration_minutes, 45)
+        self.assertEqual(lesson_request.status, 'pending')
+
+    def test_rows_breaking_database_constraints_are_reported(self):
+        rows = [
+            ['@studentjo', '@tutorsam', 'Autumn 2024', '2024-09-02', '10:00', duration]
+            for duration in ('60', '0', '30')
+        ]
+        data = csv_text(
+            ['student', 'tutor', 'term', 'requested_start_date', 'requested_start_time', 'duration_minutes'], rows
+        )
+        result = LessonRequestImporter().run(StringIO(data))
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors, [(3, 'Duration must be greater than zero.')])
+        self.assertEqual(sorted(LessonRequest.objects.values_list('duration_minutes', flat=True)), [30, 60])
+
+    def test_command_writes_error_report(self):
+        data = csv_text(['username', 'email', 'first_name', 'last_name'], [['bad', 'x@example.org', 'X', 'Y']])
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write(data)
+        with tempfile.NamedTemporaryFile(suffix='.csv') as errors:
+            out = StringIO()
+            call_command('bulk_import', 'students', file.name, '--errors', errors.name, stdout=out)
+            report = list(csv.reader(open(errors.name)))
+        self.assertEqual(report[0], ['line', 'error'])
+        self.assertEqual(report[1][0], '2')
+        self.assertIn('rejected 1 row(s)', out.getvalue())
+
+    def test_command_rejects_missing_columns(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('username\n@someone\n')
+        with self.assertRaises(CommandError):
+            call_command('bulk_import', 'students', file.name, stdout=StringIO())
+
+    def test_admin_upload_imports_rows(self):
+        User.objects.create_superuser(username='@admin', email='admin@example.org', password='Password123')
+        self.client.login(username='@admin', password='Password123')
+        url = reverse('admin:tutorials_studentprofile_import')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        data = csv_text(['username', 'email', 'first_name', 'last_name'], [['@frank', 'frank@example.org', 'Frank', 'Fox']])
+        response = self.client.post(url, {'csv_file': SimpleUploadedFile('students.csv', data.encode())})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(StudentProfile.objects.filter(user__username='@frank').exists())
@@ -0,0 +1,90 @@
+"""Tests for the export_data management command and admin export actions."""
+import csv
+import os
+import tempfile
+from datetime import date, time
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import StudentProfile, TutorProfile, Term, Venue, Lesson, Invoice
+
+User = get_user_model()
+
+class ExportDataCommandTestCase(TestCase):
+    """Test suite for the export_data command."""
+
+    def setUp(self):
+        student_user = User.objects.create_user(
+            username='@studentjo',
+            first_name='Jo',
+            last_name='Student',
+            email='jo@example.org'
+        )
+        tutor_user = User.objects.create_user(
+            username='@tutorsam',
+            first_name='Sam',
+            last_name='Tutor',
+            email='sam@example.org'
+        )
+        self.student = StudentProfile.objects.create(user=student_user)
+        self.tutor = TutorProfile.objects.create(user=tutor_user)
+        self.autumn = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 1), end_date=date(2024, 12, 15))
+        self.spring = Term.objects.create(name='Spring 2025', start_date=date(2025, 1, 6), end_date=date(2025, 4, 1))
+        venue = Venue.objects.create(name='Lab 101')
+        Invoice.objects.create(student=self.student, term=self.autumn, amount=120)
+        Invoice.objects.create(student=self.student, term=self.spring, amount=240)
+        Lesson.objects.create(
+            tutor=self.tutor, student=self.student, term=self.autumn, venue=venue,
+            start_date=date(2024, 9, 2), start_time=time(10, 0)
+        )
+
+    def _export(self, *args):
+        out = StringIO()
+        call_command('export_data', *args, stdout=out)
+        return list(csv.reader(StringIO(out.getvalue())))
+
+    def test_exports_invoices_with_header(self):
+        rows = self._export('invoices')
+        self.assertEqual(rows[0][:3], ['Invoice ID', 'Student', 'Student email'])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][1], 'Jo Student')
+
+    def test_filters_by_term(self):
+        rows = self._export('invoices', '--term', 'Spring 2025')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][3], 'Spring 2025')
+        self.assertEqual(rows[1][4], '240.00')
+
+    def test_resolves_names_by_join(self):
+        with self.assertNumQueries(1):
+            rows = self._export('lessons')
+        self.assertEqual(rows[1][1:5], ['Jo Student', 'Sam Tutor', 'Autumn 2024', 'Lab 101'])
+
+    def test_unknown_term_raises_error(self):
+        with self.assertRaises(CommandError):
+            self._export('invoices', '--term', 'Nope')
+
+    def test_xlsx_without_openpyxl_leaves_no_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'invoices.xlsx')
+            with patch('tutorials.management.commands.export_data.xlsx_available', return_value=False):
+                with self.assertRaisesMessage(CommandError, 'openpyxl'):
+                    call_command('export_data', 'invoices', '--format', 'xlsx', '-o', output)
+            self.assertFalse(os.path.exists(output))
+
+    def test_admin_action_streams_csv(self):
+        User.objects.create_superuser(username='@admin', email='admin@example.org', password='Password123')
+        self.client.login(username='@admin', password='Password123')
+        response = self.client.post(reverse('admin:tutorials_invoice_changelist'), {
+            'action': 'export_as_csv',
+            '_selected_action': list(Invoice.objects.values_list('pk', flat=True)),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(list(csv.reader(StringIO(content)))), 3)
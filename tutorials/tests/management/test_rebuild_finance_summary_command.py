@@ -0,0 +1,41 @@
+"""Tests for the rebuild_finance_summary management command and the admin invoice summary."""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import Invoice, InvoiceSummary, StudentProfile, Term
+
+User = get_user_model()
+
+
+class RebuildFinanceSummaryCommandTestCase(TestCase):
+    """Test suite for rebuilding and showing the invoice summary."""
+
+    def setUp(self):
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 12, 15))
+        for name, amount, paid_date in (('john', '100.00', None), ('jane', '60.00', date(2024, 10, 1))):
+            user = User.objects.create_user(username=f'@{name}', email=f'{name}@example.org')
+            student = StudentProfile.objects.create(user=user)
+            Invoice.objects.create(student=student, term=self.term, amount=Decimal(amount), paid_date=paid_date)
+
+    def test_command_rebuilds_the_summary(self):
+        InvoiceSummary.objects.update(issued_count=0, paid_amount=0)
+        out = StringIO()
+        call_command('rebuild_finance_summary', stdout=out)
+        self.assertIn('Rebuilt 1 invoice summary row(s), 1 changed', out.getvalue())
+        summary = InvoiceSummary.objects.get()
+        self.assertEqual((summary.issued_count, summary.issued_amount), (2, Decimal('160.00')))
+        self.assertEqual((summary.paid_count, summary.paid_amount), (1, Decimal('60.00')))
+
+    def test_admin_shows_the_summary(self):
+        User.objects.create_superuser(username='@admin', email='admin@example.org', password='Password123')
+        self.client.login(username='@admin', password='Password123')
+        response = self.client.get(reverse('admin:tutorials_invoice_summary'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Autumn 2024')
+        self.assertEqual(response.context['aging'][0][1:], (1, Decimal('100.00')))
+        self.assertContains(self.client.get(reverse('admin:tutorials_invoice_changelist')), 'Summary')
@@ -0,0 +1,166 @@
+"""Tests for the reconcile_payments management command and admin upload."""
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import InvoiceSummary, StudentProfile, Term, Invoice
+from tutorials.reconciliation import InvoiceIndex, read_csv, read_ofx, reconcile
+
+User = get_user_model()
+
+OFX = '''OFXHEADER:100
+DATA:OFXSGML
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20250110120000[0:GMT]
+<TRNAMT>150.00
+<NAME>SMITH J
+<MEMO>Lessons
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20250111
+<TRNAMT>-20.00
+<NAME>Bank fee
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+'''
+
+
+class ReconcilePaymentsCommandTestCase(TestCase):
+    """Test suite for bank statement reconciliation."""
+
+    def setUp(self):
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 1), end_date=date(2024, 12, 15))
+        self.john = self._student('john', 'John', 'Smith')
+        self.jane = self._student('jane', 'Jane', 'Smith')
+        self.ada = self._student('ada', 'Ada', 'Lovelace')
+        self.john_invoice = Invoice.objects.create(student=self.john, term=self.term, amount=Decimal('150.00'))
+        self.ada_invoice = Invoice.objects.create(student=self.ada, term=self.term, amount=Decimal('200.00'))
+        self.jane_invoice = Invoice.objects.create(student=self.jane, term=self.term, amount=Decimal('90.00'))
+        spring = Term.objects.create(name='Spring 2025', start_date=date(2025, 1, 6), end_date=date(2025, 3, 28))
+        self.twin_invoice = Invoice.objects.create(student=self.john, term=spring, amount=Decimal('90.00'))
+
+    def _student(self, username, first_name, last_name):
+        user = User.objects.create_user(
+            username=f'@{username}', email=f'{username}@example.org', first_name=first_name, last_name=last_name
+        )
+        return StudentProfile.objects.create(user=user)
+
+    def _csv(self, *rows):
+        return StringIO('Date,Amount,Reference,Name\n' + ''.join(f'{",".join(row)}\n' for row in rows))
+
+    def test_matches_by_reference_and_by_name(self):
+        statement = self._csv(
+            ('2025-01-05', '200.00', f'Invoice #{self.ada_invoice.id}', 'A LOVELACE'),
+            ('06/01/2025', '150.00', 'tutoring', 'Smith John'),
+            ('2025-01-07', '-12.00', 'card payment', 'Coffee shop'),
+            ('2025-01-08', '35.00', 'gift', 'Someone Else'),
+        )
+        result = reconcile(read_csv(statement))
+        self.assertEqual(result.unmatched, 1)
+        self.assertEqual(result.ambiguous, [])
+        self.ada_invoice.refresh_from_db()
+        self.john_invoice.refresh_from_db()
+        self.assertEqual(self.ada_invoice.paid_date, date(2025, 1, 5))
+        self.assertEqual(self.john_invoice.paid_date, date(2025, 1, 6))
+
+    def test_reports_ambiguous_lines(self):
+        statement = self._csv(
+            # J Smith owes 90.00 twice over: John and Jane.
+            ('2025-01-05', '90.00', 'lessons', 'J Smith'),
+            ('2025-01-05', '120.00', f'INV {self.ada_invoice.id}', 'Ada Lovelace'),
+        )
+        result = reconcile(read_csv(statement))
+        self.assertEqual(result.paid, {})
+        self.assertEqual([line for line, _, _ in result.ambiguous], [2, 3])
+        self.assertIn('several unpaid invoices', result.ambiguous[0][2])
+        self.assertIn(f'amount differs from invoice #{self.ada_invoice.id}', result.ambiguous[1][2])
+        self.assertFalse(Invoice.objects.filter(paid_date__isnull=False).exists())
+
+    def test_invoice_is_only_matched_once(self):
+        statement = self._csv(
+            ('2025-01-05', '200.00', f'#{self.ada_invoice.id}', ''),
+            ('2025-01-06', '200.00', f'#{self.ada_invoice.id}', ''),
+        )
+        result = reconcile(read_csv(statement))
+        self.assertEqual(list(result.paid), [self.ada_invoice.id])
+        self.assertIn('not unpaid', result.ambiguous[0][2])
+
+    def test_unreadable_lines_are_reported_and_the_rest_reconciled(self):
+        statement = self._csv(
+            ('2025-13-45', '90.00', 'lessons', 'Jane Smith'),
+            ('2025-01-05', 'ninety', 'lessons', 'Jane Smith'),
+            ('2025-01-05', '200.00', f'#{self.ada_invoice.id}', ''),
+        )
+        result = reconcile(read_csv(statement))
+        self.assertEqual(list(result.paid), [self.ada_invoice.id])
+        self.assertEqual([line for line, _, _ in result.ambiguous], [2, 3])
+        self.assertIn("'2025-13-45' is not a recognised date.", result.ambiguous[0][2])
+        self.assertIn("'ninety' is not a valid amount.", result.ambiguous[1][2])
+
+    def test_invoices_paid_during_the_run_are_not_paid_again(self):
+        index = InvoiceIndex()
+        self.ada_invoice.paid_date = date(2025, 1, 2)
+        self.ada_invoice.save()
+        statement = self._csv(
+            ('2025-01-05', '200.00', f'#{self.ada_invoice.id}', ''),
+            ('2025-01-05', '150.00', f'#{self.john_invoice.id}', ''),
+        )
+        result = reconcile(read_csv(statement), index=index)
+        self.assertEqual(list(result.paid), [self.john_invoice.id])
+        self.assertEqual(result.ambiguous, [(2, f'2025-01-05 200.00 #{self.ada_invoice.id}',
+                                             f'invoice #{self.ada_invoice.id} was already paid')])
+        self.ada_invoice.refresh_from_db()
+        self.assertEqual(self.ada_invoice.paid_date, date(2025, 1, 2))
+        summary = InvoiceSummary.objects.get(term=self.term)
+        self.assertEqual((summary.paid_count, summary.paid_amount), (2, Decimal('350.00')))
+
+    def test_reads_ofx_credits(self):
+        lines = list(read_ofx(StringIO(OFX)))
+        self.assertEqual(len(lines), 1)
+        self.assertEqual((lines[0].date, lines[0].amount, lines[0].name), (date(2025, 1, 10), Decimal('150.00'), 'SMITH J'))
+
+    def test_updates_invoices_with_one_bulk_update(self):
+        statement = self._csv(
+            ('2025-01-05', '200.00', f'#{self.ada_invoice.id}', ''),
+            ('2025-01-05', '150.00', f'#{self.john_invoice.id}', ''),
+        )
+        # Index of unpaid invoices, then a recheck of the matches, one UPDATE and the
+        # finance summary's three queries in a savepoint.
+        with self.assertNumQueries(8):
+            reconcile(read_csv(statement))
+        self.assertEqual(Invoice.objects.filter(paid_date__isnull=False).count(), 2)
+        summary = InvoiceSummary.objects.get(term=self.term)
+        self.assertEqual((summary.paid_count, summary.paid_amount), (2, Decimal('350.00')))
+
+    def test_command_dry_run_writes_report(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ofx', delete=False) as file:
+            file.write(OFX)
+        with tempfile.NamedTemporaryFile(suffix='.csv') as report:
+            out = StringIO()
+            call_command('reconcile_payments', file.name, '--dry-run', '--report', report.name, stdout=out)
+            self.assertEqual(open(report.name).readline().strip(), 'line,transaction,problem')
+        self.assertIn('Would mark 1 invoice(s) paid', out.getvalue())
+        self.assertFalse(Invoice.objects.filter(paid_date__isnull=False).exists())
+
+    def test_admin_upload_marks_invoices_paid(self):
+        User.objects.create_superuser(username='@admin', email='admin@example.org', password='Password123')
+        self.client.login(username='@admin', password='Password123')
+        url = reverse('admin:tutorials_invoice_reconcile')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        data = f'Date,Amount,Reference,Name\n2025-01-05,200.00,Invoice #{self.ada_invoice.id},\n'
+        response = self.client.post(url, {'statement_file': SimpleUploadedFile('statement.csv', data.encode())})
+        self.assertEqual(response.status_code, 200)
+        self.ada_invoice.refresh_from_db()
+        self.assertEqual(self.ada_invoice.paid_date, date(2025, 1, 5))
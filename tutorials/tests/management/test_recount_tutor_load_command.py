@@ -0,0 +1,42 @@
+"""Tests for the recount_tutor_load management command."""
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from tutorials.models import Lesson, LessonRequest, StudentProfile, Term, TutorProfile
+
+User = get_user_model()
+
+
+class RecountTutorLoadCommandTestCase(TestCase):
+    """Test suite for the recount_tutor_load command."""
+
+    def setUp(self):
+        term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 12, 15))
+        self.tutors = [self._profile(TutorProfile, f'tutor{number}') for number in range(3)]
+        student = self._profile(StudentProfile, 'student')
+        for tutor in self.tutors[:2]:
+            Lesson.objects.create(
+                tutor=tutor, student=student, term=term, start_date=date(2024, 9, 2), start_time=time(10, 0)
+            )
+            LessonRequest.objects.create(tutor=tutor, student=student, term=term, requested_start_time=time(10, 0))
+
+    def _profile(self, model, name):
+        user = User.objects.create_user(username=f'@{name}', email=f'{name}@example.org')
+        return model.objects.create(user=user)
+
+    def test_repairs_drifted_counters(self):
+        TutorProfile.objects.filter(pk=self.tutors[0].pk).update(active_lessons=0, weekly_minutes=0, pending_requests=5)
+        TutorProfile.objects.filter(pk=self.tutors[2].pk).update(active_lessons=2)
+        out = StringIO()
+        call_command('recount_tutor_load', stdout=out)
+        self.assertIn('Repaired the load counters of 2 tutor(s)', out.getvalue())
+        loads = TutorProfile.objects.order_by('pk').values_list('active_lessons', 'weekly_minutes', 'pending_requests')
+        self.assertEqual(list(loads), [(1, 60, 1), (1, 60, 1), (0, 0, 0)])
+
+    def test_leaves_correct_counters_alone(self):
+        out = StringIO()
+        call_command('recount_tutor_load', stdout=out)
+        self.assertIn('Repaired the load counters of 0 tutor(s)', out.getvalue())
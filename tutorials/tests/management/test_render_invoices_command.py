@@ -0,0 +1,61 @@
+"""Tests for the render_invoices management command."""
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from tutorials.invoice_documents import render_invoices
+from tutorials.models import StudentProfile, Term, Invoice
+
+User = get_user_model()
+
+class RenderInvoicesCommandTestCase(TestCase):
+    """Test suite for the render_invoices command."""
+
+    def setUp(self):
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 1), end_date=date(2024, 12, 15))
+        for index in range(3):
+            user = User.objects.create_user(
+                username=f'@student{index}',
+                first_name='Student',
+                last_name=f'Number{index}',
+                email=f'student{index}@example.org'
+            )
+            student = StudentProfile.objects.create(user=user)
+            Invoice.objects.create(student=student, term=self.term, amount=100 + index)
+        self.output = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output.cleanup)
+
+    def _documents(self):
+        return sorted(Path(self.output.name).glob('*/*.html'))
+
+    def test_renders_one_document_per_invoice(self):
+        out = StringIO()
+        call_command('render_invoices', '--term', 'Autumn 2024', '-o', self.output.name, '--no-pdf', '-w', '1', stdout=out)
+        self.assertEqual(len(self._documents()), 3)
+        self.assertIn('Rendered 3 HTML invoice(s)', out.getvalue())
+        self.assertIn('documents/s', out.getvalue())
+
+    def test_document_contains_invoice_details(self):
+        render_invoices(self.term, self.output.name, workers=1, pdf=False)
+        html = '\n'.join(path.read_text() for path in self._documents())
+        self.assertIn('Student Number1', html)
+        self.assertIn('student2@example.org', html)
+        self.assertIn('£100.00', html)
+
+    def test_unchanged_invoices_are_skipped(self):
+        self.assertEqual(render_invoices(self.term, self.output.name, workers=1, pdf=False), (3, 0))
+        Invoice.objects.filter(amount=101).update(amount=150)
+        self.assertEqual(render_invoices(self.term, self.output.name, workers=1, pdf=False), (1, 2))
+
+    def test_renders_with_process_pool(self):
+        self.assertEqual(render_invoices(self.term, self.output.name, workers=2, pdf=False), (3, 0))
+        self.assertEqual(len(self._documents()), 3)
+
+    def test_unknown_term_raises_error(self):
+        with self.assertRaises(CommandError):
+            call_command('render_invoices', '--term', 'Nope', '-o', self.output.name, stdout=StringIO())
@@ -0,0 +1,107 @@
+"""Tests for the rollover_term management command."""
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from tutorials.models import StudentProfile, TutorProfile, Term, Venue, Lesson
+
+User = get_user_model()
+
+
+class RolloverTermCommandTestCase(TestCase):
+    """Test suite for the rollover_term command."""
+
+    def setUp(self):
+        self.autumn = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 12, 15))
+        # 6 January 2025 is a Monday.
+        self.spring = Term.objects.create(name='Spring 2025', start_date=date(2025, 1, 6), end_date=date(2025, 3, 30))
+        self.venue = Venue.objects.create(name='Lab 101')
+        self.tutors = [self._profile(TutorProfile, f'tutor{number}') for number in range(2)]
+        self.students = [self._profile(StudentProfile, f'student{number}') for number in range(3)]
+
+    def _profile(self, model, name):
+        user = User.objects.create_user(username=f'@{name}', email=f'{name}@example.org', first_name=name.title())
+        return model.objects.create(user=user)
+
+    def _lesson(self, tutor, student, start_date, start_time, term=None, **kwargs):
+        return Lesson.objects.create(
+            tutor=tutor, student=student, term=term or self.autumn, venue=self.venue,
+            start_date=start_date, start_time=start_time, **kwargs
+        )
+
+    def test_copies_active_lessons_to_the_same_weekday(self):
+        self._lesson(self.tutors[0], self.students[0], date(2024, 9, 4), time(10, 0), duration_minutes=45)
+        self._lesson(self.tutors[1], self.students[1], date(2024, 9, 6), time(14, 0), frequency='fortnightly')
+        self._lesson(self.tutors[1], self.students[2], date(2024, 9, 2), time(9, 0), active=False)
+        out = StringIO()
+        call_command('rollover_term', 'Autumn 2024', 'Spring 2025', stdout=out)
+
+        copies = Lesson.objects.filter(term=self.spring).order_by('start_date')
+        self.assertEqual(
+            [(lesson.start_date, lesson.start_time, lesson.duration_minutes, lesson.frequency) for lesson in copies],
+            [(date(2025, 1, 8), time(10, 0), 45, 'weekly'), (date(2025, 1, 10), time(14, 0), 60, 'fortnightly')]
+        )
+        self.assertTrue(all(lesson.venue == self.venue for lesson in copies))
+        self.assertIn('Created 2 lesson(s)', out.getvalue())
+
+    def test_skips_clashes_and_reruns(self):
+        self._lesson(self.tutors[0], self.students[0], date(2024, 9, 2), time(10, 0))
+        # Same tutor, overlapping time on the same weekday.
+        self._lesson(self.tutors[0], self.students[1], date(2024, 9, 9), time(10, 30))
+        # The student is already booked in the new term.
+        self._lesson(self.tutors[1], self.students[2], date(2024, 9, 3), time(16, 0))
+        self._lesson(self.tutors[0], self.students[2], date(2025, 1, 7), time(16, 30), term=self.spring)
+
+        out = StringIO()
+        call_command('rollover_term', 'Autumn 2024', 'Spring 2025', stdout=out)
+        self.assertEqual(Lesson.objects.filter(term=self.spring).count(), 2)
+        self.assertIn('skipped 2', out.getvalue())
+
+        call_command('rollover_term', 'Autumn 2024', 'Spring 2025', stdout=StringIO())
+        self.assertEqual(Lesson.objects.filter(term=self.spring).count(), 2)
+
+    def test_moves_fixed_dates_with_the_lesson(self):
+        self._lesson(self.tutors[0], self.students[0], date(2024, 9, 2), time(10, 0),
+                     recurrence='RDATE=2024-09-02,2024-09-16,2024-12-09')
+        self._lesson(self.tutors[1], self.students[1], date(2024, 12, 9), time(12, 0),
+                     recurrence='RDATE=2024-12-09')
+        # Moved by the same 18 weeks as its start, its only date is after the new term.
+        self._lesson(self.tutors[1], self.students[2], date(2024, 9, 2), time(16, 0),
+                     recurrence='RDATE=2024-12-09')
+        out = StringIO()
+        call_command('rollover_term', 'Autumn 2024', 'Spring 2025', '--dry-run', stdout=out)
+        self.assertIn('none of its dates fall in the term', out.getvalue())
+
+        call_command('rollover_term', 'Autumn 2024', 'Spring 2025', stdout=StringIO())
+        copies = Lesson.objects.filter(term=self.spring).order_by('tutor_id')
+        self.assertEqual([lesson.recurrence for lesson in copies],
+                         ['RDATE=2025-01-06,2025-01-20', 'RDATE=2025-01-06'])
+
+    def test_dry_run_prints_diff_without_writing(self):
+        self._lesson(self.tutors[0], self.students[0], date(2024, 9, 2), time(10, 0))
+        self._lesson(self.tutors[0], self.students[1], date(2024, 9, 2), time(10, 0))
+        out = StringIO()
+        call_command('rollover_term', 'Autumn 2024', 'Spring 2025', '--dry-run', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('+ Student0 '))
+        self.assertIn('Mon 10:00 from 2025-01-06', lines[0])
+        self.assertTrue(lines[1].endswith('tutor is already booked'))
+        self.assertIn('Would create 1 lesson(s)', lines[2])
+        self.assertFalse(Lesson.objects.filter(term=self.spring).exists())
+
+    def test_inserts_in_bulk(self):
+        for number in range(30):
+            self._lesson(self.tutors[number % 2], self.students[number % 3], date(2024, 9, 2 + number % 5),
+                         time(8 + number // 5, 0))
+        # Two term lookups, existing and source lessons, then one insert and one counter
+        # update between SAVEPOINT and RELEASE.
+        with self.assertNumQueries(8):
+            call_command('rollover_term', 'Autumn 2024', 'Spring 2025', stdout=StringIO())
+        self.assertEqual(Lesson.objects.filter(term=self.spring).count(), 30)
+
+    def test_rejects_unknown_term(self):
+        with self.assertRaises(CommandError):
+            call_command('rollover_term', 'Autumn 2024', 'Summer 2030', stdout=StringIO())
@@ -0,0 +1,144 @@
+"""Tests for the job queue and the run_workers management command."""
+import socket
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models.query import QuerySet
+from django.test import TestCase, skipIfDBFeature
+from django.urls import reverse
+from django.utils import timezone
+from tutorials import jobs
+from tutorials.jobs import claim, enqueue, requeue_stale, run, task, work
+from tutorials.models import Job, Term
+from tutorials.tasks import render_term_invoices
+
+User = get_user_model()
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task
+def explode():
+    raise ValueError('Boom')
+
+
+@task
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+@task
+def handed_back():
+    Job.objects.update(worker='otherhost:1')
+
+
+class RunWorkersCommandTestCase(TestCase):
+    """Test suite for enqueueing, claiming, retrying and running jobs."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_stores_the_task_and_its_arguments(self):
+        job = enqueue(record, value=3)
+        self.assertEqual((job.task, job.kwargs, job.status), (record.task_name, {'value': 3}, Job.QUEUED))
+        self.assertEqual(enqueue(record.task_name, value=4).task, record.task_name)
+        with self.assertRaises(LookupError):
+            enqueue('tutorials.models.Job')
+
+    def test_command_runs_due_jobs_in_order_and_records_durations(self):
+        enqueue(record, value=1)
+        enqueue(record, value=2)
+        later = enqueue(record, value=3, run_at=timezone.now() + timedelta(hours=1))
+        out = StringIO()
+        call_command('run_workers', '-c', '1', '--burst', stdout=out)
+        self.assertEqual(calls, [1, 2])
+        self.assertIn('2 job(s) done, 0 to retry, 0 failed.', out.getvalue())
+        done = Job.objects.filter(status=Job.DONE)
+        self.assertEqual(done.count(), 2)
+        self.assertTrue(all(job.duration is not None and job.attempts == 1 and job.worker for job in done))
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.QUEUED)
+
+    def test_failures_are_retried_with_backoff_then_marked_failed(self):
+        job = enqueue(explode, max_attempts=2)
+        before = timezone.now()
+        job = run(claim('worker'))
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=jobs.RETRY_BACKOFF_SECONDS))
+        self.assertIn('ValueError: Boom', job.last_error)
+        self.assertIsNone(claim('worker'))
+
+        Job.objects.update(run_at=timezone.now())
+        job = run(claim('worker'))
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertEqual(jobs.backoff(3), timedelta(seconds=jobs.RETRY_BACKOFF_SECONDS * 4))
+
+    @skipIfDBFeature('has_select_for_update_skip_locked')
+    def test_a_job_is_claimed_by_one_worker_only(self):
+        first, second = enqueue(record, value=1), enqueue(record, value=2)
+        self.assertEqual(claim('other').pk, first.pk)
+        # This worker read the due jobs before the other claimed the first, so must lose it and take the next.
+        with patch.object(QuerySet, 'values_list', return_value=[first.pk, second.pk]):
+            job = claim('this')
+        self.assertEqual((job.pk, job.worker), (second.pk, 'this'))
+        self.assertEqual(Job.objects.get(pk=first.pk).worker, 'other')
+
+    def test_jobs_of_silent_workers_are_requeued(self):
+        retried = enqueue(record, value=1)
+        spent = enqueue(record, value=2, max_attempts=1)
+        for job in (retried, spent):
+            claim('otherhost:1')
+        self.assertEqual(requeue_stale(), 0)
+        Job.objects.update(heartbeat_at=timezone.now() - jobs.STALE_AFTER - timedelta(minutes=1))
+        self.assertEqual(requeue_stale(), 2)
+        self.assertEqual(Job.objects.get(pk=retried.pk).status, Job.QUEUED)
+        self.assertEqual(Job.objects.get(pk=spent.pk).status, Job.FAILED)
+        self.assertEqual(work(burst=True), 1)
+        self.assertEqual(calls, [1])
+
+    def test_jobs_of_exited_local_workers_are_requeued_at_once(self):
+        finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+        finished.wait()
+        exited = enqueue(record, value=1)
+        alive = enqueue(record, value=2)
+        claim(f'{socket.gethostname()}:{finished.pid}')
+        claim(jobs.worker_name())
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(Job.objects.get(pk=exited.pk).status, Job.QUEUED)
+        self.assertEqual(Job.objects.get(pk=alive.pk).status, Job.RUNNING)
+
+    def test_running_jobs_record_a_heartbeat(self):
+        job = enqueue(sleep, seconds=0.2)
+        with patch.object(jobs, 'HEARTBEAT_SECONDS', 0.05), patch.object(jobs, 'record_heartbeat') as beat:
+            run(claim('worker'))
+        self.assertTrue(beat.called)
+        self.assertEqual(beat.call_args.args[0].pk, job.pk)
+
+    def test_a_job_handed_back_while_running_keeps_its_new_worker(self):
+        job = enqueue(handed_back)
+        with self.assertLogs('tutorials.jobs', 'WARNING') as logs:
+            self.assertEqual(run(claim('worker')).status, Job.DONE)
+        self.assertIn(f'Job {job.pk} was handed back', logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.finished_at), (Job.RUNNING, 'otherhost:1', None))
+
+    def test_term_admin_queues_invoice_documents(self):
+        User.objects.create_superuser(username='@admin', email='admin@example.org', password='Password123')
+        self.client.login(username='@admin', password='Password123')
+        term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 12, 15))
+        response = self.client.post(reverse('admin:tutorials_term_changelist'), {
+            'action': 'queue_invoice_documents', '_selected_action': [term.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        job = Job.objects.get()
+        self.assertEqual((job.task, job.kwargs), (render_term_invoices.task_name, {'term_id': term.pk}))
@@ -0,0 +1,103 @@
+"""Tests for the send_invoice_reminders management command."""
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from tutorials.jobs import work
+from tutorials.models import Invoice, InvoiceReminder, Job, StudentProfile, Term
+from tutorials.reminders import overdue_invoices, send_reminders
+
+User = get_user_model()
+
+
+class SendInvoiceRemindersCommandTestCase(TestCase):
+    """Test suite for overdue invoice reminders."""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 12, 15))
+        self.overdue = [self._invoice(f'student{number}', days=45) for number in range(5)]
+        self._invoice('recent', days=10)
+        self._invoice('paid', days=45, paid_date=self.today)
+        self._invoice('noemail', days=45, email='')
+
+    def _invoice(self, name, days, email=None, **kwargs):
+        user = User.objects.create_user(
+            username=f'@{name}', email=f'{name}@example.org' if email is None else email, first_name=name.title()
+        )
+        invoice = Invoice.objects.create(
+            student=StudentProfile.objects.create(user=user), term=self.term, amount=Decimal('120.00'), **kwargs
+        )
+        Invoice.objects.filter(pk=invoice.pk).update(issued_date=self.today - timedelta(days=days))
+        return invoice
+
+    def test_only_overdue_unpaid_invoices_are_reminded(self):
+        out = StringIO()
+        call_command('send_invoice_reminders', stdout=out)
+        self.assertIn('Sent 5 invoice reminder(s)', out.getvalue())
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         [f'student{number}@example.org' for number in range(5)])
+        message = mail.outbox[0]
+        self.assertEqual(message.subject, f'Reminder: invoice #{self.overdue[0].pk} for Autumn 2024 is overdue')
+        self.assertIn('Dear Student0,', message.body)
+        self.assertIn('Amount due: 120.00', message.body)
+        self.assertEqual(InvoiceReminder.objects.filter(sent_date=self.today).count(), 5)
+
+    def test_reminded_invoices_are_skipped_until_the_interval_passes(self):
+        call_command('send_invoice_reminders', stdout=StringIO())
+        out = StringIO()
+        call_command('send_invoice_reminders', stdout=out)
+        self.assertIn('Sent 0 invoice reminder(s)', out.getvalue())
+        self.assertEqual(len(mail.outbox), 5)
+        InvoiceReminder.objects.update(sent_date=self.today - timedelta(days=14))
+        self.assertEqual(len(overdue_invoices()), 5)
+
+    def test_batches_use_one_query_each_and_one_connection(self):
+        # One joined query for the invoices.
+        with self.assertNumQueries(1):
+            invoices = overdue_invoices()
+        connection = mail.get_connection()
+        # One sent-log INSERT per batch of two, each batch sent over the same connection.
+        with patch.object(connection, 'send_messages', wraps=connection.send_messages) as send_messages:
+            with self.assertNumQueries(3):
+                self.assertEqual(send_reminders(invoices, batch_size=2, connection=connection), 5)
+        self.assertEqual([len(call.args[0]) for call in send_messages.call_args_list], [2, 2, 1])
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_a_failed_batch_is_sent_again_on_the_next_run(self):
+        connection = mail.get_connection()
+        with patch.object(connection, 'send_messages', side_effect=[2, OSError('SMTP down')]):
+            with self.assertRaises(OSError):
+                send_reminders(overdue_invoices(), batch_size=2, connection=connection)
+        self.assertEqual(InvoiceReminder.objects.count(), 2)
+        self.assertEqual(send_reminders(overdue_invoices(), batch_size=2, connection=connection), 3)
+        self.assertEqual(InvoiceReminder.objects.count(), 5)
+
+    def test_the_backend_count_is_reported(self):
+        connection = mail.get_connection()
+        with patch.object(connection, 'send_messages', return_value=1):
+            self.assertEqual(send_reminders(overdue_invoices(), batch_size=2, connection=connection), 3)
+
+    def test_dry_run_sends_nothing(self):
+        out = StringIO()
+        call_command('send_invoice_reminders', '--dry-run', stdout=out)
+        self.assertIn('Would send 5 invoice reminder(s).', out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(InvoiceReminder.objects.exists())
+
+    def test_queue_leaves_the_reminders_to_a_worker(self):
+        out = StringIO()
+        call_command('send_invoice_reminders', '--queue', '--interval', '7', stdout=out)
+        job = Job.objects.get()
+        self.assertIn(f'Queued invoice reminders as job {job.pk}.', out.getvalue())
+        self.assertEqual(job.kwargs['interval_days'], 7)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(work(burst=True), 1)
+        self.assertEqual(len(mail.outbox), 5)
@@ -0,0 +1,99 @@
+"""Tests for the term_report management command."""
+import csv
+import tempfile
+from datetime import date, time
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from tutorials import reference_data
+from tutorials.models import Lesson, LessonException, StudentProfile, Term, TermClosure, TutorProfile, Venue
+from tutorials.term_reports import term_usage, write_term_reports
+
+User = get_user_model()
+
+
+class TermReportCommandTestCase(TestCase):
+    """Test suite for the term_report command."""
+
+    def setUp(self):
+        cache.clear()
+        # 2 September 2024 is a Monday; the term runs for 13 weeks.
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 11, 29))
+        TermClosure.objects.create(term=self.term, start_date=date(2024, 10, 28), end_date=date(2024, 10, 28))
+        self.tutors = [self._profile(TutorProfile, f'tutor{number}') for number in range(2)]
+        student = self._profile(StudentProfile, 'student')
+        self.venues = [Venue.objects.create(name=f'Lab {number}') for number in range(2)]
+        weekly = Lesson.objects.create(
+            tutor=self.tutors[0], student=student, term=self.term, venue=self.venues[0],
+            start_date=date(2024, 9, 2), start_time=time(10, 30), duration_minutes=90
+        )
+        LessonException.objects.create(lesson=weekly, original_date=date(2024, 9, 9), cancelled=True)
+        fortnightly = Lesson.objects.create(
+            tutor=self.tutors[1], student=student, term=self.term, venue=self.venues[0],
+            start_date=date(2024, 9, 4), start_time=time(14, 0), frequency='fortnightly'
+        )
+        LessonException.objects.create(
+            lesson=fortnightly, original_date=date(2024, 9, 18), new_time=time(9, 0), new_venue=self.venues[1]
+        )
+        Lesson.objects.create(
+            tutor=self.tutors[1], student=student, term=self.term, start_date=date(2024, 9, 3),
+            start_time=time(9, 0), active=False
+        )
+        self.output = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output.cleanup)
+
+    def _profile(self, model, name):
+        user = User.objects.create_user(
+            username=f'@{name}', email=f'{name}@example.org', first_name=name.title(), last_name='Smith'
+        )
+        return model.objects.create(user=user)
+
+    def test_tutor_hours_skip_closed_and_cancelled_sessions(self):
+        usage = term_usage(self.term)
+        self.assertEqual(usage.hours.shape, (2, 13))
+        self.assertEqual(usage.hours[0].sum(), 11 * 1.5)
+        self.assertEqual((usage.hours[0][1], usage.hours[0][8]), (0, 0))
+        self.assertEqual(list(usage.sessions[1]), [1, 0] * 6 + [1])
+
+    def test_venue_utilization_by_weekday_and_hour(self):
+        usage = term_usage(self.term)
+        lab0, lab1 = (list(usage.venue_ids).index(venue.pk) for venue in self.venues)
+        self.assertEqual(usage.booked[lab0, 0, 10], 11 * 30)
+        self.assertEqual(usage.booked[lab0, 0, 11], 11 * 60)
+        # Twelve Mondays are open once the closure is taken out.
+        self.assertAlmostEqual(usage.utilization[lab0, 0, 11], 11 / 12)
+        self.assertEqual(usage.booked[lab0, 2, 14], 6 * 60)
+        self.assertEqual(usage.booked[lab1, 2, 9], 60)
+
+    def test_reads_lessons_and_exceptions_with_one_query_each(self):
+        reference_data.term_closures()
+        with self.assertNumQueries(2):
+            term_usage(self.term)
+
+    def test_writes_a_csv_report_per_tutor(self):
+        out = StringIO()
+        call_command('term_report', '--term', 'Autumn 2024', '-o', self.output.name, '-w', '1', stdout=out)
+        self.assertIn('Reported 23.5 hours over 18 session(s) for 2 tutor(s) and 2 venue(s)', out.getvalue())
+        with open(Path(self.output.name) / 'tutors' / f'tutor-{self.tutors[0].pk}.csv', newline='') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], ['Week starting', 'Sessions', 'Hours'])
+        self.assertEqual(rows[1], ['2024-09-02', '1', '1.50'])
+        self.assertEqual(rows[-1], ['Total', '11', '16.50'])
+        venues = (Path(self.output.name) / 'venues.csv').read_text()
+        self.assertIn('Lab 0,Mon,11:00,11.00,91.7%', venues)
+
+    def test_writes_html_reports_with_process_pool(self):
+        paths = write_term_reports(term_usage(self.term), self.output.name, 'html', workers=2)
+        self.assertEqual(len(paths), 4)
+        html = (Path(self.output.name) / 'tutors.html').read_text()
+        self.assertIn('Tutor0 Smith', html)
+        self.assertIn('<td>16.50</td>', html)
+
+    def test_unknown_term_raises_error(self):
+        with self.assertRaises(CommandError):
+            call_command('term_report', '--term', 'Summer 1999', stdout=StringIO())
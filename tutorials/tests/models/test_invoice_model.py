@@ -1,5 +1,6 @@
 """Unit tests for the Invoice model."""
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from tutorials.models import StudentProfile, Term, Invoice
@@ -44,6 +45,23 @@ class InvoiceModelTestCase(TestCase):
         self.invoice.amount = -100
         self._assert_invoice_is_invalid()
 
+    def test_negative_amount_is_reported_once(self):
+        self.invoice.amount = -100
+        with self.assertRaises(ValidationError) as raised:
+            self.invoice.full_clean()
+        self.assertEqual(len(raised.exception.messages), 1)
+
+    def test_database_rejects_negative_amount(self):
+        with self.assertRaises(IntegrityError):
+            Invoice.objects.filter(pk=self.invoice.pk).update(amount=-100)
+
+    def test_one_invoice_per_student_per_term(self):
+        duplicate = Invoice(student=self.student_profile, term=self.term, amount=10)
+        with self.assertRaises(ValidationError):
+            duplicate.full_clean()
+        with self.assertRaises(IntegrityError):
+            Invoice.objects.bulk_create([duplicate])
+
     def test_paid_date_can_be_blank(self):
         self.assertIsNone(self.invoice.paid_date)  # The default is blank
         self._assert_invoice_is_valid()
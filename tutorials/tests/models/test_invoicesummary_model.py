@@ -0,0 +1,99 @@
+"""Tests of the invoice summary kept in step with invoice writes."""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from tutorials import finance
+from tutorials.models import Invoice, InvoiceSummary, StudentProfile, Term
+
+User = get_user_model()
+
+
+class InvoiceSummaryModelTestCase(TestCase):
+    """Test suite for the InvoiceSummary totals and the aging report."""
+
+    def setUp(self):
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 12, 15))
+        self.today = timezone.localdate()
+        self.count = 0
+
+    def _invoice(self, amount, cohort=2023, **kwargs):
+        self.count += 1
+        user = User.objects.create_user(
+            username=f'@student{self.count}', email=f'student{self.count}@example.org',
+            date_joined=timezone.now().replace(year=cohort)
+        )
+        student = StudentProfile.objects.create(user=user)
+        return Invoice.objects.create(student=student, term=self.term, amount=Decimal(amount), **kwargs)
+
+    def _totals(self, cohort=2023):
+        summary = InvoiceSummary.objects.filter(term=self.term, cohort=cohort).first()
+        if summary is None:
+            return None
+        return summary.issued_count, summary.issued_amount, summary.paid_count, summary.paid_amount
+
+    def test_issuing_and_paying_invoices_update_their_cohort(self):
+        invoice = self._invoice('100.00')
+        self._invoice('50.00')
+        self._invoice('80.00', cohort=2024)
+        self.assertEqual(self._totals(), (2, Decimal('150.00'), 0, 0))
+        invoice.paid_date = self.today
+        invoice.save()
+        summary = InvoiceSummary.objects.get(term=self.term, cohort=2023)
+        self.assertEqual((summary.paid_count, summary.paid_amount), (1, Decimal('100.00')))
+        self.assertEqual((summary.outstanding_count, summary.outstanding_amount), (1, Decimal('50.00')))
+        self.assertEqual(self._totals(2024), (1, Decimal('80.00'), 0, 0))
+
+    def test_changes_move_the_totals(self):
+        invoice = Invoice.objects.get(pk=self._invoice('100.00').pk)
+        invoice.student = self._invoice('10.00', cohort=2024).student
+        invoice.term = Term.objects.create(
+            name='Spring 2025', start_date=date(2025, 1, 6), end_date=date(2025, 3, 28)
+        )
+        invoice.amount = Decimal('120.00')
+        invoice.save()
+        self.assertEqual(self._totals(), (0, 0, 0, 0))
+        self.assertEqual(self._totals(2024), (1, Decimal('10.00'), 0, 0))
+        summary = InvoiceSummary.objects.get(term=invoice.term)
+        self.assertEqual((summary.cohort, summary.issued_count, summary.issued_amount), (2024, 1, Decimal('120.00')))
+
+    def test_partially_loaded_invoices_are_counted_correctly(self):
+        invoice = self._invoice('100.00', paid_date=self.today)
+        invoice = Invoice.objects.only('id', 'amount').get(pk=invoice.pk)
+        invoice.amount = Decimal('70.00')
+        invoice.save(update_fields=['amount'])
+        self.assertEqual(self._totals(), (1, Decimal('70.00'), 1, Decimal('70.00')))
+
+    def test_deleting_invoices_takes_them_off(self):
+        invoice = self._invoice('100.00')
+        self._invoice('40.00')
+        invoice.delete()
+        self.assertEqual(self._totals(), (1, Decimal('40.00'), 0, 0))
+        self.term.delete()
+        self.assertFalse(InvoiceSummary.objects.exists())
+
+    def test_rebuild_repairs_drift(self):
+        self._invoice('100.00', paid_date=self.today)
+        self._invoice('40.00', cohort=2024)
+        expected = set(InvoiceSummary.objects.values_list('term', 'cohort', 'issued_count', 'paid_amount'))
+        InvoiceSummary.objects.filter(cohort=2023).update(issued_count=7)
+        InvoiceSummary.objects.filter(cohort=2024).delete()
+        rows, drifted = finance.rebuild()
+        self.assertEqual((rows, drifted), (2, 2))
+        self.assertEqual(set(InvoiceSummary.objects.values_list('term', 'cohort', 'issued_count', 'paid_amount')), expected)
+
+    def test_aging_buckets_outstanding_amounts_by_issue_date(self):
+        for days, amount in ((5, '10.00'), (35, '20.00'), (61, '30.00'), (90, '40.00'), (400, '50.00')):
+            invoice = self._invoice(amount)
+            invoice.issued_date = self.today - timedelta(days=days)
+            invoice.save()
+        self._invoice('99.00', paid_date=self.today)
+        self.assertEqual(InvoiceSummary.objects.count(), 6)
+        self.assertEqual(finance.aging(finance.summary_rows()), [
+            ('Under 30 days', 1, Decimal('10.00')),
+            ('30-59 days', 1, Decimal('20.00')),
+            ('60-89 days', 1, Decimal('30.00')),
+            ('90 days or more', 2, Decimal('90.00')),
+        ])
@@ -1,5 +1,6 @@
 """Unit tests for the Lesson model."""
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from tutorials.models import (
@@ -74,6 +75,12 @@ class LessonModelTestCase(TestCase):
         self.lesson.duration_minutes = 0
         self._assert_lesson_is_invalid()
 
+    def test_database_rejects_zero_duration(self):
+        self.lesson.pk = None
+        self.lesson.duration_minutes = 0
+        with self.assertRaises(IntegrityError):
+            Lesson.objects.bulk_create([self.lesson])
+
     def test_frequency_defaults_to_weekly(self):
         new_lesson = Lesson.objects.create(
             tutor=self.tutor_profile,
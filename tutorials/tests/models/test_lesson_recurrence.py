@@ -0,0 +1,82 @@
+"""Unit tests for lesson recurrence rules."""
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from tutorials.availability import occupancy, slot_range, unpack
+from tutorials.models import StudentProfile, TutorProfile, Term, Lesson
+from tutorials.occurrences import lesson_dates
+from tutorials.recurrence import compile_rule, parse_rule
+
+User = get_user_model()
+
+
+class LessonRecurrenceTestCase(TestCase):
+    """Unit tests for recurrence rules on lessons."""
+
+    def setUp(self):
+        cache.clear()
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 9, 29))
+        student_user = User.objects.create_user(username='@studentalex', email='alex@example.org')
+        self.student = StudentProfile.objects.create(user=student_user)
+        tutor_user = User.objects.create_user(username='@tutorjane', email='jane@example.org', is_tutor=True)
+        self.tutor = TutorProfile.objects.create(user=tutor_user)
+        self.lesson = Lesson.objects.create(
+            tutor=self.tutor, student=self.student, term=self.term,
+            start_date=date(2024, 9, 3), start_time=time(10, 0)
+        )
+
+    def test_rules_are_normalised(self):
+        self.assertEqual(str(parse_rule('freq=weekly;byday=th,mo;interval=2')), 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH')
+
+    def test_unsupported_rules_are_rejected(self):
+        for text in ('FREQ=DAILY', 'FREQ=WEEKLY;BYDAY=XX', 'FREQ=WEEKLY;INTERVAL=0', 'FREQ=WEEKLY;COUNT=3',
+                     'RDATE=2024-13-01', 'RDATE=2024-09-02;FREQ=WEEKLY'):
+            self.lesson.recurrence = text
+            with self.assertRaises(ValidationError, msg=text):
+                self.lesson.full_clean()
+
+    def test_blank_rule_follows_frequency(self):
+        self.assertEqual(lesson_dates(self.lesson), [date(2024, 9, 3), date(2024, 9, 10), date(2024, 9, 17),
+                                                     date(2024, 9, 24)])
+        self.lesson.frequency = 'fortnightly'
+        self.assertEqual(lesson_dates(self.lesson), [date(2024, 9, 3), date(2024, 9, 17)])
+
+    def test_several_days_a_week(self):
+        self.lesson.recurrence = 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH'
+        self.assertEqual(lesson_dates(self.lesson), [date(2024, 9, 5), date(2024, 9, 16), date(2024, 9, 19)])
+
+    def test_fixed_dates_within_the_term(self):
+        self.lesson.recurrence = 'RDATE=2024-09-20,2024-09-01,2024-09-04,2024-10-01'
+        self.assertEqual(lesson_dates(self.lesson), [date(2024, 9, 4), date(2024, 9, 20)])
+
+    def test_invalid_stored_rule_follows_frequency(self):
+        Lesson.objects.filter(pk=self.lesson.pk).update(recurrence='FREQ=DAILY')
+        lesson = Lesson.objects.select_related('term').get(pk=self.lesson.pk)
+        with self.assertLogs('tutorials.recurrence', 'WARNING'):
+            self.assertEqual(lesson_dates(lesson), [date(2024, 9, 3), date(2024, 9, 10), date(2024, 9, 17),
+                                                    date(2024, 9, 24)])
+        with self.assertLogs('tutorials.recurrence', 'WARNING'):
+            taken = unpack(occupancy([self.tutor.pk], term=self.term)[0, 0])
+        first, stop = slot_range(1, time(10, 0), 60)
+        self.assertTrue(taken[first:stop].all())
+
+    def test_compiled_rules_are_shared(self):
+        compile_rule.cache_clear()
+        other = Lesson(term=self.term, start_date=date(2024, 9, 10), start_time=time(9, 0))
+        lesson_dates(self.lesson)
+        lesson_dates(other)
+        info = compile_rule.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+    def test_occupancy_covers_every_day_of_the_rule(self):
+        self.lesson.recurrence = 'FREQ=WEEKLY;BYDAY=MO,TH'
+        self.lesson.save()
+        taken = unpack(occupancy([self.tutor.id], term=self.term)[0, 0])
+        for weekday in (0, 3):
+            first, stop = slot_range(weekday, time(10, 0), 60)
+            self.assertTrue(taken[first:stop].all())
+        first, stop = slot_range(1, time(10, 0), 60)
+        self.assertFalse(taken[first:stop].any())
@@ -0,0 +1,76 @@
+"""Unit tests for the LessonException model and its merge into lesson sessions."""
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from tutorials import reference_data
+from tutorials.models import StudentProfile, TutorProfile, Term, Venue, Lesson, LessonException
+from tutorials.views import tutor_sessions
+
+User = get_user_model()
+
+
+class LessonExceptionModelTestCase(TestCase):
+    """Unit tests for the LessonException model."""
+
+    def setUp(self):
+        cache.clear()
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 11, 29))
+        self.venue = Venue.objects.create(name='Lab 101')
+        student_user = User.objects.create_user(username='@studentalex', email='alex@example.org')
+        self.student = StudentProfile.objects.create(user=student_user)
+        tutor_user = User.objects.create_user(username='@tutorjane', email='jane@example.org', is_tutor=True)
+        self.tutor = TutorProfile.objects.create(user=tutor_user)
+        self.lesson = Lesson.objects.create(
+            tutor=self.tutor, student=self.student, term=self.term, venue=self.venue,
+            start_date=date(2024, 9, 2), start_time=time(10, 0)
+        )
+
+    def test_exception_must_cancel_or_move(self):
+        exception = LessonException(lesson=self.lesson, original_date=date(2024, 9, 9))
+        with self.assertRaises(ValidationError):
+            exception.full_clean()
+        exception.cancelled = True
+        exception.full_clean()
+
+    def test_one_exception_per_session(self):
+        LessonException.objects.create(lesson=self.lesson, original_date=date(2024, 9, 9), cancelled=True)
+        duplicate = LessonException(lesson=self.lesson, original_date=date(2024, 9, 9), new_time=time(11, 0))
+        with self.assertRaises(ValidationError):
+            duplicate.full_clean()
+
+    def test_sessions_are_cancelled_and_moved(self):
+        other_venue = Venue.objects.create(name='Online')
+        LessonException.objects.create(lesson=self.lesson, original_date=date(2024, 9, 9), cancelled=True)
+        LessonException.objects.create(
+            lesson=self.lesson, original_date=date(2024, 9, 16),
+            new_date=date(2024, 9, 18), new_time=time(14, 0), new_venue=other_venue
+        )
+        sessions = tutor_sessions(self.tutor)
+        self.assertEqual(len(sessions), 12)
+        dates = [session.date for session in sessions]
+        self.assertNotIn(date(2024, 9, 9), dates)
+        self.assertNotIn(date(2024, 9, 16), dates)
+        moved = sessions[dates.index(date(2024, 9, 18))]
+        self.assertEqual((moved.time, moved.venue), (time(14, 0), 'Online'))
+        self.assertEqual(sessions[0].venue, 'Lab 101')
+
+    def test_many_exceptions_add_one_query(self):
+        lessons = [
+            Lesson.objects.create(
+                tutor=self.tutor, student=self.student, term=self.term,
+                start_date=date(2024, 9, 2) + timedelta(days=day), start_time=time(9 + day, 0)
+            )
+            for day in range(4)
+        ]
+        LessonException.objects.bulk_create([
+            LessonException(lesson=lesson, original_date=lesson.start_date + timedelta(weeks=week), cancelled=True)
+            for lesson in lessons for week in range(13)
+        ])
+        reference_data.term_closures()
+        # Lessons and their exceptions, one query each however many exceptions there are.
+        with self.assertNumQueries(2):
+            sessions = tutor_sessions(self.tutor)
+        self.assertEqual(len(sessions), 13)
@@ -1,5 +1,6 @@
 """Unit tests for the LessonRequest model."""
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from tutorials.models import (
@@ -78,6 +79,12 @@ class LessonRequestModelTestCase(TestCase):
         self.request.duration_minutes = 0
         self._assert_request_is_invalid()
 
+    def test_database_rejects_zero_duration(self):
+        self.request.pk = None
+        self.request.duration_minutes = 0
+        with self.assertRaises(IntegrityError):
+            LessonRequest.objects.bulk_create([self.request])
+
     def test_str_method_returns_expected_string(self):
         expected_str = f"Request by {self.request.student} for {self.request.term}"
         self.assertEqual(str(self.request), expected_str)
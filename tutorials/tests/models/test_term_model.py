@@ -1,5 +1,6 @@
 """Unit tests for the Term model."""
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.test import TestCase
 from tutorials.models import Term
 from datetime import date
@@ -38,6 +39,10 @@ class TermModelTestCase(TestCase):
         with self.assertRaises(ValidationError):
             self.term.full_clean()
 
+    def test_database_rejects_start_date_after_end_date(self):
+        with self.assertRaises(IntegrityError):
+            Term.objects.bulk_create([Term(name='Backwards', start_date=date(2024, 12, 21), end_date=date(2024, 9, 1))])
+
     def _assert_term_is_valid(self):
         try:
             self.term.full_clean()
@@ -0,0 +1,66 @@
+"""Unit tests for the TermClosure model and closed days in lesson expansion."""
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from tutorials import reference_data
+from tutorials.models import StudentProfile, TutorProfile, Term, TermClosure, Lesson
+from tutorials.occurrences import lesson_dates
+from tutorials.views import student_sessions
+
+User = get_user_model()
+
+
+class TermClosureModelTestCase(TestCase):
+    """Unit tests for the TermClosure model."""
+
+    def setUp(self):
+        cache.clear()
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 11, 29))
+        student_user = User.objects.create_user(username='@studentalex', email='alex@example.org')
+        self.student = StudentProfile.objects.create(user=student_user)
+        tutor_user = User.objects.create_user(username='@tutorjane', email='jane@example.org', is_tutor=True)
+        tutor = TutorProfile.objects.create(user=tutor_user)
+        self.lesson = Lesson.objects.create(
+            tutor=tutor, student=self.student, term=self.term,
+            start_date=date(2024, 9, 2), start_time=time(10, 0)
+        )
+        self.half_term = TermClosure.objects.create(
+            term=self.term, start_date=date(2024, 10, 28), end_date=date(2024, 11, 1), reason='Half term'
+        )
+
+    def test_end_date_cannot_be_before_start_date(self):
+        self.half_term.end_date = date(2024, 10, 27)
+        with self.assertRaises(ValidationError):
+            self.half_term.full_clean()
+
+    def test_closed_days_are_skipped(self):
+        dates = lesson_dates(self.lesson)
+        self.assertEqual(len(dates), 12)
+        self.assertNotIn(date(2024, 10, 28), dates)
+        self.assertEqual(dates[-1], date(2024, 11, 25))
+
+    def test_fortnightly_lessons_skip_closed_days(self):
+        self.lesson.frequency = 'fortnightly'
+        self.lesson.start_date = date(2024, 9, 16)
+        self.assertEqual(
+            lesson_dates(self.lesson),
+            [date(2024, 9, 16), date(2024, 9, 30), date(2024, 10, 14), date(2024, 11, 11), date(2024, 11, 25)]
+        )
+
+    def test_closures_are_cached_until_they_change(self):
+        reference_data.term_closures()
+        with self.assertNumQueries(0):
+            lesson_dates(self.lesson)
+        with self.captureOnCommitCallbacks(execute=True):
+            TermClosure.objects.create(term=self.term, start_date=date(2024, 9, 9), end_date=date(2024, 9, 9))
+        self.assertNotIn(date(2024, 9, 9), lesson_dates(self.lesson))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.half_term.delete()
+        self.assertIn(date(2024, 10, 28), lesson_dates(self.lesson))
+
+    def test_dashboard_sessions_skip_closed_days(self):
+        sessions = student_sessions(self.student.user)
+        self.assertEqual([session.date for session in sessions], lesson_dates(self.lesson))
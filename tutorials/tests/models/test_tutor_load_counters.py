@@ -0,0 +1,86 @@
+"""Tests of the tutor load counters kept in step with lesson and request writes."""
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from tutorials.models import Lesson, LessonRequest, StudentProfile, Term, TutorProfile
+
+User = get_user_model()
+
+
+class TutorLoadCountersTestCase(TestCase):
+    """Test suite for TutorProfile's active_lessons, weekly_minutes and pending_requests."""
+
+    def setUp(self):
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 12, 15))
+        self.tutors = [self._profile(TutorProfile, f'tutor{number}') for number in range(2)]
+        self.student = self._profile(StudentProfile, 'student')
+
+    def _profile(self, model, name):
+        user = User.objects.create_user(username=f'@{name}', email=f'{name}@example.org')
+        return model.objects.create(user=user)
+
+    def _lesson(self, tutor, **kwargs):
+        return Lesson.objects.create(
+            tutor=tutor, student=self.student, term=self.term,
+            start_date=date(2024, 9, 2), start_time=time(10, 0), **kwargs
+        )
+
+    def _request(self, tutor, **kwargs):
+        return LessonRequest.objects.create(
+            tutor=tutor, student=self.student, term=self.term, requested_start_time=time(10, 0), **kwargs
+        )
+
+    def _load(self, tutor):
+        tutor.refresh_from_db()
+        return tutor.active_lessons, tutor.weekly_minutes, tutor.pending_requests
+
+    def test_lessons_count_their_weekly_minutes(self):
+        self._lesson(self.tutors[0], duration_minutes=45)
+        self._lesson(self.tutors[0], frequency='fortnightly')
+        self._lesson(self.tutors[0], recurrence='FREQ=WEEKLY;BYDAY=MO,TH')
+        self._lesson(self.tutors[0], active=False)
+        self.assertEqual(self._load(self.tutors[0]), (3, 45 + 30 + 120, 0))
+        self.assertEqual(self.tutors[0].load_summary(), '3 lessons, 3.2 h/week, 0 pending')
+
+    def test_changes_move_the_load(self):
+        lesson = self._lesson(self.tutors[0])
+        lesson = Lesson.objects.get(pk=lesson.pk)
+        lesson.tutor = self.tutors[1]
+        lesson.duration_minutes = 90
+        lesson.save()
+        self.assertEqual(self._load(self.tutors[0]), (0, 0, 0))
+        self.assertEqual(self._load(self.tutors[1]), (1, 90, 0))
+
+        lesson.active = False
+        lesson.save()
+        self.assertEqual(self._load(self.tutors[1]), (0, 0, 0))
+
+    def test_unrelated_edits_do_not_touch_the_counters(self):
+        lesson = self._lesson(self.tutors[0])
+        lesson.notes = 'Bring a laptop.'
+        with self.assertNumQueries(3):
+            # SAVEPOINT, UPDATE and RELEASE; no counter update.
+            lesson.save()
+
+    def test_rows_loaded_without_their_load_fields_are_looked_up(self):
+        lesson = self._lesson(self.tutors[0])
+        partial = Lesson.objects.only('id', 'duration_minutes').get(pk=lesson.pk)
+        partial.duration_minutes = 30
+        partial.save()
+        self.assertEqual(self._load(self.tutors[0]), (1, 30, 0))
+
+    def test_pending_requests_are_counted_until_they_are_handled(self):
+        request = self._request(self.tutors[0])
+        self._request(self.tutors[0], status='rejected')
+        self.assertEqual(self._load(self.tutors[0]), (0, 0, 1))
+
+        request.status = 'allocated'
+        request.save()
+        self.assertEqual(self._load(self.tutors[0]), (0, 0, 0))
+
+    def test_deletes_and_cascades_take_the_load_off(self):
+        self._lesson(self.tutors[0])
+        self._request(self.tutors[0])
+        self.student.delete()
+        self.assertEqual(self._load(self.tutors[0]), (0, 0, 0))
@@ -0,0 +1,114 @@
+"""Unit tests for the TutorAvailability model and availability bitmaps."""
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from tutorials.availability import (
+    BYTES_PER_WEEK, find_free_tutors, format_windows, parse_windows, set_availability,
+    tutor_is_free, unpack, week_parity, weekly_free_windows
+)
+from tutorials.forms import TutorAvailabilityForm
+from tutorials.models import StudentProfile, TutorProfile, TutorAvailability, Term, Lesson
+
+User = get_user_model()
+
+TUESDAY = 1
+
+class TutorAvailabilityModelTestCase(TestCase):
+    """Unit tests for availability bitmaps and free-slot search."""
+
+    def setUp(self):
+        self.tutors = []
+        for index, languages in enumerate(['Python, Django', 'Python', 'Java']):
+            user = User.objects.create_user(
+                username=f'@tutor{index}',
+                first_name='Tutor',
+                last_name=f'Number{index}',
+                email=f'tutor{index}@example.org'
+            )
+            tutor = TutorProfile.objects.create(user=user, languages=languages)
+            set_availability(tutor, parse_windows('Tue 17:00-19:00; Thu 09:00-12:00'))
+            self.tutors.append(tutor)
+        student_user = User.objects.create_user(username='@student', email='student@example.org')
+        self.student = StudentProfile.objects.create(user=student_user)
+        today = date.today()
+        self.term = Term.objects.create(name='Current', start_date=today, end_date=today + timedelta(days=90))
+        # The first Tuesday of the term.
+        self.tuesday = today + timedelta(days=(TUESDAY - today.weekday()) % 7)
+
+    def _book(self, tutor, start_time, frequency='weekly', start_date=None):
+        return Lesson.objects.create(
+            tutor=tutor, student=self.student, term=self.term,
+            start_date=start_date or self.tuesday, start_time=start_time, frequency=frequency
+        )
+
+    def test_bitmap_is_compact(self):
+        availability = TutorAvailability.objects.get(tutor=self.tutors[0])
+        self.assertEqual(len(availability.slots), BYTES_PER_WEEK)
+
+    def test_windows_round_trip(self):
+        mask = parse_windows('tue 17:00 - 19:00\nThu 09:00-12:00')
+        self.assertEqual(format_windows(mask), 'Tue 17:00-19:00; Thu 09:00-12:00')
+        self.assertEqual(mask.sum(), 8 + 12)
+
+    def test_invalid_windows_raise_validation_error(self):
+        for text in ['Tuesday 17:00-19:00', 'Tue 19:00-17:00', 'Tue 25:00-26:00']:
+            with self.assertRaises(ValidationError):
+                parse_windows(text)
+
+    def test_finds_tutors_by_language_and_time(self):
+        free = find_free_tutors(TUESDAY, time(17, 0), 60, language='python')
+        self.assertEqual(free, [self.tutors[0].id, self.tutors[1].id])
+        self.assertEqual(find_free_tutors(TUESDAY, time(18, 30), 60), [])
+
+    def test_weekly_lesson_blocks_the_slot(self):
+        self._book(self.tutors[0], time(17, 30))
+        free = find_free_tutors(TUESDAY, time(17, 0), 60, language='Python')
+        self.assertEqual(free, [self.tutors[1].id])
+
+    def test_fortnightly_lesson_leaves_other_week_free(self):
+        self._book(self.tutors[0], time(17, 0), frequency='fortnightly')
+        self.assertNotIn(self.tutors[0].id, find_free_tutors(TUESDAY, time(17, 0), 60))
+        self.assertIn(self.tutors[0].id, find_free_tutors(TUESDAY, time(17, 0), 60, frequency='fortnightly'))
+        next_week = self.tuesday + timedelta(weeks=1)
+        self.assertNotEqual(week_parity(self.tuesday), week_parity(next_week))
+        self.assertFalse(tutor_is_free(self.tutors[0], self.tuesday, time(17, 0), 60, 'fortnightly'))
+        self.assertTrue(tutor_is_free(self.tutors[0], next_week, time(17, 0), 60, 'fortnightly'))
+
+    def test_every_day_of_a_recurrence_rule_is_checked(self):
+        self.assertTrue(tutor_is_free(self.tutors[0], self.tuesday, time(17, 0), 60))
+        # Free on Tuesday evening, but only on Thursday morning.
+        self.assertFalse(tutor_is_free(self.tutors[0], self.tuesday, time(17, 0), 60,
+                                       recurrence='FREQ=WEEKLY;BYDAY=TU,TH'))
+        self._book(self.tutors[1], time(10, 0), start_date=self.tuesday + timedelta(days=2))
+        self.assertTrue(tutor_is_free(self.tutors[1], self.tuesday, time(11, 0), 60,
+                                      recurrence='FREQ=WEEKLY;BYDAY=TH'))
+        self.assertFalse(tutor_is_free(self.tutors[1], self.tuesday, time(10, 30), 60,
+                                       recurrence='FREQ=WEEKLY;BYDAY=TH'))
+
+    def test_search_uses_constant_number_of_queries(self):
+        with self.assertNumQueries(3):
+            find_free_tutors(TUESDAY, time(17, 0), 60)
+
+    def test_weekly_free_windows_subtract_lessons(self):
+        self._book(self.tutors[0], time(17, 0))
+        self.assertEqual(weekly_free_windows(self.tutors[0]), 'Tue 18:00-19:00; Thu 09:00-12:00')
+
+    def test_weekly_free_windows_skip_lessons_without_availability(self):
+        TutorAvailability.objects.filter(tutor=self.tutors[2]).delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(weekly_free_windows(self.tutors[2]), '')
+
+    def test_tutor_without_availability_is_not_restricted(self):
+        TutorAvailability.objects.filter(tutor=self.tutors[2]).delete()
+        self.assertTrue(tutor_is_free(self.tutors[2], self.tuesday, time(3, 0), 60))
+
+    def test_admin_form_saves_windows(self):
+        form = TutorAvailabilityForm(
+            data={'tutor': self.tutors[2].id, 'windows': 'Mon 10:00-11:30'},
+            instance=self.tutors[2].availability
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        availability = form.save()
+        self.assertEqual(format_windows(unpack(availability.slots)), 'Mon 10:00-11:30')
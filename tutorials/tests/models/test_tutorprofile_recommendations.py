@@ -0,0 +1,110 @@
+"""Unit tests for ranking tutor profiles with the recommendation index."""
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from tutorials import recommendations
+from tutorials.availability import parse_windows, set_availability
+from tutorials.models import StudentProfile, TutorProfile, Term, Lesson, LessonRequest
+
+User = get_user_model()
+
+
+class TutorRecommendationTestCase(TestCase):
+    """Unit tests for tutor recommendations."""
+
+    def setUp(self):
+        cache.clear()
+        recommendations.reset()
+        self.senior = self._tutor('senior', 'Python, Django', 'Web', 10)
+        self.junior = self._tutor('junior', 'Python', '', 1)
+        self.java = self._tutor('java', 'Java', 'Spring', 8)
+        student_user = User.objects.create_user(username='@student', email='student@example.org')
+        self.student = StudentProfile.objects.create(user=student_user)
+        today = date.today()
+        self.term = Term.objects.create(name='Current', start_date=today, end_date=today + timedelta(days=90))
+        self.monday = today + timedelta(days=7 - today.weekday())
+
+    def tearDown(self):
+        recommendations.reset()
+
+    def _tutor(self, name, languages, specializations, experience):
+        user = User.objects.create_user(username=f'@{name}', email=f'{name}@example.org', is_tutor=True)
+        return TutorProfile.objects.create(
+            user=user, languages=languages, specializations=specializations, experience_years=experience
+        )
+
+    def test_tags_are_normalised(self):
+        self.assertEqual(recommendations.tags(' Python,django ; Web\n'), {'python', 'django', 'web'})
+
+    def test_ranks_by_tag_match_then_experience(self):
+        ranked = recommendations.recommend(languages='Python, Django')
+        self.assertEqual([tutor_id for tutor_id, _ in ranked], [self.senior.id, self.junior.id])
+        self.assertGreater(ranked[0][1], ranked[1][1])
+
+    def test_returns_top_k(self):
+        ranked = recommendations.recommend(k=2)
+        self.assertEqual(len(ranked), 2)
+        self.assertNotIn(self.junior.id, [tutor_id for tutor_id, _ in ranked])
+
+    def test_availability_overlap_changes_ranking(self):
+        set_availability(self.junior, parse_windows('Mon 09:00-12:00'))
+        set_availability(self.senior, parse_windows('Tue 09:00-12:00'))
+        lesson_request = LessonRequest(
+            student=self.student, tutor=self.senior, term=self.term, requested_languages='Python',
+            requested_start_date=self.monday, requested_start_time=time(10, 0), duration_minutes=60
+        )
+        ranked = recommendations.recommend_for_request(lesson_request)
+        self.assertEqual(ranked[0][0], self.junior.id)
+
+    def test_changes_refresh_only_the_changed_tutor(self):
+        recommendations.recommend()
+        index = recommendations.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.java.languages = 'Java, Python'
+            self.java.save()
+        with self.assertNumQueries(3):
+            ranked = recommendations.recommend(languages='Python')
+        self.assertIs(recommendations.get_index(), index)
+        self.assertIn(self.java.id, [tutor_id for tutor_id, _ in ranked])
+
+    def test_lessons_reduce_spare_capacity(self):
+        before = dict(recommendations.recommend(languages='Python'))[self.junior.id]
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(
+                tutor=self.junior, student=self.student, term=self.term,
+                start_date=self.monday, start_time=time(9, 0), duration_minutes=600
+            )
+        after = dict(recommendations.recommend(languages='Python'))[self.junior.id]
+        self.assertLess(after, before)
+
+    def test_reassigned_lesson_frees_the_previous_tutor(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson = Lesson.objects.create(
+                tutor=self.junior, student=self.student, term=self.term,
+                start_date=self.monday, start_time=time(9, 0), duration_minutes=600
+            )
+        busy = dict(recommendations.recommend(languages='Python'))[self.junior.id]
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson.tutor = self.senior
+            lesson.save()
+        self.assertGreater(dict(recommendations.recommend(languages='Python'))[self.junior.id], busy)
+
+    def test_tag_in_both_kinds_counts_once(self):
+        both = self._tutor('both', 'Python', 'Python', 10)
+        scores = dict(recommendations.recommend(languages='Python, Django'))
+        self.assertLess(scores[both.id], scores[self.senior.id])
+
+    def test_deleted_tutors_are_dropped(self):
+        recommendations.recommend()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.java.delete()
+        self.assertNotIn(self.java.id, [tutor_id for tutor_id, _ in recommendations.recommend()])
+
+    def test_benchmark_command_reports_latency(self):
+        out = StringIO()
+        call_command('benchmark_recommendations', '--tutors', 500, '-n', 5, '--updates', 2, stdout=out)
+        self.assertIn('Top-10 over 500 tutors', out.getvalue())
@@ -1,6 +1,8 @@
 """Unit tests for the Venue model."""
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.test import TestCase
+from tutorials import reference_data
 from tutorials.models import Venue
 
 class VenueModelTestCase(TestCase):
@@ -32,6 +34,17 @@ class VenueModelTestCase(TestCase):
     def test_str_method_returns_name(self):
         self.assertEqual(str(self.venue), "Room A101")
 
+    def test_cached_venues_change_when_the_change_commits(self):
+        cache.clear()
+        reference_data.all_venues()
+        with self.assertNumQueries(0):
+            self.assertEqual(reference_data.all_venues()[0][1], "Room A101")
+        self.venue.name = "Room B202"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.venue.save()
+            self.assertEqual(reference_data.all_venues()[0][1], "Room A101")
+        self.assertEqual(reference_data.all_venues()[0][1], "Room B202")
+
     def _assert_venue_is_valid(self):
         try:
             self.venue.full_clean()
@@ -0,0 +1,100 @@
+"""
+Query budgets: how many queries a page may make, checked at two dataset sizes.
+
+A test case mixes in QueryBudgetMixin, implements grow(size) to extend its
+data to the given number of rows of each kind, and passes its budgets to
+assert_within_budgets(). Every page is requested with cold caches at each
+size. A page fails if it makes more queries, or more exact duplicate
+queries, than its budget allows, or if it makes more queries with more
+data, which is how an N+1 shows itself.
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tutorials import recommendations
+
+DATASET_SIZES = (3, 12)
+
+
+class QueryBudget:
+    """The most queries, and exact duplicate queries, one request to a route may make."""
+
+    def __init__(self, route, max_queries, max_duplicates=0, args=(), query=None, username=None,
+                 method='get', data=None, status=200, label=None):
+        self.route = route
+        self.max_queries = max_queries
+        self.max_duplicates = max_duplicates
+        self.args = args
+        self.query = query
+        self.username = username
+        self.method = method
+        self.data = data
+        self.status = status
+        self.label = label or route
+
+    def url(self):
+        url = reverse(self.route, args=self.args)
+        if self.query:
+            url += '?' + self.query
+        return url
+
+
+def duplicates(queries):
+    """Return how many of the queries repeat an earlier one exactly."""
+
+    return sum(count - 1 for count in Counter(query['sql'] for query in queries).values())
+
+
+class QueryBudgetMixin:
+    """Adds assert_within_budgets() to a TestCase that implements grow(size)."""
+
+    dataset_sizes = DATASET_SIZES
+
+    def grow(self, size):
+        """Extend the test data to size rows of each kind."""
+        raise NotImplementedError
+
+    def measure(self, budget):
+        """Request the budget's URL with cold caches and return the response and its queries."""
+        self.client.logout()
+        if budget.username:
+            self.client.force_login(get_user_model().objects.get(username=budget.username))
+        cache.clear()
+        recommendations.reset()
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, budget.method)(budget.url(), budget.data)
+            # A streaming response may query as it starts; close it without reading the stream.
+            response.close()
+        return response, context.captured_queries
+
+    def assert_within_budgets(self, budgets):
+        counts = {}
+        for size in self.dataset_sizes:
+            self.grow(size)
+            for budget in budgets:
+                response, queries = self.measure(budget)
+                with self.subTest(budget.label, size=size):
+                    self.assertEqual(response.status_code, budget.status)
+                    self.assertLessEqual(
+                        len(queries), budget.max_queries,
+                        f'{budget.label} made {len(queries)} queries with {size} rows:\n' + sql(queries)
+                    )
+                    self.assertLessEqual(
+                        duplicates(queries), budget.max_duplicates,
+                        f'{budget.label} repeated queries with {size} rows:\n' + sql(queries)
+                    )
+                counts.setdefault(budget.label, []).append(len(queries))
+        for label, sizes in counts.items():
+            with self.subTest(label):
+                self.assertEqual(
+                    len(set(sizes)), 1,
+                    f'{label} made {sizes} queries at {self.dataset_sizes} rows; it should not grow with data.'
+                )
+
+
+def sql(queries):
+    return '\n'.join(f'{number}. {query["sql"]}' for number, query in enumerate(queries, start=1))
@@ -0,0 +1,138 @@
+"""Tests of the dashboard Server-Sent Events stream."""
+import asyncio
+from datetime import date, time
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, AsyncRequestFactory, TestCase
+from django.urls import reverse
+from tutorials import events
+from tutorials.models import StudentProfile, TutorProfile, Term, Lesson, LessonRequest, Invoice
+from tutorials.views import dashboard_events
+
+User = get_user_model()
+
+
+class DashboardEventsViewTestCase(TestCase):
+    """Test suite for the dashboard events view and broker."""
+
+    def setUp(self):
+        self.url = reverse('dashboard_events')
+        self.student_user = User.objects.create_user(
+            username='@studentuser', email='student@example.org', password='Student123'
+        )
+        self.student = StudentProfile.objects.create(user=self.student_user)
+        tutor_user = User.objects.create_user(username='@tutoruser', email='tutor@example.org', is_tutor=True)
+        self.tutor = TutorProfile.objects.create(user=tutor_user)
+        self.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 1), end_date=date(2024, 12, 15))
+
+    def _stream(self, user):
+        request = AsyncRequestFactory().get(self.url)
+        request.user = user
+        request.auser = lambda: self._auser(user)
+        response = async_to_sync(dashboard_events)(request)
+        return response, response.streaming_content
+
+    async def _auser(self, user):
+        return user
+
+    async def _next_after(self, stream, action):
+        """Wait for the stream to subscribe, run action, then return the next chunk."""
+        chunk = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.01)
+        await sync_to_async(action)()
+        return (await asyncio.wait_for(chunk, 1)).decode()
+
+    def test_redirects_when_not_logged_in(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_no_stream_under_wsgi(self):
+        self.client.login(username='@studentuser', password='Student123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+        self.assertNotContains(self.client.get(reverse('dashboard')), 'dashboard_events')
+
+    def test_dashboard_subscribes_under_asgi(self):
+        client = AsyncClient()
+        async_to_sync(client.aforce_login)(self.student_user)
+        response = async_to_sync(client.get)(reverse('dashboard'))
+        self.assertContains(response, 'dashboard_events')
+
+    def test_channels_cover_user_and_profiles(self):
+        self.assertEqual(
+            events.user_channels(self.student_user),
+            [f'user:{self.student_user.pk}', f'student:{self.student.pk}']
+        )
+
+    def test_pushes_lesson_request_status_to_student(self):
+        lesson_request = LessonRequest.objects.create(
+            student=self.student, tutor=self.tutor, term=self.term, requested_start_time=time(10, 0)
+        )
+        response, stream = self._stream(self.student_user)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        def allocate():
+            with self.captureOnCommitCallbacks(execute=True):
+                lesson_request.status = 'allocated'
+                lesson_request.save()
+
+        async def read():
+            self.assertTrue((await anext(stream)).decode().startswith('retry:'))
+            chunk = await self._next_after(stream, allocate)
+            await stream.aclose()
+            return chunk
+
+        chunk = async_to_sync(read)()
+        self.assertTrue(chunk.startswith('event: lesson_request\n'))
+        self.assertIn('"status": "allocated"', chunk)
+
+    def test_other_students_are_not_notified(self):
+        other_user = User.objects.create_user(username='@otheruser', email='other@example.org')
+        StudentProfile.objects.create(user=other_user)
+        _, stream = self._stream(other_user)
+
+        def invoice():
+            with self.captureOnCommitCallbacks(execute=True):
+                Invoice.objects.create(student=self.student, term=self.term, amount=100)
+
+        async def read():
+            await anext(stream)
+            chunk = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.01)
+            await sync_to_async(invoice)()
+            done, _ = await asyncio.wait([chunk], timeout=0.1)
+            chunk.cancel()
+            return done
+
+        self.assertEqual(async_to_sync(read)(), set())
+
+    def test_reassigned_lesson_notifies_both_tutors(self):
+        lesson = Lesson.objects.create(
+            student=self.student, tutor=self.tutor, term=self.term,
+            start_date=date(2024, 9, 2), start_time=time(10, 0)
+        )
+        other_user = User.objects.create_user(username='@othertutor', email='other@example.org', is_tutor=True)
+        other = TutorProfile.objects.create(user=other_user)
+        with patch('tutorials.signals.events.publish') as publish:
+            lesson.tutor = other
+            lesson.save()
+        channels = publish.call_args.args[0]
+        self.assertIn(events.tutor_channel(self.tutor.pk), channels)
+        self.assertIn(events.tutor_channel(other.pk), channels)
+
+    def test_heartbeat_and_overflow(self):
+        async def run():
+            broker = events.LocalBroker()
+            async with broker.subscribe(['student:1']) as subscription:
+                self.assertIsNone(await subscription.get(0.01))
+                for number in range(events.SUBSCRIPTION_QUEUE_SIZE + 1):
+                    broker.publish('student:1', {'type': 'invoice', 'data': {'id': number}})
+                await asyncio.sleep(0)
+                return await subscription.get(0.01), broker.subscriptions
+
+        event, subscriptions = async_to_sync(run)()
+        self.assertEqual(event['type'], 'reload')
+        self.assertEqual(dict(subscriptions), {})
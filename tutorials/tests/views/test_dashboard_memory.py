@@ -0,0 +1,76 @@
+"""Memory budget for rendering a busy tutor's dashboard."""
+import tracemalloc
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models import StudentProfile, TutorProfile, Term, Venue, Lesson
+from tutorials.views import tutor_sessions
+
+User = get_user_model()
+
+LESSONS = 500
+# Peak bytes allocated, with headroom over what was measured: about 2.3 MiB to
+# build the 6,500 session timeline (4 MiB with a dict per session) and 11.4 MiB
+# to render the whole dashboard, most of it the 2.2 MiB page held as template
+# fragments, text and encoded bytes.
+TIMELINE_BUDGET = 3 * 2 ** 20
+DASHBOARD_BUDGET = 16 * 2 ** 20
+
+
+class DashboardMemoryTestCase(TestCase):
+    """Test that a term's timeline stays within its memory budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 2), end_date=date(2024, 11, 29))
+        tutor_user = User.objects.create_user(
+            username='@tutoruser', email='tutor@example.org', password='Tutor123', is_student=False, is_tutor=True
+        )
+        cls.tutor = TutorProfile.objects.create(user=tutor_user)
+        venues = [Venue.objects.create(name=f'Room {number}', address='1 Strand, London') for number in range(10)]
+        students = [
+            StudentProfile.objects.create(user=User.objects.create_user(
+                username=f'@student{number}', email=f'student{number}@example.org',
+                first_name='Student', last_name=f'Number{number}'
+            ))
+            for number in range(50)
+        ]
+        Lesson.objects.bulk_create([
+            Lesson(
+                tutor=cls.tutor, student=students[number % 50], term=cls.term, venue=venues[number % 10],
+                start_date=cls.term.start_date + timedelta(days=number % 5), start_time=time(8 + number % 10, 0)
+            )
+            for number in range(LESSONS)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(username='@tutoruser', password='Tutor123')
+
+    def test_sessions_share_lesson_details(self):
+        sessions = tutor_sessions(self.tutor)
+        self.assertEqual(len(sessions), LESSONS * 13)
+        self.assertEqual(len({id(session.details) for session in sessions}), LESSONS)
+        self.assertEqual(len({id(session.place) for session in sessions}), 10)
+
+    def _peak(self, function):
+        """Return function's result and the peak bytes it allocated, after a warm-up call."""
+        function()
+        tracemalloc.start()
+        try:
+            result = function()
+            return result, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_timeline_stays_within_budget(self):
+        _, peak = self._peak(lambda: tutor_sessions(self.tutor))
+        self.assertLess(peak, TIMELINE_BUDGET)
+
+    def test_dashboard_render_stays_within_budget(self):
+        response, peak = self._peak(lambda: self.client.get(reverse('dashboard')))
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(peak, DASHBOARD_BUDGET)
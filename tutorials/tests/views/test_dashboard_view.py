@@ -1,7 +1,16 @@
+from asgiref.sync import iscoroutinefunction
+from datetime import date, time
+from django.conf import settings
+from django.db import connection
+from django.core.cache import cache
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.module_loading import import_string
 from django.contrib.auth import get_user_model
-from tutorials.models import StudentProfile, TutorProfile
+from tutorials import recommendations
+from tutorials.models import StudentProfile, TutorProfile, Term, Invoice, Lesson
+from tutorials.views import dashboard
 
 User = get_user_model()
 
@@ -10,6 +19,9 @@ class DashboardViewTestCase(TestCase):
 
     def setUp(self):
         self.url = reverse('dashboard')
+        # Search reads the per-process tutor index, which must not carry tutors over from other tests.
+        cache.clear()
+        recommendations.reset()
 
         # Create a unique student
         self.student_user = User.objects.create_user(
@@ -31,6 +43,9 @@ class DashboardViewTestCase(TestCase):
         )
         TutorProfile.objects.create(user=self.tutor_user)
 
+    def tearDown(self):
+        recommendations.reset()
+
     def test_dashboard_redirect_when_not_logged_in(self):
         # Not logged in, so we expect a redirect
         response = self.client.get(self.url, follow=True)
@@ -43,9 +58,10 @@ class DashboardViewTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'student_dashboard.html')
-        self.assertIn('invoices', response.context)
+        self.assertEqual(response.context['active_tab'], 'overview')
         self.assertIn('upcoming_lessons', response.context)
-        self.assertIn('tutors', response.context)
+        self.assertNotIn('invoices', response.context)
+        self.assertContains(response, reverse('dashboard_tab', args=['invoices']))
 
     def test_dashboard_tutor_view(self):
         # Log in the tutor
@@ -54,4 +70,67 @@ class DashboardViewTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'tutor_dashboard.html')
         self.assertIn('upcoming_lessons', response.context)
+        self.assertNotIn('tutor_form', response.context)
+
+    def test_dashboard_is_async_view(self):
+        self.assertTrue(iscoroutinefunction(dashboard))
+
+    def test_middleware_does_not_force_thread_hops(self):
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(path), 'async_capable', False), f'{path} is sync-only')
+
+    def test_student_dashboard_shows_search_invoices_and_lessons(self):
+        self.tutor_user.first_name = 'Ada'
+        self.tutor_user.save()
+        tutor_profile = self.tutor_user.tutor_profile
+        tutor_profile.languages = 'Python'
+        tutor_profile.save()
+        student_profile = self.student_user.student_profile
+        term = Term.objects.create(name='Autumn 2024', start_date=date(2024, 9, 1), end_date=date(2024, 9, 30))
+        Invoice.objects.create(student=student_profile, term=term, amount=100)
+        Lesson.objects.create(
+            tutor=tutor_profile, student=student_profile, term=term,
+            start_date=date(2024, 9, 2), start_time=time(10, 0)
+        )
+        self.client.login(username='@studentuser', password='Student123')
+        response = self.client.get(self.url, {'q_language': 'python'})
+        self.assertEqual(response.context['active_tab'], 'search')
+        self.assertEqual(response.context['tutors'].tutor_ids, [tutor_profile.id])
+        self.assertContains(response, f"{reverse('dashboard_tab', args=['search'])}?q_language=python")
+        response = self.client.get(reverse('dashboard_tab', args=['invoices']))
+        self.assertEqual(len(response.context['invoices']), 1)
+        response = self.client.get(reverse('dashboard_tab', args=['overview']))
+        self.assertEqual(len(response.context['upcoming_lessons']), 5)
+
+    def test_first_response_only_queries_the_open_tab(self):
+        self.client.login(username='@studentuser', password='Student123')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertFalse([query for query in queries if 'tutorials_invoice' in query['sql']])
+
+    def test_tabs_are_fragments_with_their_own_caching_headers(self):
+        self.client.login(username='@studentuser', password='Student123')
+        response = self.client.get(reverse('dashboard_tab', args=['invoices']))
+        self.assertTemplateUsed(response, 'partials/dashboard/student_invoices.html')
+        self.assertTemplateNotUsed(response, 'student_dashboard.html')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertEqual(self.client.get(reverse('dashboard_tab', args=['profile'])).status_code, 404)
+
+        self.client.login(username='@tutoruser', password='Tutor123')
+        response = self.client.get(reverse('dashboard_tab', args=['profile']))
         self.assertIn('tutor_form', response.context)
+        self.assertIn('no-store', response['Cache-Control'])
+
+    def test_student_search_ranks_best_match_first(self):
+        tutor_profile = self.tutor_user.tutor_profile
+        tutor_profile.languages = 'Python'
+        tutor_profile.save()
+        expert_user = User.objects.create_user(
+            username='@expertuser', email='expert_user@example.com', is_student=False, is_tutor=True
+        )
+        expert = TutorProfile.objects.create(user=expert_user, languages='Python, Django', experience_years=12)
+        self.client.login(username='@studentuser', password='Student123')
+        response = self.client.get(self.url, {'q_language': 'python'})
+        self.assertEqual(response.context['tutors'].tutor_ids, [expert.id, tutor_profile.id])
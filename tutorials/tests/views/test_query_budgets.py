@@ -0,0 +1,138 @@
+"""Query budgets for every page and admin changelist, checked at two dataset sizes."""
+from datetime import date, time, timedelta
+
+import numpy as np
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import URLPattern
+from code_tutors.urls import urlpatterns
+from tutorials.availability import SLOTS_PER_WEEK, set_availability
+from tutorials.jobs import enqueue
+from tutorials.models import (
+    Invoice, Lesson, LessonException, LessonRequest, StudentProfile, Term, TermClosure, TutorProfile, Venue
+)
+from tutorials.tasks import write_term_report
+from tutorials.tests.query_budgets import QueryBudget, QueryBudgetMixin
+
+User = get_user_model()
+
+STUDENT, TUTOR, ADMIN = '@student', '@tutor', '@admin'
+
+
+def changelist(model):
+    return f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist'
+
+
+# The admin counts a changelist's rows twice, once for the "Show all" link.
+CHANGELIST_BUDGETS = {
+    'User': 5,
+    'TutorProfile': 8,
+    'TutorAvailability': 5,
+    'StudentProfile': 6,
+    'Term': 5,
+    'Venue': 5,
+    'LessonRequest': 6,
+    'Lesson': 7,
+    'Invoice': 6,
+    'Job': 6,
+}
+
+
+class QueryBudgetTestCase(QueryBudgetMixin, TestCase):
+    """Test that no page's query count exceeds its budget or grows with the data."""
+
+    def setUp(self):
+        # Requests can only be made for terms that have not ended, so the term starts next week.
+        monday = date.today() + timedelta(days=7 - date.today().weekday())
+        self.term = Term.objects.create(name='Next term', start_date=monday, end_date=monday + timedelta(weeks=12))
+        self.student = self._profile(StudentProfile, STUDENT)
+        self.tutor = self._profile(TutorProfile, TUTOR, is_student=False, is_tutor=True, languages='Python')
+        set_availability(self.tutor, np.ones(SLOTS_PER_WEEK, dtype=bool))
+        User.objects.create_superuser(username=ADMIN, email='admin@example.org', password='Admin123')
+        self.size = 0
+
+    def _profile(self, model, username, languages=None, **kwargs):
+        user = User.objects.create_user(
+            username=username, email=f'{username[1:]}@example.org', first_name='Test', last_name=username[1:], **kwargs
+        )
+        extra = {'languages': languages} if languages else {}
+        return model.objects.create(user=user, **extra)
+
+    def grow(self, size):
+        """Give the student, tutor and every changelist size rows, each with related rows of its own."""
+        for number in range(self.size, size):
+            term = Term.objects.create(
+                name=f'Term {number}', start_date=date(2000 + number, 1, 3), end_date=date(2000 + number, 3, 26)
+            )
+            TermClosure.objects.create(term=term, start_date=term.start_date, end_date=term.start_date)
+            venue = Venue.objects.create(name=f'Room {number}', address='1 Strand, London')
+            tutor = self._profile(TutorProfile, f'@tutor{number}', is_student=False, is_tutor=True, languages='Python')
+            set_availability(tutor, np.ones(SLOTS_PER_WEEK, dtype=bool))
+            student = self._profile(StudentProfile, f'@student{number}')
+            start = self.term.start_date + timedelta(days=number % 5)
+            for lesson_tutor, lesson_student in ((tutor, self.student), (self.tutor, student)):
+                lesson_request = LessonRequest.objects.create(
+                    student=lesson_student, tutor=lesson_tutor, term=self.term, requested_start_date=start,
+                    requested_start_time=time(8 + number, 0), requested_venue=venue
+                )
+                lesson = Lesson.objects.create(
+                    request=lesson_request, tutor=lesson_tutor, student=lesson_student, term=self.term, venue=venue,
+                    start_date=start, start_time=time(8 + number, 0)
+                )
+                LessonException.objects.create(lesson=lesson, original_date=start, cancelled=True)
+            Invoice.objects.create(student=self.student, term=term, amount=100)
+            Invoice.objects.create(student=student, term=self.term, amount=100)
+            enqueue(write_term_report, term_id=term.pk)
+        self.size = size
+
+    def page_budgets(self):
+        request_data = {
+            'term': self.term.pk, 'requested_languages': 'Python', 'frequency': 'weekly', 'duration_minutes': 60,
+            'requested_start_time': '10:00', 'requested_start_date': self.term.start_date.isoformat(),
+        }
+        return [
+            QueryBudget('home', 0),
+            QueryBudget('log_in', 0),
+            QueryBudget('sign_up', 0),
+            QueryBudget('tutor_log_in', 0),
+            QueryBudget('student_log_in', 0),
+            QueryBudget('static', 0, args=['dashboard_tabs.js']),
+            QueryBudget('log_out', 4, username=STUDENT, status=302),
+            QueryBudget('password', 2, username=STUDENT),
+            QueryBudget('profile', 2, username=STUDENT),
+            QueryBudget('tutor_profile', 3, username=TUTOR),
+            QueryBudget('dashboard', 5, username=STUDENT, label='student dashboard'),
+            QueryBudget('dashboard', 6, username=STUDENT, query='q_language=python', label='student search'),
+            QueryBudget('dashboard', 6, username=TUTOR, label='tutor dashboard'),
+            QueryBudget('dashboard_tab', 5, args=['overview'], username=STUDENT, label='student overview tab'),
+            QueryBudget('dashboard_tab', 5, args=['search'], username=STUDENT, label='student search tab'),
+            QueryBudget('dashboard_tab', 3, args=['invoices'], username=STUDENT, label='student invoices tab'),
+            QueryBudget('dashboard_tab', 6, args=['overview'], username=TUTOR, label='tutor overview tab'),
+            QueryBudget('dashboard_tab', 3, args=['profile'], username=TUTOR, label='tutor profile tab'),
+            QueryBudget('dashboard_events', 2, username=STUDENT, status=204),
+            QueryBudget('request_lesson', 7, args=[self.tutor.pk], username=STUDENT, label='request lesson form'),
+            QueryBudget(
+                'request_lesson', 14, args=[self.tutor.pk], username=STUDENT, method='post', data=request_data,
+                status=302, label='request lesson'
+            ),
+            QueryBudget('admin:index', 3, username=ADMIN),
+            QueryBudget('admin:tutorials_invoice_summary', 3, username=ADMIN, label='invoice summary'),
+        ]
+
+    def test_every_route_and_changelist_has_a_budget(self):
+        routes = {pattern.name for pattern in urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertLessEqual(routes, {budget.route for budget in self.page_budgets()})
+        models = {model.__name__ for model in admin.site._registry if model._meta.app_label == 'tutorials'}
+        self.assertEqual(models, set(CHANGELIST_BUDGETS))
+
+    def test_pages_stay_within_their_budgets(self):
+        self.assert_within_budgets(self.page_budgets())
+
+    def test_admin_changelists_stay_within_their_budgets(self):
+        models = {model.__name__: model for model in admin.site._registry}
+        self.assert_within_budgets([
+            QueryBudget(changelist(models[name]), max_queries, max_duplicates=1, username=ADMIN,
+                        label=f'{name} changelist')
+            for name, max_queries in CHANGELIST_BUDGETS.items()
+        ])
@@ -1,8 +1,11 @@
 """Tests for the request_lesson view."""
+from datetime import date, timedelta
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from tutorials.models import StudentProfile, TutorProfile, LessonRequest, Term
+from tutorials.availability import parse_windows, set_availability
 from tutorials.forms import LessonRequestForm
 
 User = get_user_model()
@@ -11,6 +14,7 @@ class RequestLessonViewTestCase(TestCase):
     """Test suite for request_lesson view."""
 
     def setUp(self):
+        cache.clear()
         self.student_user = User.objects.create_user(
             username='@student',
             password='Student123',
@@ -47,8 +51,8 @@ class RequestLessonViewTestCase(TestCase):
         # Create a Term
         term = Term.objects.create(
             name='Spring 2025',
-            start_date='2025-01-01',
-            end_date='2025-06-01',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=150),
         )
 
         form_data = {
@@ -66,3 +70,30 @@ class RequestLessonViewTestCase(TestCase):
         lesson_request = LessonRequest.objects.first()
         self.assertEqual(lesson_request.student, self.student_profile)
         self.assertEqual(lesson_request.tutor, self.tutor_profile)
+
+    def test_post_rejects_time_outside_tutor_availability(self):
+        self.client.login(username='@student', password='Student123')
+        set_availability(self.tutor_profile, parse_windows('Mon 09:00-12:00'))
+        term = Term.objects.create(
+            name='Spring 2025',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=150),
+        )
+        monday = date.today() + timedelta(days=7 - date.today().weekday())
+        form_data = {
+            'term': term.id,
+            'requested_languages': 'Python',
+            'frequency': 'weekly',
+            'duration_minutes': 60,
+            'requested_start_time': '13:00',
+            'requested_start_date': monday.isoformat(),
+        }
+        response = self.client.post(self.url, form_data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('requested_start_time', response.context['form'].errors)
+        self.assertContains(response, 'Free every week: Mon 09:00-12:00')
+        self.assertFalse(LessonRequest.objects.exists())
+
+        form_data['requested_start_time'] = '10:00'
+        self.client.post(self.url, form_data)
+        self.assertTrue(LessonRequest.objects.exists())
@@ -0,0 +1,93 @@
+"""Tests for the static file handler and the compressed manifest storage."""
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tutorials.assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+
+
+class StaticFilesViewTestCase(TestCase):
+    """Test suite for serve_static."""
+
+    def setUp(self):
+        self.static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_root.cleanup)
+        self.css_url = reverse('static', kwargs={'path': 'custom.css'})
+        self.image_url = reverse('static', kwargs={'path': 'images/background-1280.jpg'})
+
+    def test_serves_source_file_before_collectstatic(self):
+        response = self.client.get(self.css_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], REVALIDATE_CACHE_CONTROL)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_missing_file_returns_404(self):
+        response = self.client.get(reverse('static', kwargs={'path': 'nope.css'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_path_traversal_returns_404(self):
+        response = self.client.get('/static/../manage.py')
+        self.assertEqual(response.status_code, 404)
+
+    def test_range_request_returns_partial_content(self):
+        response = self.client.get(self.image_url, headers={'Range': 'bytes=0-99'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(len(response.content), 100)
+        self.assertTrue(response['Content-Range'].startswith('bytes 0-99/'))
+
+    def test_suffix_range_request(self):
+        full = b''.join(self.client.get(self.image_url).streaming_content)
+        response = self.client.get(self.image_url, headers={'Range': 'bytes=-10'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, full[-10:])
+
+    def test_unsatisfiable_range_returns_416(self):
+        response = self.client.get(self.image_url, headers={'Range': 'bytes=99999999-'})
+        self.assertEqual(response.status_code, 416)
+
+    def test_range_is_ignored_when_if_range_no_longer_matches(self):
+        etag = self.client.get(self.image_url)['ETag']
+        response = self.client.get(self.image_url, headers={'Range': 'bytes=0-99', 'If-Range': etag})
+        self.assertEqual(response.status_code, 206)
+        response = self.client.get(self.image_url, headers={'Range': 'bytes=0-99', 'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Range', response)
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.css_url)['ETag']
+        response = self.client.get(self.css_url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_collectstatic_serves_hashed_precompressed_files(self):
+        with override_settings(STATIC_ROOT=self.static_root.name):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            hashed = next(Path(self.static_root.name).glob('custom.*.css')).name
+            self.assertTrue((Path(self.static_root.name) / f'{hashed}.gz').exists())
+            url = reverse('static', kwargs={'path': hashed})
+
+            response = self.client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+            self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+            self.assertIn(response['Content-Encoding'], ('br', 'gzip'))
+            self.assertEqual(response['Content-Type'], 'text/css')
+
+            response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            gzip_etag = response['ETag']
+            self.assertTrue(gzip_etag.endswith('-gzip"'))
+            response = self.client.get(url, headers={'If-None-Match': gzip_etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], gzip_etag)
+            response = self.client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzip_etag})
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.get(url, headers={'Accept-Encoding': 'gzip;q=0'})
+            self.assertNotIn('Content-Encoding', response)
+            css = b''.join(response.streaming_content).decode()
+            self.assertRegex(css, r'images/background-1280\.[0-9a-f]{12}\.avif')
+
+            response = self.client.get(reverse('home'))
+            self.assertIn(hashed, response.content.decode())
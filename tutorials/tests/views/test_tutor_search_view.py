@@ -0,0 +1,119 @@
+"""Tests of keyset-paginated tutor search and cached result cards."""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from tutorials import recommendations
+from tutorials.models import StudentProfile, TutorProfile
+from tutorials.search import SEARCH_PAGE_SIZE, render_cards, search_tutors
+
+User = get_user_model()
+
+
+class TutorSearchViewTestCase(TestCase):
+    """Test suite for tutor search pages and cards."""
+
+    def setUp(self):
+        cache.clear()
+        recommendations.reset()
+        self.tutors = []
+        for number in range(5):
+            user = User.objects.create_user(
+                username=f'@tutor{number}', email=f'tutor{number}@example.org',
+                first_name='Tutor', last_name=f'Number{number}', is_student=False, is_tutor=True
+            )
+            self.tutors.append(TutorProfile.objects.create(
+                user=user, languages='Python, Java' if number % 2 else 'Python', experience_years=number % 3
+            ))
+        student_user = User.objects.create_user(
+            username='@studentuser', email='student@example.org', password='Student123'
+        )
+        StudentProfile.objects.create(user=student_user)
+
+    def tearDown(self):
+        recommendations.reset()
+
+    def test_pages_follow_a_stable_order_without_gaps(self):
+        seen, after = [], None
+        while True:
+            page = search_tutors(q_language='python', after=after, page_size=2)
+            seen.extend(page.tutor_ids)
+            self.assertLessEqual(len(page.tutor_ids), 2)
+            after = page.next_cursor
+            if after is None:
+                break
+        self.assertEqual(sorted(seen), sorted(tutor.id for tutor in self.tutors))
+        self.assertEqual(seen, search_tutors(q_language='python', page_size=10).tutor_ids)
+
+    def test_search_text_matches_part_of_a_tag(self):
+        page = search_tutors(q_language='jav')
+        self.assertEqual(sorted(page.tutor_ids), [self.tutors[1].id, self.tutors[3].id])
+        self.assertFalse(search_tutors(q_language='ruby'))
+
+    def test_name_search_narrows_results(self):
+        page = search_tutors(q_name='number4')
+        self.assertEqual(page.tutor_ids, [self.tutors[4].id])
+
+    def test_malformed_cursor_starts_from_the_first_page(self):
+        self.assertEqual(
+            search_tutors(q_language='python', after='nonsense').tutor_ids,
+            search_tutors(q_language='python').tutor_ids
+        )
+
+    def test_cards_are_cached_until_the_profile_or_user_changes(self):
+        tutor = self.tutors[0]
+        self.assertIn('Number0', render_cards([tutor.id])[0])
+        with self.assertNumQueries(0):
+            render_cards([tutor.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tutor.bio = 'Loves recursion.'
+            tutor.save()
+        self.assertIn('Loves recursion.', render_cards([tutor.id])[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tutor.user.last_name = 'Renamed'
+            tutor.user.save()
+        self.assertIn('Tutor Renamed', render_cards([tutor.id])[0])
+
+    def test_dashboard_links_to_the_next_page(self):
+        for number in range(SEARCH_PAGE_SIZE):
+            user = User.objects.create_user(username=f'@extra{number}', email=f'extra{number}@example.org')
+            TutorProfile.objects.create(user=user, languages='Python')
+        recommendations.reset()
+        self.client.login(username='@studentuser', password='Student123')
+        response = self.client.get(reverse('dashboard'), {'q_language': 'python'})
+        page = response.context['tutors']
+        self.assertEqual(len(page.cards), SEARCH_PAGE_SIZE)
+        self.assertContains(response, f'after={page.next_cursor}')
+
+        response = self.client.get(reverse('dashboard'), {'q_language': 'python', 'after': page.next_cursor})
+        self.assertEqual(len(response.context['tutors'].cards), 5)
+        self.assertIsNone(response.context['tutors'].next_cursor)
+
+    def test_facets_count_every_matching_tutor(self):
+        self.assertEqual(search_tutors().facets['language'], [('python', 5), ('java', 2)])
+        page = search_tutors(q_language='jav', page_size=1)
+        self.assertEqual(page.facets['language'], [('java', 2), ('python', 2)])
+        self.assertEqual(page.facets['specialization'], [])
+
+    def test_facets_follow_profile_changes(self):
+        search_tutors()
+        with self.captureOnCommitCallbacks(execute=True):
+            tutor = self.tutors[0]
+            tutor.languages = 'Go'
+            tutor.specializations = 'Web development'
+            tutor.save()
+        facets = search_tutors().facets
+        self.assertEqual(facets['language'], [('python', 4), ('java', 2), ('go', 1)])
+        self.assertEqual(facets['specialization'], [('web development', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tutors[1].delete()
+        self.assertEqual(search_tutors().facets['language'], [('python', 3), ('go', 1), ('java', 1)])
+
+    def test_dashboard_links_facets_to_searches(self):
+        self.client.login(username='@studentuser', password='Student123')
+        response = self.client.get(reverse('dashboard_tab', args=['search']))
+        self.assertContains(response, '?q_language=java')
+        self.assertContains(response, 'java (2)')
@@ -1,137 +1,161 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render, get_object_or_404
 from django.views import View
 from django.views.generic.edit import FormView, UpdateView
 from django.urls import reverse
+from django.utils.cache import add_never_cache_headers, patch_cache_control, patch_vary_headers
 from tutorials.forms import LogInForm, PasswordForm, UserForm, SignUpForm
 from tutorials.helpers import login_prohibited
 
+from .availability import weekly_free_windows
+from .events import event_stream, user_channels
 from .forms import User, UserForm, TutorProfileForm, LessonRequestForm
-from .models import User, TutorProfile, Lesson
+from .models import User, TutorProfile, Lesson, Invoice
+from .occurrences import LessonDetails, timeline
+from .search import search_tutors
 
-from datetime import datetime
 
-from datetime import datetime, timedelta
+def student_invoices(user):
+    """Return the student's invoices with their terms."""
+    return list(Invoice.objects.filter(student__user=user).select_related('term'))
+
+
+def student_sessions(user):
+    """Return every session of the student's lessons, sorted by date and time."""
+    lessons = Lesson.objects.filter(student__user=user).select_related('term', 'tutor__user', 'venue')
+    return timeline(lessons, lambda lesson: LessonDetails(
+        tutor=lesson.tutor.user.full_name(),
+        tutor_email=lesson.tutor.user.email,
+        frequency=lesson.frequency,
+        duration=lesson.duration_minutes,
+    ))
+
+
+def tutor_sessions(tutor_profile):
+    """Return every session of the tutor's lessons, sorted by date and time."""
+    lessons = Lesson.objects.filter(tutor=tutor_profile).select_related('term', 'student__user', 'venue')
+    return timeline(lessons, lambda lesson: LessonDetails(
+        student=lesson.student.user.full_name(),
+        email=lesson.student.user.email,
+    ))
+
+
+DASHBOARD_TABS = {
+    'student': ('overview', 'search', 'invoices'),
+    'tutor': ('overview', 'profile'),
+}
+# Seconds the browser may reuse a fragment; live events refresh open tabs sooner.
+# The profile tab holds forms, so it is never cached.
+TAB_MAX_AGE = {'overview': 60, 'search': 300, 'invoices': 60}
+
+
+def dashboard_role(user):
+    return 'student' if user.is_student else 'tutor'
+
+
+def student_tab(request, user, tab):
+    """Return the context for one tab of the student dashboard."""
+    if tab == 'overview':
+        return {'upcoming_lessons': student_sessions(user)}
+    if tab == 'invoices':
+        return {'invoices': student_invoices(user)}
+    return {'tutors': search_tutors(
+        request.GET.get('q_name', '').strip(),
+        request.GET.get('q_language', '').strip(),
+        request.GET.get('q_specialization', '').strip(),
+        request.GET.get('after'),
+    )}
+
+
+def tutor_tab(request, user, tab):
+    """Return the context for one tab of the tutor dashboard."""
+    tutor_profile, _ = TutorProfile.objects.get_or_create(user=user)
+    if tab == 'overview':
+        return {'upcoming_lessons': tutor_sessions(tutor_profile)}
+    # For a tutor, provide both UserForm and TutorProfileForm
+    return {'form': UserForm(instance=user), 'tutor_form': TutorProfileForm(instance=tutor_profile)}
+
+
+def streams_events(request):
+    """Return whether the request came through the ASGI handler, which can hold an event stream open."""
+    return isinstance(request, ASGIRequest)
+
+
+def tab_context(request, user, tab):
+    if dashboard_role(user) == 'student':
+        return student_tab(request, user, tab)
+    return tutor_tab(request, user, tab)
+
+
+@login_required
+async def dashboard(request):
+    """Display the current user's dashboard with only the open tab rendered."""
+    current_user = await request.auser()
+    role = dashboard_role(current_user)
+    searching = any(request.GET.get(name, '').strip() for name in ('q_name', 'q_language', 'q_specialization'))
+    active_tab = 'search' if role == 'student' and searching else 'overview'
+    context = await sync_to_async(tab_context)(request, current_user, active_tab)
+    return await sync_to_async(render)(request, f'{role}_dashboard.html', {
+        'user': current_user,
+        'active_tab': active_tab,
+        'live_updates': streams_events(request),
+        **context,
+    })
+
 
 @login_required
-def dashboard(request):
-    """Display the current user's dashboard."""
-    current_user = request.user
-    if current_user.is_student:
-        # Extract query parameters for tutor search
-        q_name = request.GET.get('q_name', '').strip()
-        q_language = request.GET.get('q_language', '').strip()
-        q_specialization = request.GET.get('q_specialization', '').strip()
-
-        tutors = None
-        if q_name or q_language or q_specialization:
-            tutors = TutorProfile.objects.select_related('user')
-            if q_name:
-                tutors = tutors.filter(
-                    Q(user__first_name__icontains=q_name) |
-                    Q(user__last_name__icontains=q_name) |
-                    Q(user__username__icontains=q_name)
-                )
-            if q_language:
-                tutors = tutors.filter(languages__icontains=q_language)
-            if q_specialization:
-                tutors = tutors.filter(specializations__icontains=q_specialization)
-
-        # Retrieve the student's invoices
-        invoices = current_user.student_profile.invoices.select_related('term').all()
-
-        # Fetch lessons for the student
-        # Filter by student and select related fields for convenience
-        lessons = Lesson.objects.filter(student=current_user.student_profile).select_related('term', 'tutor__user', 'venue')
-
-        # Calculate all upcoming sessions based on frequency (similar to tutor logic)
-        upcoming_lessons = []
-        today = datetime.now().date()
-        for lesson in lessons:
-            current_date = lesson.start_date
-            while current_date <= lesson.term.end_date:
-                if current_date >= lesson.term.start_date:
-                    upcoming_lessons.append({
-                        'date': current_date,
-                        'time': lesson.start_time,
-                        'tutor': lesson.tutor.user.full_name,
-                        'tutor_email': lesson.tutor.user.email,
-                        'venue': lesson.venue.name if lesson.venue else "N/A",
-                        'address': lesson.venue.address if lesson.venue else "N/A",
-                        'room': lesson.venue.room_number if lesson.venue else "N/A",
-                        'frequency': lesson.frequency,
-                        'duration': lesson.duration_minutes,
-                    })
-                # Increment date based on frequency
-                increment = timedelta(weeks=2) if lesson.frequency == 'fortnightly' else timedelta(weeks=1)
-                current_date += increment
-
-        # Sort all lessons by date and time
-        upcoming_lessons = sorted(upcoming_lessons, key=lambda x: (x['date'], x['time']))
-
-        return render(request, 'student_dashboard.html', {
-            'user': current_user,
-            'tutors': tutors,
-            'invoices': invoices,
-            'upcoming_lessons': upcoming_lessons
-        })
+async def dashboard_tab(request, tab):
+    """Render one dashboard tab as an HTML fragment, fetched when the tab is first opened."""
+    current_user = await request.auser()
+    role = dashboard_role(current_user)
+    if tab not in DASHBOARD_TABS[role]:
+        raise Http404('No such dashboard tab.')
+    context = await sync_to_async(tab_context)(request, current_user, tab)
+    response = await sync_to_async(render)(request, f'partials/dashboard/{role}_{tab}.html', {
+        'user': current_user,
+        **context,
+    })
+    if tab in TAB_MAX_AGE:
+        patch_cache_control(response, private=True, max_age=TAB_MAX_AGE[tab])
     else:
-        # For a tutor, provide both UserForm and TutorProfileForm
-        user_form = UserForm(instance=current_user)
-        tutor_profile = getattr(current_user, 'tutor_profile', None)
-        if not tutor_profile:
-            tutor_profile = TutorProfile.objects.create(user=current_user)
-        tutor_form = TutorProfileForm(instance=tutor_profile)
-
-        # Fetch lessons for the tutor
-        lessons = Lesson.objects.filter(tutor=tutor_profile).select_related('term', 'student__user', 'venue')
-
-        # Calculate all upcoming sessions based on frequency
-        upcoming_lessons = []
-        today = datetime.now().date()
-        for lesson in lessons:
-            current_date = lesson.start_date
-            while current_date <= lesson.term.end_date:
-                if current_date >= lesson.term.start_date:
-                    upcoming_lessons.append({
-                        'date': current_date,
-                        'time': lesson.start_time,
-                        'student': lesson.student.user.full_name,
-                        'email': lesson.student.user.email,  # Fetch email through StudentProfile -> User
-                        'venue': lesson.venue.name if lesson.venue else "N/A",
-                        'address': lesson.venue.address if lesson.venue else "N/A",
-                        'room': lesson.venue.room_number if lesson.venue else "N/A",
-                    })
-                # Increment date based on frequency
-                increment = timedelta(weeks=2) if lesson.frequency == 'fortnightly' else timedelta(weeks=1)
-                current_date += increment
-
-        # Sort all lessons by date and time
-        upcoming_lessons = sorted(upcoming_lessons, key=lambda x: (x['date'], x['time']))
-
-        return render(
-            request,
-            'tutor_dashboard.html',
-            {
-                'user': current_user,
-                'form': user_form,
-                'tutor_form': tutor_form,
-                'upcoming_lessons': upcoming_lessons
-            }
-        )
+        add_never_cache_headers(response)
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+@login_required
+async def dashboard_events(request):
+    """
+    Stream changes to the current user's lessons, requests and invoices as Server-Sent Events.
+
+    A WSGI worker would be held for as long as the page stayed open, so
+    there the view answers 204 No Content, which stops EventSource from
+    reconnecting.
+    """
+    if not streams_events(request):
+        return HttpResponse(status=204)
+    current_user = await request.auser()
+    channels = await sync_to_async(user_channels)(current_user)
+    response = StreamingHttpResponse(event_stream(channels), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop proxies such as nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
 @login_required
 def request_lesson(request, tutor_id):
     """Handle lesson request form."""
     tutor = get_object_or_404(TutorProfile, id=tutor_id)  # Fetch the tutor
     if request.method == 'POST':
-        form = LessonRequestForm(request.POST)
+        form = LessonRequestForm(request.POST, tutor=tutor)
         if form.is_valid():
             lesson_request = form.save(commit=False)  # Don't save to the DB yet
             lesson_request.student = request.user.student_profile  # Assign the student
@@ -140,11 +164,12 @@ def request_lesson(request, tutor_id):
             form.save_m2m()  # Save many-to-many fields (if any)
             return redirect('dashboard')  # Redirect after successful submission
     else:
-        form = LessonRequestForm()  # Empty form for GET request
+        form = LessonRequestForm(tutor=tutor)  # Empty form for GET request
     
     return render(request, 'request_lesson.html', {
         'tutor': tutor,
-        'form': form
+        'form': form,
+        'free_windows': weekly_free_windows(tutor)
     })
 
 @login_prohibited